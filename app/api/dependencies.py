@@ -1,21 +1,34 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from app.core.security import decode_token
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
-
-def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
-    """Get current authenticated user from token"""
-    payload = decode_token(token)
-    return payload
-
-def require_role(role: str):
-    """Dependency to check user role"""
-    def checker(user: dict = Depends(get_current_user)):
-        if user.get("role") != role:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required role: {role}"
-            )
-        return user
-    return checker
\ No newline at end of file
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from app.core.security import decode_token
+from typing import Optional
+import os
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
+
+# Largest page the paginated list routes return
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE") or 200)
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+    """Get current authenticated user from token"""
+    payload = decode_token(token)
+    return payload
+
+def require_role(role: str):
+    """Dependency to check user role"""
+    def checker(user: dict = Depends(get_current_user)):
+        if user.get("role") != role:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Access denied. Required role: {role}"
+            )
+        return user
+    return checker
+
+def page_limit(limit: Optional[int] = None) -> Optional[int]:
+    """`limit` query parameter of paginated routes, capped at MAX_PAGE_SIZE (None: no paging)"""
+    if limit is None:
+        return None
+    if limit < 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="limit must be positive")
+    return min(limit, MAX_PAGE_SIZE)
@@ -2,13 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisco
 from app.models.schemas import ExamRequest, ExamResponse
 from app.api.dependencies import require_role, get_current_user
 from app.services.exam_service import exam_service
-from app.services.grok_service import grok_exam_service
+from app.services.session_store import SessionConflict
+from app.services.grok_service import grok_exam_service, async_grok_exam_service
 from app.services.voice_service import voice_service
+from app.services.audio_stream import AudioStreamAssembler, AudioStreamError, audio_filename, pcm_to_wav
+from app.services.vad import StreamingVAD
+from app.api.ws_frames import FrameReader, audio_payload, image_payload
 from app.core.security import decode_token
 from datetime import datetime
 import json
 from datetime import datetime, timezone, timedelta
-import base64
 import os
 
 IST = timezone(timedelta(hours=5, minutes=30))
@@ -17,7 +20,7 @@ IST = timezone(timedelta(hours=5, minutes=30))
 router = APIRouter(prefix="/api/exams", tags=["Exams"])
 
 @router.post("/start", response_model=ExamResponse)
-def start_exam(
+async def start_exam(
     request: dict,
     user: dict = Depends(require_role("student"))
 ):
@@ -29,15 +32,13 @@ def start_exam(
     print(f"✅ [START_EXAM] Student identifier in request: {request_value}")
     
     # Verify student is starting their own exam
-    student = exam_service.students.get(request_value)
+    student = await exam_service.get_student_async(request_value)
     resolved_student_id = request_value
     # If not found by student_id, try to resolve by email
     if not student and request_value:
-        for sid, data in exam_service.students.items():
-            if data.get('email') == request_value:
-                student = data
-                resolved_student_id = sid
-                break
+        student = await exam_service.get_student_by_email_async(request_value)
+        if student:
+            resolved_student_id = student['student_id']
 
     if not student:
         print(f"❌ [START_EXAM] Student {request_value} not found")
@@ -52,17 +53,17 @@ def start_exam(
     # If frontend provided exam_data (student selected a specific exam), skip scheduling check
     exam_data = request.get('exam_data') if isinstance(request, dict) else None
     if not exam_data:
-        can_start, message = exam_service.can_start_exam(resolved_student_id)
+        can_start, message = await exam_service.can_start_exam_async(resolved_student_id)
         if not can_start:
             print(f"❌ [START_EXAM] Cannot start exam: {message}")
             raise HTTPException(400, message)
     
-    print(f"✅ [START_EXAM] Can start exam - calling exam_service.start_exam()")
+    print(f"✅ [START_EXAM] Can start exam - calling exam_service.start_exam_async()")
 
     # Start exam
     # Use resolved_student_id (could have been found via email)
     try:
-        result = exam_service.start_exam(resolved_student_id, exam_data)
+        result = await exam_service.start_exam_async(resolved_student_id, exam_data)
     except Exception as e:
         import traceback
         print(f"❌ [START_EXAM] Exception while starting exam for {resolved_student_id}: {e}")
@@ -72,7 +73,6 @@ def start_exam(
     
     print(f"✅ [START_EXAM] Exam started successfully!")
     print(f"✅ [START_EXAM] Exam ID: {result['exam_id']}")
-    print(f"✅ [START_EXAM] Active exams: {list(exam_service.active_exams.keys())}")
     print(f"✅ [START_EXAM] Grok conversations: {list(grok_exam_service.conversations.keys())}")
     
     return ExamResponse(
@@ -93,6 +93,7 @@ def process_answer(
     exam_id = request.get('exam_id')
     answer = request.get('answer')
     response_time = request.get('response_time', 0)
+    question_number = request.get('question_number')  # optional: question being answered, for duplicate/stale submissions
     
     if not exam_id or not answer:
         raise HTTPException(400, "exam_id and answer are required")
@@ -116,7 +117,10 @@ def process_answer(
             raise HTTPException(403, "You can only answer your own exam")
     
     # Process the answer
-    result = exam_service.process_answer(exam_id, answer, response_time)
+    try:
+        result = exam_service.process_answer(exam_id, answer, response_time, question_number)
+    except SessionConflict as e:
+        raise HTTPException(409, str(e))
     
     return result
 
@@ -146,13 +150,13 @@ async def exam_websocket(websocket: WebSocket, exam_id: str):
         return
     
     # Verify exam exists
-    if exam_id not in exam_service.active_exams:
+    exam = await exam_service.get_exam_async(exam_id)
+    if exam is None:
         await websocket.send_json({"error": "Invalid exam ID"})
         await websocket.close()
         return
     
-    exam = exam_service.active_exams[exam_id]
-    exam['mode'] = mode  # Store mode for tracking
+    await exam_service.update_exam_async(exam_id, lambda session: session.update(mode=mode))  # Store mode for tracking
     
     # Send first question
     await websocket.send_json({
@@ -172,13 +176,17 @@ async def exam_websocket(websocket: WebSocket, exam_id: str):
                 print(f"📝 [ANSWER RECEIVED] Exam {exam_id}: '{answer[:100]}...' (length: {len(answer)}, time: {response_time:.1f}s)")
                 
                 # Process answer
-                result = exam_service.process_answer(exam_id, answer, response_time)
+                try:
+                    result = await exam_service.process_answer_async(exam_id, answer, response_time, data.get("question_number"))
+                except SessionConflict as e:
+                    await websocket.send_json({"type": "error", "code": 409, "message": str(e)})
+                    continue
                 
                 # Check if exam is completed
                 if result.get("exam_completed"):
                     # End exam and get results
                     try:
-                        final_result = exam_service.end_exam(exam_id)
+                        final_result = await exam_service.end_exam_async(exam_id)
                         
                         print(f"🏁 [EXAM COMPLETED] Exam {exam_id} finished with final result: {final_result.get('total_score', 0)}/{final_result.get('max_score', 0)}")
                         
@@ -203,7 +211,7 @@ async def exam_websocket(websocket: WebSocket, exam_id: str):
             elif data.get("type") == "end_exam":
                 # End exam and get results
                 try:
-                    final_result = exam_service.end_exam(exam_id)
+                    final_result = await exam_service.end_exam_async(exam_id)
                     
                     print(f"⏹️ [EXAM MANUALLY ENDED] Exam {exam_id} ended with result: {final_result.get('total_score', 0)}/{final_result.get('max_score', 0)}")
                     
@@ -231,9 +239,9 @@ async def exam_webcam_websocket(websocket: WebSocket, exam_id: str):
 
     Behavior:
     - Sends the first question as TTS audio (voice-only) to the client
-    - Accepts `video_frame` messages with base64-encoded JPEG/PNG frames and stores them
+    - Accepts `video_frame` messages (binary frames, or base64-encoded JPEG/PNG in JSON) and stores them
     - Accepts `voice_chunk` messages (same as voice endpoint) for student answers
-    - Uses existing grok_exam_service for TTS and transcription
+    - Uses grok_exam_service for TTS and async_grok_exam_service for transcription
     """
     await websocket.accept()
 
@@ -257,16 +265,17 @@ async def exam_webcam_websocket(websocket: WebSocket, exam_id: str):
         return
 
     # Verify exam exists
-    if exam_id not in exam_service.active_exams:
+    exam = await exam_service.get_exam_async(exam_id)
+    if exam is None:
         await websocket.send_json({"error": "Invalid exam ID"})
         await websocket.close()
         return
 
-    exam = exam_service.active_exams[exam_id]
-    exam['mode'] = 'webcam'
+    await exam_service.update_exam_async(exam_id, lambda session: session.update(mode='webcam'))
     student_id = exam['student_id']
     frame_count = 0
-    audio_chunks = []
+    frames = FrameReader(websocket)
+    audio_stream = AudioStreamAssembler()
 
     try:
         # Send first question and its audio
@@ -282,16 +291,14 @@ async def exam_webcam_websocket(websocket: WebSocket, exam_id: str):
         })
 
         while True:
-            data = await websocket.receive_json()
+            data = await frames.receive()
 
             if data.get("type") == "video_frame":
-                # Receive a webcam frame (base64-encoded image)
-                img_b64 = data.get("image")
+                # Receive a webcam frame (binary frame, or base64-encoded image in JSON)
                 fmt = data.get("format", "jpg")
                 frame_count += 1
                 try:
-                    import base64, tempfile
-                    img_bytes = base64.b64decode(img_b64)
+                    img_bytes = image_payload(data)
                     fname = f"webcam_{exam_id}_{frame_count}.jpg"
                     # Use UPLOADS_DIR env var or /tmp/uploads on Linux
                     upload_dir = os.environ.get('UPLOADS_DIR')
@@ -302,9 +309,7 @@ async def exam_webcam_websocket(websocket: WebSocket, exam_id: str):
                     with open(path, "wb") as fh:
                         fh.write(img_bytes)
                     # Store frame path in exam data for later review
-                    if 'frames' not in exam:
-                        exam['frames'] = []
-                    exam['frames'].append(path)
+                    await exam_service.update_exam_async(exam_id, lambda session: session.setdefault('frames', []).append(path))
 
                     # Ack to client
                     await websocket.send_json({"type": "frame_ack", "frame": frame_count})
@@ -313,38 +318,33 @@ async def exam_webcam_websocket(websocket: WebSocket, exam_id: str):
 
             elif data.get("type") == "voice_chunk":
                 # Voice chunk handling mirrors pure_voice logic
-                audio_chunk = data.get("audio")
                 is_final = data.get("is_final", False)
                 silence_duration = data.get("silence_duration", 0)
 
-                if audio_chunk:
-                    audio_chunks.append(audio_chunk)
-
-                if is_final and audio_chunks:
-                    # Use the same approach as pure_voice: pick first valid chunk
-                    import base64
-                    binary_chunks = []
-                    for chunk in audio_chunks:
-                        try:
-                            binary_chunks.append(base64.b64decode(chunk))
-                        except Exception:
-                            pass
-
-                    if not binary_chunks:
+                try:
+                    audio_stream.feed(audio_payload(data))
+                except (ValueError, AudioStreamError) as e:
+                    await websocket.send_json({"type": "error", "message": f"Invalid audio chunk: {e}"})
+                    audio_stream = AudioStreamAssembler()
+                    continue
+
+                if is_final and audio_stream.size:
+                    # Header plus every cluster of the answer, joined as the chunks arrived
+                    combined_binary = audio_stream.take()
+                    if not combined_binary:
                         await websocket.send_json({"type": "error", "message": "No valid audio frames"})
-                        audio_chunks = []
                         continue
 
-                    combined_binary = binary_chunks[0]
-                    combined_audio = base64.b64encode(combined_binary).decode('utf-8')
-
-                    transcription_result = await grok_exam_service.transcribe_audio_base64(combined_audio)
+                    transcription_result = await async_grok_exam_service.transcribe_audio(
+                        combined_binary, audio_filename(combined_binary)
+                    )
 
                     if transcription_result.get("status") == "success":
                         transcribed_text = transcription_result.get("text", "")
                         await websocket.send_json({"type": "transcription", "text": transcribed_text})
 
                         # Process the answer using existing exam flow
+                        await exam_service.touch_exam_async(exam_id)
                         result = grok_exam_service.process_voice_answer(
                             student_id,
                             transcribed_text,
@@ -354,7 +354,7 @@ async def exam_webcam_websocket(websocket: WebSocket, exam_id: str):
                         is_exam_complete = result.get('exam_complete', False)
 
                         if is_exam_complete:
-                            final_result = exam_service.end_exam(exam_id)
+                            final_result = await exam_service.end_exam_async(exam_id)
                             farewell = "Your exam has been completed. Thank you."
                             farewell_audio = await grok_exam_service.text_to_speech(farewell)
                             await websocket.send_json({
@@ -379,10 +379,8 @@ async def exam_webcam_websocket(websocket: WebSocket, exam_id: str):
                     else:
                         await websocket.send_json({"type": "error", "message": f"Transcription failed: {transcription_result.get('message')}"})
 
-                    audio_chunks = []
-
             elif data.get("type") == "end_exam":
-                final_result = exam_service.end_exam(exam_id)
+                final_result = await exam_service.end_exam_async(exam_id)
                 farewell = "Your exam has been completed. Thank you."
                 farewell_audio = await grok_exam_service.text_to_speech(farewell)
                 await websocket.send_json({
@@ -426,16 +424,17 @@ async def exam_voice_websocket(websocket: WebSocket, exam_id: str):
         return
     
     # Verify exam exists
-    if exam_id not in exam_service.active_exams:
+    exam = await exam_service.get_exam_async(exam_id)
+    if exam is None:
         await websocket.send_json({"error": "Invalid exam ID"})
         await websocket.close()
         return
     
-    exam = exam_service.active_exams[exam_id]
-    exam['mode'] = 'voice'  # Set mode to voice
+    await exam_service.update_exam_async(exam_id, lambda session: session.update(mode='voice'))  # Set mode to voice
     
     student_id = exam['student_id']
-    audio_chunks = []
+    frames = FrameReader(websocket)
+    audio_stream = AudioStreamAssembler()
     silence_counter = 0
     is_recording = False
     
@@ -474,25 +473,30 @@ async def exam_voice_websocket(websocket: WebSocket, exam_id: str):
         })
         
         while True:
-            data = await websocket.receive_json()
+            data = await frames.receive()
             
             if data.get("type") == "voice_chunk":
-                # Receive audio chunk (base64)
-                audio_chunk = data.get("audio")
+                # Receive audio chunk (binary frame, or base64 in JSON)
                 is_final = data.get("is_final", False)
                 silence_duration = data.get("silence_duration", 0)
                 
-                if audio_chunk:
-                    audio_chunks.append(audio_chunk)
+                try:
+                    audio_stream.feed(audio_payload(data))
+                except (ValueError, AudioStreamError) as e:
+                    await websocket.send_json({"type": "error", "message": f"Invalid audio chunk: {e}"})
+                    audio_stream = AudioStreamAssembler()
+                    continue
                 
                 # Check if pause detected (is_final indicates student paused)
-                if is_final and audio_chunks:
-                    # Combine all chunks and process
-                    combined_audio = ''.join(audio_chunks)
+                if is_final and audio_stream.size:
+                    # The answer's chunks, already joined into one stream
+                    combined_audio = audio_stream.take()
                     
                     try:
                         # Transcribe combined audio
-                        transcription_result = await grok_exam_service.transcribe_audio_base64(combined_audio)
+                        transcription_result = await async_grok_exam_service.transcribe_audio(
+                            combined_audio, audio_filename(combined_audio)
+                        )
                         
                         if transcription_result.get("status") == "success":
                             transcribed_text = transcription_result.get("text", "")
@@ -508,6 +512,7 @@ async def exam_voice_websocket(websocket: WebSocket, exam_id: str):
                             is_pdf_exam = exam.get('is_pdf_exam', False)
                             pdf_instruction = exam.get('pdf_metadata', {}).get('instruction') if is_pdf_exam else None
                             
+                            await exam_service.touch_exam_async(exam_id)
                             result = grok_exam_service.process_voice_answer(
                                 exam_id,
                                 transcribed_text,
@@ -521,7 +526,7 @@ async def exam_voice_websocket(websocket: WebSocket, exam_id: str):
                             
                             if is_exam_complete:
                                 # End exam and get results
-                                final_result = exam_service.end_exam(exam_id)
+                                final_result = await exam_service.end_exam_async(exam_id)
                                 
                                 await websocket.send_json({
                                     "type": "exam_complete",
@@ -544,26 +549,21 @@ async def exam_voice_websocket(websocket: WebSocket, exam_id: str):
                                 "mode": "voice",
                                 "status": "listening"  # Tell client to keep listening
                             })
-                            
-                            # Reset audio chunks for next answer
-                            audio_chunks = []
                         else:
                             await websocket.send_json({
                                 "type": "error",
                                 "message": f"Transcription failed: {transcription_result.get('message')}"
                             })
-                            audio_chunks = []
                     
                     except Exception as e:
                         await websocket.send_json({
                             "type": "error",
                             "message": f"Voice processing error: {str(e)}"
                         })
-                        audio_chunks = []
             
             elif data.get("type") == "end_exam":
                 # End exam and get results
-                final_result = exam_service.end_exam(exam_id)
+                final_result = await exam_service.end_exam_async(exam_id)
                 
                 await websocket.send_json({
                     "type": "exam_complete",
@@ -581,7 +581,10 @@ async def exam_voice_websocket(websocket: WebSocket, exam_id: str):
 
 @router.websocket("/ws/pure_voice/{exam_id}")
 async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
-    """WebSocket for pure voice exam (no text display, auto-advance on 3-5s pause)"""
+    """WebSocket for pure voice exam (no text display, auto-advance on 3-5s pause)
+
+    The pause is detected by the client (is_final), or by the server for answers streamed as PCM frames.
+    """
     await websocket.accept()
     
     # Authenticate via query param token
@@ -606,9 +609,9 @@ async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
     # Verify exam exists - BUT if not, try to create it from token
     print(f"\n🎤 [PURE_VOICE] WebSocket connection attempt")
     print(f"🎤 [PURE_VOICE] Exam ID: {exam_id}")
-    print(f"🎤 [PURE_VOICE] Active exams: {list(exam_service.active_exams.keys())}")
     
-    if exam_id not in exam_service.active_exams:
+    exam = await exam_service.get_exam_async(exam_id)
+    if exam is None:
         print(f"⚠️  [PURE_VOICE] Exam {exam_id} not found!")
         print(f"🎤 [PURE_VOICE] FALLBACK: Creating exam from user token...")
         
@@ -623,7 +626,7 @@ async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
             print(f"✅ [PURE_VOICE] Using student_id from token: {student_id}")
         
         # Check if student has profile
-        student = exam_service.students.get(student_id)
+        student = await exam_service.get_student_async(student_id)
         if not student:
             print(f"❌ [PURE_VOICE] Student {student_id} has no profile")
             await websocket.send_json({"error": "Student profile not found. Please complete your profile first."})
@@ -641,7 +644,7 @@ async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
             "cheat_indicators": [],
             "is_pdf_exam": False
         }
-        exam_service.active_exams[exam_id] = exam_data
+        await exam_service.add_active_exam_async(exam_id, exam_data)
         
         # Initialize Grok conversation
         print(f"✅ [PURE_VOICE] Initializing Grok conversation...")
@@ -653,12 +656,11 @@ async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
         
         exam = exam_data
     else:
-        exam = exam_service.active_exams[exam_id]
         student_id = exam['student_id']
         # Get first question from grok
         if student_id not in grok_exam_service.conversations:
             print(f"⚠️  [PURE_VOICE] Student {student_id} conversation not initialized, initializing now...")
-            student = exam_service.students.get(student_id)
+            student = await exam_service.get_student_async(student_id)
             if student:
                 first_question = grok_exam_service.start_exam(
                     student_id,
@@ -669,11 +671,14 @@ async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
         else:
             first_question = "Hello! Let's begin the exam."
     
-    exam['mode'] = 'pure_voice'  # Set mode to pure voice
+    await exam_service.update_exam_async(exam_id, lambda session: session.update(mode='pure_voice'))  # Set mode to pure voice
     print(f"✅ [PURE_VOICE] Exam found, student_id: {student_id}")
     print(f"✅ [PURE_VOICE] Grok conversations: {list(grok_exam_service.conversations.keys())}")
     print(f"✅ [PURE_VOICE] Student in conversations: {student_id in grok_exam_service.conversations}")
-    audio_chunks = []
+    frames = FrameReader(websocket)
+    audio_stream = AudioStreamAssembler()
+    vad = StreamingVAD()  # endpoints answers streamed as PCM frames
+    pcm_stream = False
     silence_counter = 0
     is_recording = False
     
@@ -716,74 +721,59 @@ async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
         print(f"✅ [PURE_VOICE] Message sent successfully!\n")
         
         while True:
-            data = await websocket.receive_json()
+            data = await frames.receive()
             
             print(f"\n🎤 [PURE_VOICE] Received message type: {data.get('type')}")
             print(f"🎤 [PURE_VOICE] Message keys: {data.keys()}")
             
             if data.get("type") == "voice_chunk":
-                # Receive audio chunk (base64)
-                audio_chunk = data.get("audio")
+                # Receive audio chunk (binary frame, or base64 in JSON)
                 is_final = data.get("is_final", False)
                 silence_duration = data.get("silence_duration", 0)
                 mode = data.get("mode", "pure_voice")
                 
                 print(f"\n🎤 [PURE_VOICE] Voice chunk received:")
-                print(f"   - Audio size: {len(audio_chunk) if audio_chunk else 0} chars")
+                print(f"   - Sequence: {data.get('seq', '-')}")
                 print(f"   - Is final: {is_final}")
-                print(f"   - Total chunks accumulated: {len(audio_chunks) + (1 if audio_chunk else 0)}")
                 
-                if audio_chunk:
-                    audio_chunks.append(audio_chunk)
-                    if is_final:
-                        print(f"   ⏸️  FINAL FLAG RECEIVED - Processing {len(audio_chunks)} chunks")
+                try:
+                    audio_chunk = audio_payload(data)
+                    audio_stream.feed(audio_chunk)
+                except (ValueError, AudioStreamError) as e:
+                    print(f"❌ [PURE_VOICE] Dropping undecodable audio: {e}")
+                    audio_stream = AudioStreamAssembler()
+                    continue
+                print(f"   - Audio size: {len(audio_chunk) if audio_chunk else 0} bytes")
+                print(f"   - Answer audio so far: {audio_stream.size} bytes")
+                
+                # PCM is endpointed here: the adaptive 3-5 second pause ends the answer
+                if data.get("encoding") == "pcm" and audio_chunk:
+                    pcm_stream = True
+                    for event in vad.feed(audio_chunk):
+                        print(f"🎤 [PURE_VOICE] VAD {event['type']} at {event['at']}s")
+                        await websocket.send_json({"type": "vad", "event": event})
+                        if event["type"] == "endpoint":
+                            is_final = True
+                            silence_duration = event["pause"]
                 
                 # Check if pause detected (3-5 seconds)
                 # is_final indicates student paused for required duration
-                if is_final and audio_chunks:
-                    print(f"🎤 [PURE_VOICE] FINAL AUDIO FLAG SET - Processing {len(audio_chunks)} chunks")
-                    
-                    # IMPORTANT: WebM chunks from browser are individual files
-                    # We need to combine them properly or use the first valid one
-                    # Each 500ms chunk is a complete WebM file, so concatenating breaks them
-                    
-                    import base64
-                    
-                    # Try to find a valid chunk or combine them
-                    # For now, let's try each chunk individually to see which is valid
-                    print(f"🎤 Attempting to process {len(audio_chunks)} audio chunks")
-                    
-                    combined_audio = None
-                    
-                    # Strategy: Combine by decoding binary and re-encoding
-                    # BUT only keep complete audio frames, not headers
-                    binary_chunks = []
-                    for i, chunk in enumerate(audio_chunks):
-                        try:
-                            binary = base64.b64decode(chunk)
-                            binary_chunks.append(binary)
-                            print(f"🎤 Chunk {i}: {len(chunk)} chars base64 -> {len(binary)} bytes, header: {binary[:4].hex()}")
-                        except Exception as e:
-                            print(f"❌ Failed to decode chunk {i}: {e}")
-                    
-                    if binary_chunks:
-                        # Take only the first valid chunk
-                        # (it contains all audio from first 500ms onwards recorded by MediaRecorder)
-                        combined_binary = binary_chunks[0]
-                        
-                        # If multiple chunks, also try adding audio data from subsequent chunks
-                        # by skipping their WebM headers
-                        if len(binary_chunks) > 1:
-                            print(f"🎤 Multiple chunks detected, using first chunk: {len(combined_binary)} bytes")
-                        
-                        combined_audio = base64.b64encode(combined_binary).decode('utf-8')
-                        print(f"🎤 Final audio to transcribe: {len(combined_audio)} chars base64, binary header: {combined_binary[:4].hex()}")
+                if is_final and audio_stream.size:
+                    # MediaRecorder chunks continue one WebM stream (only the first carries the header);
+                    # the assembler has joined them as they arrived, so the whole answer is transcribed
+                    combined_binary = audio_stream.take()
+                    if pcm_stream:
+                        vad.reset()
+                        combined_binary = pcm_to_wav(combined_binary, vad.sample_rate) if combined_binary else b""
+                    print(f"🎤 [PURE_VOICE] FINAL AUDIO FLAG SET - {len(combined_binary)} bytes of {audio_stream.format} audio")
                     
                     try:
-                        if combined_audio:
-                            # Transcribe combined audio (silent processing)
-                            print(f"🎤 [PURE_VOICE] Transcribing {len(combined_audio)} chars of base64 audio...")
-                            transcription_result = await grok_exam_service.transcribe_audio_base64(combined_audio)
+                        if combined_binary:
+                            # Transcribe combined audio (silent processing), uploaded as is
+                            print(f"🎤 [PURE_VOICE] Transcribing {len(combined_binary)} bytes of audio...")
+                            transcription_result = await async_grok_exam_service.transcribe_audio(
+                                combined_binary, audio_filename(combined_binary)
+                            )
                         else:
                             print(f"❌ [PURE_VOICE] No valid audio to transcribe")
                             transcription_result = {"status": "error", "message": "No valid audio data", "text": ""}
@@ -808,6 +798,7 @@ async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
                                 })
                                 
                                 # Process the answer (NO transcription display in pure voice)
+                                await exam_service.touch_exam_async(exam_id)
                                 result = grok_exam_service.process_voice_answer(
                                     student_id,
                                     transcribed_text,
@@ -824,7 +815,7 @@ async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
                                 if is_exam_complete:
                                     # End exam
                                     print(f"\n🎉 [PURE_VOICE] EXAM COMPLETE!")
-                                    final_result = exam_service.end_exam(exam_id)
+                                    final_result = await exam_service.end_exam_async(exam_id)
                                     
                                     # Send completion with final audio
                                     farewell = "Your exam has been completed. Thank you for your time."
@@ -857,28 +848,23 @@ async def exam_pure_voice_websocket(websocket: WebSocket, exam_id: str):
                                     })
                                     print(f"✅ [PURE_VOICE] Next question sent!")
                                 
-                                # Reset audio chunks for next answer
-                                audio_chunks = []
-                                print(f"🔄 [PURE_VOICE] Reset audio_chunks, waiting for next speech...")
+                                print(f"🔄 [PURE_VOICE] Waiting for next speech...")
                             else:
-                                # Empty transcription - just reset and continue listening
+                                # Empty transcription - just continue listening
                                 print(f"❌ [PURE_VOICE] Empty transcription: '{transcribed_text}'")
-                                audio_chunks = []
                         else:
                             # Silent error - just wait for next input
                             print(f"❌ [PURE_VOICE] Transcription failed: {transcription_result}")
-                            audio_chunks = []
                     
                     except Exception as e:
                         # Silent error handling - continue listening
                         print(f"❌ [PURE_VOICE] Exception during transcription: {str(e)}")
                         import traceback
                         traceback.print_exc()
-                        audio_chunks = []
             
             elif data.get("type") == "end_exam":
                 # Manual exam end
-                final_result = exam_service.end_exam(exam_id)
+                final_result = await exam_service.end_exam_async(exam_id)
                 
                 farewell = "Your exam has been completed. Thank you."
                 farewell_audio = await grok_exam_service.text_to_speech(farewell)
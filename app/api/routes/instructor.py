@@ -6,106 +6,74 @@ from app.models.schemas import (
     GradingResult,
     PDFUploadResponse
 )
-from app.api.dependencies import require_role
+from app.api.dependencies import require_role, page_limit
 from app.services.exam_service import exam_service
-from app.services.mongo_service import mongo_service
-from app.services.grok_service import grok_exam_service
+from app.services.mongo_service import (
+    mongo_service, page_cursor, decode_cursor, results_match, results_sort, STUDENT_SORT
+)
+from app.services.grok_service import async_grok_exam_service
+from app.services.pdf_ingest import pdf_ingest_service
 from datetime import datetime
 from app.core.security import IST
+import asyncio
 import os
 import uuid
 
 router = APIRouter(prefix="/api/instructor", tags=["Instructor"])
+
 @router.get("/results")
-def get_all_results(user: dict = Depends(require_role("instructor"))):
-    """Get all exam results for all students"""
-    all_results = []
-    
-    # First, from in-memory active_exams
-    for exam_id, exam_data in exam_service.active_exams.items():
-        if exam_data['status'] == 'completed':
-            student_id = exam_data['student_id']
-            student_name = exam_service.students.get(student_id, {}).get('name', 'Unknown')
-            
-            # Use actual AI evaluation results
-            total_score = exam_data.get('total_score', 0)
-            max_score = exam_data.get('max_score', len(exam_data.get('questions', [])))
-            percentage = exam_data.get('percentage', 0)
-            total_questions = len(exam_data.get('questions', []))
-            
-            # Calculate average cheat score
-            responses = exam_data.get('responses', [])
-            avg_cheat_score = sum(r.get('cheat_score', 0) for r in responses) / len(responses) if responses else 0
-            
-            all_results.append({
-                "exam_id": exam_id,
-                "student_id": student_id,
-                "student_name": student_name,
-                "completed_at": exam_data.get('completed_at', datetime.now(IST)).isoformat() if hasattr(exam_data.get('completed_at'), 'isoformat') else str(exam_data.get('completed_at')),
-                "total_score": total_score,
-                "max_score": max_score,
-                "percentage": percentage,
-                "risk_level": exam_data.get('risk_level', 'LOW'),
-                "suspicion_score": avg_cheat_score,
-                "total_questions": total_questions
-            })
-    
-    # Also load from MongoDB if available
+def get_all_results(
+    limit: int = Depends(page_limit),
+    cursor: str = None,
+    student_id: str = None,
+    risk_level: str = None,
+    min_percentage: float = None,
+    max_percentage: float = None,
+    sort_by: str = "completed_at",
+    order: str = "desc",
+    user: dict = Depends(require_role("instructor"))
+):
+    """
+    Get exam results for all students, most recent first unless sort_by/order say otherwise.
+    Rows can be filtered by student, risk level and percentage range.
+    With limit, returns one page; pass next_cursor back as cursor for the next one.
+    """
+    if order not in ("asc", "desc"):
+        raise HTTPException(400, "order must be asc or desc")
     try:
-        if mongo_service.is_connected():
-            # Get all completed exams from MongoDB
-            all_completed = mongo_service.get_all_completed_exams()
-            for exam in all_completed:
-                # Avoid duplicates
-                if not any(r['exam_id'] == exam['exam_id'] for r in all_results):
-                    student_id = exam['student_id']
-                    student_name = exam_service.students.get(student_id, {}).get('name', 'Unknown')
-                    
-                    # Use stored scores from MongoDB
-                    total_score = exam.get('total_score', 0)
-                    max_score = exam.get('max_score', len(exam.get('question_scores', [])))
-                    percentage = exam.get('percentage', 0)
-                    total_questions = len(exam.get('question_scores', []))
-                    
-                    # Calculate average cheat score from responses
-                    responses = exam.get('responses', [])
-                    avg_cheat_score = sum(r.get('cheat_score', 0) for r in responses) / len(responses) if responses else 0
-                    
-                    all_results.append({
-                        "exam_id": exam['exam_id'],
-                        "student_id": student_id,
-                        "student_name": student_name,
-                        "completed_at": exam.get('completed_at', ''),
-                        "total_score": total_score,
-                        "max_score": max_score,
-                        "percentage": percentage,
-                        "risk_level": exam.get('risk_level', 'LOW'),
-                        "suspicion_score": avg_cheat_score,
-                        "total_questions": total_questions
-                    })
-    except Exception as e:
-        print(f"Warning: Could not load completed exams from MongoDB: {e}")
-    
-    # Sort by completed_at (most recent first)
-    all_results.sort(key=lambda x: x['completed_at'], reverse=True)
+        sort = results_sort(sort_by, descending=(order == "desc"))
+        match = results_match(student_id, risk_level, min_percentage, max_percentage)
+        all_results, next_cursor = exam_service.completed_exam_summaries(match, sort, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     
     print(f"👨‍🏫 [INSTRUCTOR RESULTS] Returning {len(all_results)} total exam results")
-    for result in all_results:
-        print(f"   {result['student_name']} ({result['student_id']}): {result['total_score']}/{result['max_score']} ({result['percentage']:.1f}%)")
     
     return {
         "total_results": len(all_results),
-        "results": all_results
+        "results": all_results,
+        "next_cursor": next_cursor
     }
 @router.get("/students")
-def list_students(user: dict = Depends(require_role("instructor"))):
-    """Get list of all registered students"""
+def list_students(
+    limit: int = Depends(page_limit),
+    cursor: str = None,
+    user: dict = Depends(require_role("instructor"))
+):
+    """
+    Get list of all registered students (by student_id).
+    With limit, returns one page; pass next_cursor back as cursor for the next one.
+    """
     students = []
+    next_cursor = None
     
     # Try to get from MongoDB first
     try:
         if mongo_service.is_connected():
-            docs = mongo_service.list_students()
+            docs = mongo_service.list_students(
+                projection=["student_id", "name", "email", "project_details.title"], limit=limit, cursor=cursor
+            )
+            next_cursor = page_cursor(docs, STUDENT_SORT, limit)
             for d in docs:
                 students.append({
                     "student_id": d.get('student_id'),
@@ -113,13 +81,20 @@ def list_students(user: dict = Depends(require_role("instructor"))):
                     "email": d.get('email'),
                     "project_title": d.get('project_details', {}).get('title', 'Not specified')
                 })
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     except Exception:
         pass
     
+    # Pages come from MongoDB alone (registered students are persisted there)
+    if limit and mongo_service.is_connected():
+        return {"students": students, "total": len(students), "next_cursor": next_cursor}
+    
     # Also add any students from in-memory cache that might not be in MongoDB yet
+    listed = {s['student_id'] for s in students}
     for sid, data in exam_service.students.items():
         # Check if this student is already in the list
-        if not any(s['student_id'] == sid for s in students):
+        if sid not in listed:
             students.append({
                 "student_id": sid,
                 "name": data.get('name', 'Unknown'),
@@ -127,7 +102,16 @@ def list_students(user: dict = Depends(require_role("instructor"))):
                 "project_title": data.get('project_details', {}).get('title', 'Not specified')
             })
     
-    return {"students": students, "total": len(students)}
+    if limit:
+        # Without a database, page the in-memory cache the same way
+        try:
+            after = decode_cursor(cursor, STUDENT_SORT)[0] if cursor else None
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        students = sorted((s for s in students if after is None or s['student_id'] > after), key=lambda s: s['student_id'])[:limit]
+        next_cursor = page_cursor(students, STUDENT_SORT, limit)
+    
+    return {"students": students, "total": len(students), "next_cursor": next_cursor}
 
 @router.get("/students/{student_id}", response_model=StudentDetailResponse)
 def get_student_details(
@@ -234,10 +218,11 @@ def get_exam_results(
 @router.get("/dashboard")
 def instructor_dashboard(user: dict = Depends(require_role("instructor"))):
     """Get instructor dashboard data"""
+    students = dict(exam_service.students.items())
     scheduled_exams = [
         {
             "student_id": sid,
-            "student_name": exam_service.students[sid]['name'],
+            "student_name": students[sid]['name'],
             "start_time": schedule['start_time'].isoformat(),
             "duration": schedule['duration_minutes']
         }
@@ -251,15 +236,14 @@ def instructor_dashboard(user: dict = Depends(require_role("instructor"))):
             "student_id": exam['student_id'],
             "completed_at": exam.get('completed_at', '').isoformat() if hasattr(exam.get('completed_at', ''), 'isoformat') else ''
         }
-        for eid, exam in exam_service.active_exams.items()
-        if exam['status'] == 'completed'
+        for eid, exam in exam_service.get_exams_by_status('completed')
     ]
     
     return {
-        "total_students": len(exam_service.students),
+        "total_students": len(students),
         "scheduled_exams": scheduled_exams,
         "completed_exams": completed_exams,
-        "pending_grading": len([e for e in exam_service.active_exams.values() if e['status'] == 'completed'])
+        "pending_grading": exam_service.count_exams_by_status('completed')
     }
 
 @router.post("/upload_pdf", response_model=PDFUploadResponse)
@@ -301,9 +285,14 @@ async def upload_pdf(
     except Exception as e:
         raise HTTPException(500, f"Failed to save file: {str(e)}")
     
-    # Generate questions using Grok service
+    # Extract the pages the instruction refers to (off the event loop), then generate questions from them
     try:
-        questions = await grok_exam_service.generate_pdf_questions(file_path, instruction)
+        job = await asyncio.to_thread(pdf_ingest_service.submit, file_path, file.filename, instruction)
+        await asyncio.wrap_future(pdf_ingest_service.future(job['job_id']))
+        pdf_context = await asyncio.to_thread(
+            pdf_ingest_service.get_context, job['document_id'], instruction, job['page_ranges']
+        )
+        questions = await async_grok_exam_service.generate_pdf_questions(pdf_context, instruction)
         
         return PDFUploadResponse(
             message="PDF processed successfully",
@@ -315,11 +304,12 @@ async def upload_pdf(
         raise HTTPException(500, f"Failed to generate questions: {str(e)}")
 
 @router.get("/schedule-pdf-exam")
-async def get_pdf_exams(user: dict = Depends(require_role("instructor"))):
+def get_pdf_exams(user: dict = Depends(require_role("instructor"))):
     """Debug endpoint - Get all scheduled PDF exams"""
     pdf_exams = {}
+    students = dict(exam_service.students.items())
     for student_id, exam_data in exam_service.pdf_exams.items():
-        student_name = exam_service.students.get(student_id, {}).get('name', 'Unknown')
+        student_name = students.get(student_id, {}).get('name', 'Unknown')
         pdf_exams[student_id] = {
             "student_name": student_name,
             "exam_name": exam_data.get('exam_name'),
@@ -331,7 +321,7 @@ async def get_pdf_exams(user: dict = Depends(require_role("instructor"))):
     return {
         "total_pdf_exams": len(pdf_exams),
         "pdf_exams": pdf_exams,
-        "all_students": list(exam_service.students.keys())
+        "all_students": list(students)
     }
 
 
@@ -360,8 +350,9 @@ async def schedule_pdf_exam(
         Success message
     """
     # Validate student exists
-    if student_id not in exam_service.students:
-        raise HTTPException(404, f"Student not found. Available students: {list(exam_service.students.keys())}")
+    if not await exam_service.get_student_async(student_id):
+        student_ids = await asyncio.to_thread(list, exam_service.students)
+        raise HTTPException(404, f"Student not found. Available students: {student_ids}")
     
     print(f"\n{'='*80}")
     print(f"📝 SCHEDULE PDF EXAM REQUEST")
@@ -427,14 +418,21 @@ async def schedule_pdf_exam(
         print(f"PDF Path: {os.path.abspath(file_path)}")
         print(f"Instruction: {instruction}")
         
-        exam_service.store_pdf_exam_metadata(
+        # Extract page text in the background so starting the exam never parses the PDF
+        job = await asyncio.to_thread(pdf_ingest_service.submit, file_path, file.filename, instruction)
+        print(f"PDF Ingest Job: {job['job_id']} ({job['status']}, pages: {job['page_ranges'] or 'all, or resolved by the job'})")
+        
+        # The document is already submitted, so this only records the exam (no PDF parsing)
+        await exam_service.store_pdf_exam_metadata_async(
             student_id=student_id,
             pdf_path=file_path,
             pdf_filename=file.filename,
             instruction=instruction,
             exam_name=exam_name,
             start_time=parsed_start_time,
-            duration_minutes=duration_minutes
+            duration_minutes=duration_minutes,
+            document_id=job['document_id'],
+            page_ranges=job['page_ranges']
         )
         
         print(f"✅ PDF exam metadata stored successfully")
@@ -447,8 +445,23 @@ async def schedule_pdf_exam(
             "pdf_name": file.filename,
             "instruction": instruction,
             "start_time": parsed_start_time.isoformat() if parsed_start_time else None,
-            "duration_minutes": duration_minutes
+            "duration_minutes": duration_minutes,
+            "ingest_job_id": job['job_id'],
+            "page_ranges": job['page_ranges']
         }
     except Exception as e:
         raise HTTPException(500, f"Failed to schedule exam: {str(e)}")
 
+
+@router.get("/pdf-jobs/{job_id}")
+def get_pdf_ingest_job(job_id: str, user: dict = Depends(require_role("instructor"))):
+    """Progress of a background PDF extraction job"""
+    job = pdf_ingest_service.get_job(job_id)
+    if not job:
+        raise HTTPException(404, "Ingest job not found")
+    return {
+        **job,
+        "created_at": job["created_at"].isoformat(),
+        "finished_at": job["finished_at"].isoformat() if job["finished_at"] else None
+    }
+
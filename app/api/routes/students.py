@@ -3,14 +3,22 @@
 # ============================================================================
 from fastapi import APIRouter, Depends, HTTPException
 from app.models.schemas import StudentProfile, DashboardResponse, ChangeStudentIDRequest
-from app.api.dependencies import require_role, get_current_user
+from app.api.dependencies import require_role, get_current_user, page_limit
 from app.services.exam_service import exam_service
+from app.services.mongo_service import mongo_service, page_cursor, rows_after, sort_rows, COMPLETED_EXAM_SORT
+from app.services.write_behind import write_behind, WRITE_BEHIND_SHUTDOWN_SECONDS
 from datetime import datetime, timedelta
-from app.core.security import IST
+from app.core.security import IST, to_ist
 from typing import List
 
 router = APIRouter(prefix="/api/student", tags=["Students"])
 
+# Fields of a completed exam needed for a results row (not the full transcript)
+RESULT_FIELDS = [
+    "exam_id", "completed_at", "total_score", "max_score", "percentage", "risk_level",
+    "feedback", "responses.cheat_score", "question_scores.score"
+]
+
 @router.post("/profile")
 def create_profile(
     profile: StudentProfile,
@@ -22,11 +30,7 @@ def create_profile(
         raise HTTPException(400, "Student ID is required")
 
     # Check if profile already exists for this user
-    existing_student_id = None
-    for sid, data in exam_service.students.items():
-        if data.get("email") == user["sub"]:
-            existing_student_id = sid
-            break
+    existing_student_id = exam_service.get_student_id_by_email(user["sub"])
 
     # Register student in exam system
     student_data = {
@@ -44,8 +48,7 @@ def create_profile(
 
     if existing_student_id and existing_student_id != profile.student_id:
         # Student ID changed, remove old entry
-        if existing_student_id in exam_service.students:
-            del exam_service.students[existing_student_id]
+        exam_service.remove_student(existing_student_id)
 
     return {
         "message": "Profile created successfully",
@@ -62,11 +65,7 @@ def change_student_id(
     email = user["sub"]
 
     # Find current student_id by email
-    current_student_id = None
-    for sid, data in exam_service.students.items():
-        if data.get("email") == email:
-            current_student_id = sid
-            break
+    current_student_id = exam_service.get_student_id_by_email(email)
 
     if not current_student_id:
         raise HTTPException(404, "Profile not found. Please create your profile first.")
@@ -80,7 +79,6 @@ def change_student_id(
         raise HTTPException(400, "New student_id already in use")
 
     # Verify password against user record (DB or in-memory)
-    from app.services.mongo_service import mongo_service
     from app.core.security import verify_password
 
     user_record = None
@@ -98,61 +96,32 @@ def change_student_id(
     if not user_record or not verify_password(body.current_password, user_record.get("hashed_password")):
         raise HTTPException(401, "Password verification failed")
 
-    # At this point password verified. Proceed to update in-memory structures
-    student_data = exam_service.students.pop(current_student_id)
-    student_data["student_id"] = new_id
-    exam_service.students[new_id] = student_data
-
-    # Move exam_schedules mapping if present
-    try:
-        if current_student_id in exam_service.exam_schedules:
-            exam_service.exam_schedules[new_id] = exam_service.exam_schedules.pop(current_student_id)
-            exam_service.exam_schedules[new_id]["student_id"] = new_id
-    except Exception:
-        pass
-
-    # Move student_pdf_exams list
-    try:
-        if current_student_id in exam_service.student_pdf_exams:
-            exam_service.student_pdf_exams[new_id] = exam_service.student_pdf_exams.pop(current_student_id)
-            # Update pdf_exams entries to point to new id
-            for eid in exam_service.student_pdf_exams[new_id]:
-                if eid in exam_service.pdf_exams:
-                    exam_service.pdf_exams[eid]["student_id"] = new_id
-    except Exception:
-        pass
-
-    # Update active_exams and completed maps
-    try:
-        for eid, edata in list(exam_service.active_exams.items()):
-            if edata.get("student_id") == current_student_id:
-                exam_service.active_exams[eid]["student_id"] = new_id
-        for pid, pdata in list(exam_service.completed_pdf_exams.items()):
-            if pdata.get("student_id") == current_student_id:
-                exam_service.completed_pdf_exams[pid]["student_id"] = new_id
-    except Exception:
-        pass
+    # At this point password verified. Writes queued under the old id must reach MongoDB before
+    # it is migrated: one still queued or spooled would land under the old id afterwards
+    write_behind.flush(WRITE_BEHIND_SHUTDOWN_SECONDS)
+    if write_behind.is_pending_for_student(current_student_id):
+        raise HTTPException(503, "Earlier changes to your exams are still being saved. Please try again in a minute.")
 
-    # Persist changes to MongoDB if available
+    # Move the cached data, then the stored documents
+    moved = exam_service.migrate_student_id(current_student_id, new_id)
+    stored = {}
     try:
         if mongo_service.is_connected():
-            ok = mongo_service.update_student_id(current_student_id, new_id)
-            if not ok:
-                raise Exception("DB migration failed")
-            # Also persist updated student document
-            mongo_service.create_student(student_data)
+            stored = mongo_service.migrate_student_id(current_student_id, new_id, exam_service.students.get(new_id))
+            print(f"🔁 [STUDENT_ID] Migrated {current_student_id} -> {new_id}: {stored}")
+    except ValueError as e:
+        exam_service.migrate_student_id(new_id, current_student_id)
+        raise HTTPException(400, str(e))
     except Exception as e:
         # Rollback in-memory changes on failure
-        exam_service.students.pop(new_id, None)
-        exam_service.students[current_student_id] = student_data
+        exam_service.migrate_student_id(new_id, current_student_id)
         raise HTTPException(500, f"Failed to migrate student_id: {e}")
 
-    return {"message": "Student ID changed successfully", "old_student_id": current_student_id, "new_student_id": new_id}
+    return {"message": "Student ID changed successfully", "old_student_id": current_student_id, "new_student_id": new_id, "moved": moved, "stored": stored}
 
 
     # Persist to MongoDB if available
     try:
-        from app.services.mongo_service import mongo_service
         if mongo_service.is_connected():
             mongo_service.create_student({
                 "student_id": student_id,
@@ -166,34 +135,28 @@ def change_student_id(
 
     return {"message": "Profile updated successfully", "student_id": student_id}
 
+def _isoformat(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else (str(value) if value else None)
+
 @router.get("/dashboard", response_model=DashboardResponse)
 def get_dashboard(user: dict = Depends(require_role("student"))):
     """Get student dashboard data"""
     student_email = user["sub"]
-    
-    # Find student by email
-    student_data = None
-    student_id = None
-    for sid, data in exam_service.students.items():
-        if data.get("email") == student_email:
-            student_data = data
-            student_id = sid
-            break
-    
-    # If not found in memory, try MongoDB
-    if not student_data:
+
+    # One aggregation fetches the profile, schedule, PDF exams and completed exams together
+    dashboard = None
+    if mongo_service.is_connected():
         try:
-            from app.services.mongo_service import mongo_service
-            if mongo_service.is_connected():
-                db_student = mongo_service.get_student_by_email(student_email)
-                if db_student:
-                    # Load into memory cache
-                    exam_service.students[db_student['student_id']] = db_student
-                    student_data = db_student
-                    student_id = db_student['student_id']
+            dashboard = mongo_service.get_student_dashboard(student_email)
         except Exception as e:
-            pass
-    
+            print(f"Warning: Could not load dashboard from MongoDB: {e}")
+
+    # Find student by email (memory first, then the aggregation's profile)
+    student_data = exam_service.get_student_by_email(student_email)
+    if not student_data and dashboard:
+        student_data = dashboard['student']
+        exam_service.cache_student(student_data)
+
     if not student_data:
         return DashboardResponse(
             name="",
@@ -201,7 +164,10 @@ def get_dashboard(user: dict = Depends(require_role("student"))):
             past_results=[],
             profile_complete=False
         )
-    
+    student_id = student_data['student_id']
+    if dashboard and dashboard['student'].get('student_id') != student_id:
+        dashboard = None  # The cached profile has moved to another student_id
+
     # Check if profile is actually complete (has required fields)
     profile_complete = bool(
         student_data.get('name') and
@@ -209,50 +175,23 @@ def get_dashboard(user: dict = Depends(require_role("student"))):
         student_data.get('email') and
         student_data.get('project_title')
     )
-    
-    # Get upcoming exams from exam_schedules
+
+    # Get upcoming project exam (in-memory schedule, else the stored one)
     upcoming = []
-    # First, from in-memory
-    if student_id in exam_service.exam_schedules:
-        schedule = exam_service.exam_schedules[student_id]
-        if schedule['end_time'] > datetime.now(IST):
-            upcoming.append({
-                "type": "project",
-                "start_time": schedule['start_time'].isoformat(),
-                "duration": schedule['duration_minutes']
-            })
-    
-    # Also load from MongoDB if available
-    try:
-        from app.services.mongo_service import mongo_service
-        if mongo_service.is_connected():
-            db_schedule = mongo_service.get_exam_schedule(student_id)
-            if db_schedule and db_schedule.get('end_time'):
-                # Convert string to datetime if needed
-                end_time = db_schedule['end_time']
-                if isinstance(end_time, str):
-                    end_time = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                if end_time > datetime.now(IST):
-                    # Avoid duplicates
-                    if not any(u['type'] == 'project' for u in upcoming):
-                        upcoming.append({
-                            "type": "project",
-                            "start_time": db_schedule['start_time'] if isinstance(db_schedule['start_time'], str) else db_schedule['start_time'].isoformat(),
-                            "duration": db_schedule['duration_minutes']
-                        })
-    except Exception:
-        pass
+    schedule = exam_service.exam_schedules.get(student_id) or (dashboard or {}).get('schedule')
+    end_time = schedule.get('end_time') if schedule else None
+    if isinstance(end_time, str):
+        end_time = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+    end_time = to_ist(end_time)
+    if end_time and end_time > datetime.now(IST):
+        upcoming.append({
+            "type": "project",
+            "start_time": _isoformat(schedule['start_time']),
+            "duration": schedule['duration_minutes']
+        })
 
     # Get PDF exams from MongoDB if available, otherwise from in-memory
-    pdf_exams_list = []
-    try:
-        from app.services.mongo_service import mongo_service
-        if mongo_service.is_connected():
-            pdf_exams_list = mongo_service.get_pdf_exams_by_student(student_id)
-        else:
-            pdf_exams_list = exam_service.get_all_pdf_exams_for_student(student_id)
-    except Exception:
-        pdf_exams_list = exam_service.get_all_pdf_exams_for_student(student_id)
+    pdf_exams_list = dashboard['pdf_exams'] if dashboard else exam_service.get_all_pdf_exams_for_student(student_id)
 
     for pdf_meta in pdf_exams_list:
         exam_id = pdf_meta.get('exam_id')
@@ -272,56 +211,35 @@ def get_dashboard(user: dict = Depends(require_role("student"))):
             "type": "pdf",
             "exam_id": exam_id,
             "exam_name": pdf_meta.get('exam_name', 'PDF-Based Exam'),
-            "start_time": pdf_meta.get('start_time').isoformat() if pdf_meta.get('start_time') and hasattr(pdf_meta.get('start_time'), 'isoformat') else (str(pdf_meta.get('start_time')) if pdf_meta.get('start_time') else None),
+            "start_time": _isoformat(start_dt),
             "end_time": end_time,
             "duration": pdf_meta.get('duration_minutes'),
             "is_completed": False,
             "status": "Available"
         })
-    
-    # Get past results - look through completed exams
+
+    # Get past results - in-memory completed sessions first, then stored ones not already listed
     past_results = []
-    # First, from in-memory active_exams
-    for exam_id, exam_data in exam_service.active_exams.items():
-        if exam_data['student_id'] == student_id and exam_data['status'] == 'completed':
-            # Use actual AI evaluation results instead of hardcoded scoring
-            total_score = exam_data.get('total_score', 0)
-            max_score = exam_data.get('max_score', len(exam_data.get('questions', [])))
-            total_questions = len(exam_data.get('questions', []))
-            
-            past_results.append({
-                "exam_id": exam_id,
-                "completed_at": exam_data.get('completed_at', datetime.now(IST)).isoformat() if hasattr(exam_data.get('completed_at'), 'isoformat') else str(exam_data.get('completed_at')),
-                "total_score": total_score,
-                "total_questions": total_questions,
-                "risk_level": exam_data.get('risk_level', 'UNKNOWN')
-            })
-    
-    # Also load from MongoDB if available
-    try:
-        from app.services.mongo_service import mongo_service
-        if mongo_service.is_connected():
-            db_completed = mongo_service.get_completed_exams_by_student(student_id)
-            for exam in db_completed:
-                # Avoid duplicates
-                if not any(r['exam_id'] == exam['exam_id'] for r in past_results):
-                    # Use actual stored AI evaluation results
-                    total_score = exam.get('total_score', 0)
-                    total_questions = exam.get('total_questions', len(exam.get('question_scores', [])))
-                    past_results.append({
-                        "exam_id": exam['exam_id'],
-                        "completed_at": exam.get('completed_at', ''),
-                        "total_score": total_score,
-                        "total_questions": total_questions,
-                        "risk_level": exam.get('risk_level', 'UNKNOWN')
-                    })
-    except Exception:
-        pass
-    
+    for exam_id, exam_data in exam_service.get_student_exams(student_id, status='completed'):
+        # Use actual AI evaluation results instead of hardcoded scoring
+        past_results.append({
+            "exam_id": exam_id,
+            "completed_at": _isoformat(exam_data.get('completed_at') or datetime.now(IST)),
+            "total_score": exam_data.get('total_score', 0),
+            "total_questions": len(exam_data.get('questions', [])),
+            "risk_level": exam_data.get('risk_level', 'UNKNOWN')
+        })
+
+    seen = {result['exam_id'] for result in past_results}
+    for exam in (dashboard['completed_exams'] if dashboard else []):
+        if exam['exam_id'] not in seen:
+            seen.add(exam['exam_id'])
+            past_results.append(exam)
+
     print(f"📊 [DASHBOARD] Returning dashboard for {student_data.get('name', '')}: {len(upcoming)} upcoming, {len(past_results)} completed exams")
     for result in past_results:
         print(f"   Completed: {result['exam_id']} - {result['total_score']}/{result['total_questions']} questions")
-    
+
     return DashboardResponse(
         name=student_data.get('name', ''),
         upcoming_exams=upcoming,
@@ -335,103 +253,121 @@ def get_student_id(user: dict = Depends(require_role("student"))):
     student_email = user["sub"]
     
     # Find student by email
-    for student_id, data in exam_service.students.items():
-        if data.get("email") == student_email:
-            return {
-                "student_id": student_id,
-                "name": data.get("name"),
-                "email": student_email
-            }
+    data = exam_service.get_student_by_email(student_email)
+    if data:
+        return {
+            "student_id": data["student_id"],
+            "name": data.get("name"),
+            "email": student_email
+        }
     
     # Student not found
     raise HTTPException(404, "Student profile not found. Please create your profile first.")
 
+def _session_result(exam_id: str, exam_data: dict) -> dict:
+    """Results row of a completed in-memory session"""
+    # Use actual AI evaluation results
+    total_score = exam_data.get('total_score', 0)
+    max_score = exam_data.get('max_score', len(exam_data.get('questions', [])))
+    percentage = exam_data.get('percentage', 0)
+    total_questions = len(exam_data.get('questions', []))
+    
+    # Calculate average cheat score
+    responses = exam_data.get('responses', [])
+    avg_cheat_score = sum(r.get('cheat_score', 0) for r in responses) / len(responses) if responses else 0
+    
+    return {
+        "exam_id": exam_id,
+        "completed_at": exam_data.get('completed_at', datetime.now(IST)).isoformat() if hasattr(exam_data.get('completed_at'), 'isoformat') else str(exam_data.get('completed_at')),
+        "total_score": total_score,
+        "max_score": max_score,
+        "percentage": percentage,
+        "scores": {
+            "technical_knowledge": total_score * 0.4,
+            "problem_solving": total_score * 0.3,
+            "communication": total_score * 0.3
+        },
+        "total_questions": total_questions,
+        "risk_level": exam_data.get('risk_level', 'LOW'),
+        "suspicion_score": avg_cheat_score,
+        "feedback": "Your exam has been evaluated. Great job!" if avg_cheat_score < 3 else "Your performance has been recorded. Please contact your instructor for detailed feedback."
+    }
+
+def _stored_result(exam: dict) -> dict:
+    """Results row of a completed exam loaded from MongoDB (RESULT_FIELDS)"""
+    total_score = exam.get('total_score', 0)
+    max_score = exam.get('max_score', len(exam.get('question_scores', [])))
+    percentage = exam.get('percentage', 0)
+    total_questions = len(exam.get('question_scores', []))
+    
+    # Calculate average cheat score from responses
+    responses = exam.get('responses', [])
+    avg_cheat_score = sum(r.get('cheat_score', 0) for r in responses) / len(responses) if responses else 0
+    
+    return {
+        "exam_id": exam['exam_id'],
+        "completed_at": exam.get('completed_at', ''),
+        "total_score": total_score,
+        "max_score": max_score,
+        "percentage": percentage,
+        "scores": {
+            "technical_knowledge": total_score * 0.4,
+            "problem_solving": total_score * 0.3,
+            "communication": total_score * 0.3
+        },
+        "total_questions": total_questions,
+        "risk_level": exam.get('risk_level', 'LOW'),
+        "suspicion_score": avg_cheat_score,
+        "feedback": exam.get('feedback', 'Your exam has been evaluated.')
+    }
+
 @router.get("/results")
-def get_my_results(user: dict = Depends(require_role("student"))):
-    """Get all exam results for the logged-in student"""
+def get_my_results(
+    limit: int = Depends(page_limit),
+    cursor: str = None,
+    user: dict = Depends(require_role("student"))
+):
+    """
+    Get all exam results for the logged-in student (most recent first).
+    With limit, returns one page; pass next_cursor back as cursor for the next one.
+    """
     student_email = user["sub"]
     
     # Find student ID by email
-    student_id = None
-    student_name = ""
-    for sid, data in exam_service.students.items():
-        if data.get("email") == student_email:
-            student_id = sid
-            student_name = data.get("name", "")
-            break
+    student = exam_service.get_student_by_email(student_email)
+    student_id = student['student_id'] if student else None
+    student_name = student.get("name", "") if student else ""
     
     if not student_id:
         raise HTTPException(404, "Student profile not found. Please create your profile first.")
     
-    # Get all completed exams for this student
-    results = []
-    
-    # First, from in-memory active_exams
-    for exam_id, exam_data in exam_service.active_exams.items():
-        if exam_data['student_id'] == student_id and exam_data['status'] == 'completed':
-            # Use actual AI evaluation results
-            total_score = exam_data.get('total_score', 0)
-            max_score = exam_data.get('max_score', len(exam_data.get('questions', [])))
-            percentage = exam_data.get('percentage', 0)
-            total_questions = len(exam_data.get('questions', []))
-            
-            # Calculate average cheat score
-            responses = exam_data.get('responses', [])
-            avg_cheat_score = sum(r.get('cheat_score', 0) for r in responses) / len(responses) if responses else 0
-            
-            results.append({
-                "exam_id": exam_id,
-                "completed_at": exam_data.get('completed_at', datetime.now(IST)).isoformat() if hasattr(exam_data.get('completed_at'), 'isoformat') else str(exam_data.get('completed_at')),
-                "total_score": total_score,
-                "max_score": max_score,
-                "percentage": percentage,
-                "scores": {
-                    "technical_knowledge": total_score * 0.4,
-                    "problem_solving": total_score * 0.3,
-                    "communication": total_score * 0.3
-                },
-                "total_questions": total_questions,
-                "risk_level": exam_data.get('risk_level', 'LOW'),
-                "suspicion_score": avg_cheat_score,
-                "feedback": "Your exam has been evaluated. Great job!" if avg_cheat_score < 3 else "Your performance has been recorded. Please contact your instructor for detailed feedback."
-            })
-    
-    # Also load from MongoDB if available
+    # Completed exams from MongoDB (one page) merged with completed sessions still in memory,
+    # paged alike (as in ExamService.completed_exam_summaries)
+    rows = {}
     try:
-        from app.services.mongo_service import mongo_service
         if mongo_service.is_connected():
-            db_completed = mongo_service.get_completed_exams_by_student(student_id)
+            db_completed = mongo_service.get_completed_exams_by_student(
+                student_id, projection=RESULT_FIELDS, limit=limit, cursor=cursor
+            )
             for exam in db_completed:
-                # Avoid duplicates
-                if not any(r['exam_id'] == exam['exam_id'] for r in results):
-                    total_score = exam.get('total_score', 0)
-                    max_score = exam.get('max_score', len(exam.get('question_scores', [])))
-                    percentage = exam.get('percentage', 0)
-                    total_questions = len(exam.get('question_scores', []))
-                    
-                    # Calculate average cheat score from responses
-                    responses = exam.get('responses', [])
-                    avg_cheat_score = sum(r.get('cheat_score', 0) for r in responses) / len(responses) if responses else 0
-                    
-                    results.append({
-                        "exam_id": exam['exam_id'],
-                        "completed_at": exam.get('completed_at', ''),
-                        "total_score": total_score,
-                        "max_score": max_score,
-                        "percentage": percentage,
-                        "scores": {
-                            "technical_knowledge": total_score * 0.4,
-                            "problem_solving": total_score * 0.3,
-                            "communication": total_score * 0.3
-                        },
-                        "total_questions": total_questions,
-                        "risk_level": exam.get('risk_level', 'LOW'),
-                        "suspicion_score": avg_cheat_score,
-                        "feedback": exam.get('feedback', 'Your exam has been evaluated.')
-                    })
+                rows[exam['exam_id']] = _stored_result(exam)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     except Exception as e:
         print(f"Warning: Could not load completed exams from MongoDB: {e}")
     
+    # In-memory sessions are the freshest copy of exams that are also stored
+    for exam_id, exam_data in exam_service.get_student_exams(student_id, status='completed'):
+        rows[exam_id] = _session_result(exam_id, exam_data)
+    
+    try:
+        results = sort_rows(rows_after(list(rows.values()), COMPLETED_EXAM_SORT, cursor), COMPLETED_EXAM_SORT)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if limit:
+        results = results[:limit]
+    next_cursor = page_cursor(results, COMPLETED_EXAM_SORT, limit)
+    
     print(f"📊 [RESULTS] Returning {len(results)} exam results for student {student_id}")
     for result in results:
         print(f"   Exam {result['exam_id']}: {result['total_score']}/{result['max_score']} ({result['percentage']:.1f}%)")
@@ -440,7 +376,8 @@ def get_my_results(user: dict = Depends(require_role("student"))):
         "student_id": student_id,
         "student_name": student_name,
         "total_exams": len(results),
-        "results": results
+        "results": results,
+        "next_cursor": next_cursor
     }
 
 @router.get("/results/{exam_id}")
@@ -449,11 +386,7 @@ def get_specific_result(exam_id: str, user: dict = Depends(require_role("student
     student_email = user["sub"]
     
     # Find student ID
-    student_id = None
-    for sid, data in exam_service.students.items():
-        if data.get("email") == student_email:
-            student_id = sid
-            break
+    student_id = exam_service.get_student_id_by_email(student_email)
     
     if not student_id:
         raise HTTPException(404, "Student profile not found")
@@ -473,7 +406,6 @@ def get_specific_result(exam_id: str, user: dict = Depends(require_role("student
     else:
         # Check MongoDB for completed exams
         try:
-            from app.services.mongo_service import mongo_service
             if mongo_service.is_connected():
                 completed_exam = mongo_service.get_completed_exam_by_id(exam_id)
                 if completed_exam and completed_exam.get('student_id') == student_id:
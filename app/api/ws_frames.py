@@ -0,0 +1,97 @@
+"""
+Binary frames for the exam WebSockets
+Clients may send audio chunks and webcam frames as binary WebSocket messages instead of base64
+inside JSON: an 8-byte header followed by the raw payload.
+
+    offset 0  uint8   message type (FRAME_AUDIO, FRAME_VIDEO, FRAME_PCM)
+    offset 1  uint8   flags (FLAG_FINAL: last audio chunk of an answer; FLAG_PNG: PNG webcam frame)
+    offset 2  uint16  protocol version (FRAME_VERSION)
+    offset 4  uint32  sequence number, increasing per message type on a connection
+    offset 8  ...     payload (recorder chunk bytes / encoded image / 16-bit mono PCM)
+
+All integers are big-endian. FrameReader turns both forms into the same message dicts, with the
+binary payload as a memoryview ("audio_bytes" / "image_bytes") so it is never copied or re-encoded.
+FRAME_PCM carries raw little-endian PCM at VAD_SAMPLE_RATE, which the server can endpoint itself.
+"""
+from typing import Dict, Optional
+from fastapi import WebSocket, WebSocketDisconnect
+import base64
+import json
+import struct
+
+FRAME_HEADER = struct.Struct("!BBHI")
+FRAME_VERSION = 1
+
+FRAME_AUDIO = 1
+FRAME_VIDEO = 2
+FRAME_PCM = 3
+
+FLAG_FINAL = 0x01
+FLAG_PNG = 0x02
+
+
+def parse_frame(data: bytes) -> Dict:
+    """Message dict for a binary frame (ValueError if it is malformed)"""
+    if len(data) < FRAME_HEADER.size:
+        raise ValueError(f"Binary frame shorter than its {FRAME_HEADER.size}-byte header")
+    frame_type, flags, version, seq = FRAME_HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version {version}")
+    payload = memoryview(data)[FRAME_HEADER.size:]
+    if frame_type in (FRAME_AUDIO, FRAME_PCM):
+        encoding = "pcm" if frame_type == FRAME_PCM else "recorder"
+        return {"type": "voice_chunk", "audio_bytes": payload, "encoding": encoding, "is_final": bool(flags & FLAG_FINAL), "seq": seq}
+    if frame_type == FRAME_VIDEO:
+        return {"type": "video_frame", "image_bytes": payload, "format": "png" if flags & FLAG_PNG else "jpg", "seq": seq}
+    raise ValueError(f"Unknown frame type {frame_type}")
+
+
+def build_frame(frame_type: int, seq: int, payload: bytes, flags: int = 0) -> bytes:
+    """Binary frame for payload (what clients send)"""
+    return FRAME_HEADER.pack(frame_type, flags, FRAME_VERSION, seq) + payload
+
+
+def audio_payload(data: Dict) -> Optional[bytes]:
+    """Audio chunk of a voice_chunk message: the binary payload, or the decoded base64 "audio" field"""
+    if data.get("audio_bytes") is not None:
+        return data["audio_bytes"]
+    return base64.b64decode(data["audio"]) if data.get("audio") else None
+
+
+def image_payload(data: Dict) -> Optional[bytes]:
+    """Image of a video_frame message: the binary payload, or the decoded base64 "image" field"""
+    if data.get("image_bytes") is not None:
+        return data["image_bytes"]
+    return base64.b64decode(data["image"]) if data.get("image") else None
+
+
+class FrameReader:
+    """Receives exam socket messages sent as JSON text or binary frames"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._last_seq: Dict[int, int] = {}
+
+    async def receive(self) -> Dict:
+        """Next message; malformed and repeated binary frames are reported/dropped, not returned"""
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("text") is not None:
+                return json.loads(message["text"])
+
+            try:
+                data = parse_frame(message["bytes"])
+            except ValueError as e:
+                await self.websocket.send_json({"type": "error", "message": str(e)})
+                continue
+            frame_type = message["bytes"][0]
+            last = self._last_seq.get(frame_type)
+            if last is not None and data["seq"] <= last:
+                print(f"⚠️ [WS_FRAMES] Dropping repeated frame {data['seq']} (type {frame_type})")
+                continue
+            if last is not None and data["seq"] != last + 1:
+                print(f"⚠️ [WS_FRAMES] Frames {last + 1}-{data['seq'] - 1} (type {frame_type}) never arrived")
+            self._last_seq[frame_type] = data["seq"]
+            return data
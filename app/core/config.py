@@ -1,17 +1,17 @@
-from pydantic_settings import BaseSettings
-from functools import lru_cache
-
-class Settings(BaseSettings):
-    SECRET_KEY: str
-    GROQ_API_KEY: str
-    ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
-    
-    
-    class Config:
-        env_file = ".env"
-        extra = "ignore"  # This ignores extra fields in .env
-
-@lru_cache()
-def get_settings():
+from pydantic_settings import BaseSettings
+from functools import lru_cache
+
+class Settings(BaseSettings):
+    SECRET_KEY: str
+    GROQ_API_KEY: str
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    
+    
+    class Config:
+        env_file = ".env"
+        extra = "ignore"  # This ignores extra fields in .env
+
+@lru_cache()
+def get_settings():
     return Settings()
\ No newline at end of file
@@ -1,63 +1,71 @@
-from datetime import datetime, timedelta, timezone
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import HTTPException, status
-from app.core.config import get_settings
-
-settings = get_settings()
-
-# Prefer argon2, but fallback to bcrypt if argon2 isn't available on the host
-try:
-    pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-except Exception as e:
-    # argon2 CFFI or platform issues can raise during import/initialization
-    print(f"⚠️ [SECURITY] Could not initialize argon2: {e}. Falling back to bcrypt.")
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# Indian Standard Time
-IST = timezone(timedelta(hours=5, minutes=30))
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    # Truncate password if too long (bcrypt limit workaround)
-    if len(password) > 72:
-        password = password[:72]
-    return pwd_context.hash(password)
-
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token"""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-    
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-
-def decode_token(token: str) -> dict:
-    """Decode and validate JWT token"""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired"
-        )
-    except jwt.InvalidTokenError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
-    except Exception as e:
-        print(f"DEBUG: Token decode error: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from jose import JWTError, jwt
+from passlib.context import CryptContext
+from fastapi import HTTPException, status
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Prefer argon2, but fallback to bcrypt if argon2 isn't available on the host
+try:
+    pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+except Exception as e:
+    # argon2 CFFI or platform issues can raise during import/initialization
+    print(f"⚠️ [SECURITY] Could not initialize argon2: {e}. Falling back to bcrypt.")
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Indian Standard Time
+IST = timezone(timedelta(hours=5, minutes=30))
+
+def to_ist(value) -> Optional[datetime]:
+    """Datetime in IST (naive values, as read back from MongoDB, are UTC); None for non-datetimes"""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(IST)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    """Hash a password"""
+    # Truncate password if too long (bcrypt limit workaround)
+    if len(password) > 72:
+        password = password[:72]
+    return pwd_context.hash(password)
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create JWT access token"""
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.now(timezone.utc) + expires_delta
+    else:
+        expire = datetime.now(timezone.utc) + timedelta(minutes=15)
+    
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def decode_token(token: str) -> dict:
+    """Decode and validate JWT token"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return payload
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired"
+        )
+    except jwt.InvalidTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+    except Exception as e:
+        print(f"DEBUG: Token decode error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
         )
\ No newline at end of file
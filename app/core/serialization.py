@@ -0,0 +1,31 @@
+"""
+JSON encoding for values stored outside the process (e.g. exam sessions in Redis)
+Datetimes round-trip with their timezone, so IST times stay comparable after a reload.
+"""
+from typing import Any
+from datetime import datetime
+import json
+
+_DATETIME_TAG = "$datetime"
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict) -> Any:
+    if len(obj) == 1 and _DATETIME_TAG in obj:
+        return datetime.fromisoformat(obj[_DATETIME_TAG])
+    return obj
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, default=_encode, separators=(",", ":"))
+
+
+def loads(text: str) -> Any:
+    return json.loads(text, object_hook=_decode)
@@ -0,0 +1,292 @@
+"""
+Streaming assembly of recorded answer audio
+A browser MediaRecorder delivers an answer as a series of chunks: the first starts with the WebM
+header (EBML header, Segment, Info, Tracks) and later ones continue its clusters mid-stream, so
+only the first chunk decodes on its own. AudioStreamAssembler parses each chunk once as it
+arrives and keeps the answer as one decodable stream: the header followed by the clusters seen
+since the last take(). Recorders restarted mid-answer (each chunk a complete file) are joined by
+dropping the repeated header and shifting the new clusters' timestamps to follow the earlier ones.
+Only an incomplete element is held back between chunks. Non-WebM audio is concatenated as is.
+"""
+from typing import Optional, Tuple
+import io
+import os
+import wave
+
+# Upper bound on the audio kept for one answer (the transcription API accepts 25 MB)
+AUDIO_STREAM_MAX_BYTES = int(os.getenv("AUDIO_STREAM_MAX_BYTES") or 24 * 1024 * 1024)
+
+# EBML / Matroska element IDs (with their length marker, as they appear in the stream)
+EBML_ID = 0x1A45DFA3
+SEGMENT_ID = 0x18538067
+CLUSTER_ID = 0x1F43B675
+INFO_ID = 0x1549A966
+TRACKS_ID = 0x1654AE6B
+TIMECODE_ID = 0xE7
+SIMPLE_BLOCK_ID = 0xA3
+BLOCK_GROUP_ID = 0xA0
+BLOCK_ID = 0xA1
+
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+_UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+# Segment children kept in the stream header; the rest (SeekHead, Cues, ...) point at offsets that no longer hold
+_HEADER_CHILDREN = (INFO_ID, TRACKS_ID)
+# Level-1 elements: one of these inside a cluster means the cluster has ended
+_LEVEL1_IDS = (
+    CLUSTER_ID, INFO_ID, TRACKS_ID, 0x114D9B74, 0x1C53BB6B, 0x1941A469, 0x1043A770, 0x1254C367, EBML_ID
+)
+# Assumed spacing of blocks (timestamp ticks, 1 ms by default) until two blocks have been seen
+_DEFAULT_BLOCK_GAP = 20
+
+
+# Leading bytes of container formats recorders produce -> file extension the transcriber expects
+_CONTAINER_SIGNATURES = ((EBML_MAGIC, "webm"), (b"OggS", "ogg"), (b"RIFF", "wav"), (b"fLaC", "flac"), (b"ID3", "mp3"))
+
+
+def audio_filename(audio: bytes, stem: str = "answer") -> str:
+    """File name with the extension matching audio's container (MP4 when unrecognised, as Safari records)"""
+    head = bytes(audio[:12])
+    for signature, extension in _CONTAINER_SIGNATURES:
+        if head.startswith(signature):
+            return f"{stem}.{extension}"
+    return f"{stem}.mp4"
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """16-bit mono PCM wrapped in a WAV header"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class AudioStreamError(ValueError):
+    """Chunk data that can't be part of a WebM stream"""
+
+
+def _read_vint(buf, pos: int, keep_marker: bool) -> Optional[Tuple[int, int]]:
+    """(value, length) of the EBML variable-length integer at pos, or None if buf ends first"""
+    if pos >= len(buf):
+        return None
+    first = buf[pos]
+    if first == 0:
+        raise AudioStreamError("Invalid EBML variable-length integer")
+    length = 9 - first.bit_length()
+    if pos + length > len(buf):
+        return None
+    value = first if keep_marker else first & ((1 << (8 - length)) - 1)
+    for byte in buf[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    return value, length
+
+
+def _read_element_header(buf, pos: int) -> Optional[Tuple[int, Optional[int], int]]:
+    """(id, size, header_length) of the element at pos (size None if unknown), or None if incomplete"""
+    element_id = _read_vint(buf, pos, keep_marker=True)
+    if element_id is None:
+        return None
+    size = _read_vint(buf, pos + element_id[1], keep_marker=False)
+    if size is None:
+        return None
+    unknown = size[0] == (1 << (7 * size[1])) - 1
+    return element_id[0], None if unknown else size[0], element_id[1] + size[1]
+
+
+def _uint_element(element_id: int, value: int) -> bytes:
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    return id_bytes + b"\x88" + max(value, 0).to_bytes(8, "big")
+
+
+def _cluster_start(timecode: int) -> bytes:
+    """Cluster of unknown size (as live recorders write them) beginning at timecode"""
+    return CLUSTER_ID.to_bytes(4, "big") + _UNKNOWN_SIZE + _uint_element(TIMECODE_ID, timecode)
+
+
+def _block_timecode(block) -> Optional[int]:
+    """Timecode of a (Simple)Block relative to its cluster"""
+    track = _read_vint(block, 0, keep_marker=False)
+    if track is None or len(block) < track[1] + 2:
+        return None
+    return int.from_bytes(block[track[1]:track[1] + 2], "big", signed=True)
+
+
+class AudioStreamAssembler:
+    """Joins one recording's chunks into a decodable stream, one answer at a time"""
+
+    def __init__(self, max_bytes: int = AUDIO_STREAM_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.format: Optional[str] = None  # "webm" or "raw", from the first chunk
+        self.truncated = False  # chunks were dropped because the answer exceeded max_bytes
+        self._header = b""  # EBML header + Segment + Info + Tracks of the stream
+        self._header_done = False
+        self._buf = bytearray()  # unparsed bytes (at most one incomplete element)
+        self._body = bytearray()  # clusters of the current answer
+        self._blocks = 0  # blocks in the current answer
+        self._in_segment = False
+        self._in_cluster = False
+        self._skip = 0  # bytes left of an element being discarded
+        self._cluster_timecode: Optional[int] = None  # rebased timecode of the current cluster
+        self._offset = 0  # added to cluster timecodes of the current recording
+        self._rebase = False  # a restarted recording's first cluster sets _offset
+        self._last_block: Optional[int] = None  # rebased timestamp of the last block
+        self._block_gap = _DEFAULT_BLOCK_GAP
+
+    @property
+    def size(self) -> int:
+        """Bytes take() would return for the current answer (0 while it has no audio)"""
+        if self.format == "raw":
+            return len(self._body)
+        return len(self._header) + len(self._body) if self._blocks else 0
+
+    def feed(self, chunk: bytes):
+        """Add the next recorder chunk (bytes-like)"""
+        if not chunk:
+            return
+        if self.format is None:
+            # Identify the container once its first four bytes have arrived
+            self._buf += chunk
+            if len(self._buf) < len(EBML_MAGIC):
+                return
+            chunk, self._buf = bytes(self._buf), bytearray()
+            self.format = "webm" if chunk[:4] == EBML_MAGIC else "raw"
+        if len(self._body) + len(self._buf) + len(chunk) > self.max_bytes:
+            if not self.truncated:
+                print(f"⚠️ [AUDIO_STREAM] Answer audio exceeds {self.max_bytes} bytes; dropping further chunks")
+            self.truncated = True
+            return
+        if self.format == "raw":
+            self._body += chunk
+            return
+        self._buf += chunk
+        consumed = self._parse()
+        del self._buf[:consumed]
+
+    def take(self) -> bytes:
+        """The current answer as one stream (b"" if it has no audio); later chunks start the next answer"""
+        if self.format == "raw":
+            data = bytes(self._body)
+            self._body = bytearray()
+        elif not self._blocks:
+            return b""
+        else:
+            data = self._header + bytes(self._body)
+            self._body = bytearray()
+            self._blocks = 0
+            if self._in_cluster and self._cluster_timecode is not None:
+                # The rest of the current cluster belongs to the next answer
+                self._body += _cluster_start(self._cluster_timecode)
+        self.truncated = False
+        return data
+
+    # -------- WebM parsing --------
+    def _parse(self) -> int:
+        """Parse as many complete elements of _buf as possible; returns the bytes consumed"""
+        buf = self._buf
+        pos = 0
+        while pos < len(buf):
+            if self._skip:
+                skipped = min(self._skip, len(buf) - pos)
+                self._skip -= skipped
+                pos += skipped
+                continue
+
+            header = _read_element_header(buf, pos)
+            if header is None:
+                break
+            element_id, size, header_length = header
+            if size is not None and size > self.max_bytes:
+                raise AudioStreamError(f"WebM element of {size} bytes exceeds the answer limit")
+
+            if element_id == SEGMENT_ID:
+                # Entered, not read whole: its children follow
+                self._in_segment = True
+                self._in_cluster = False
+                if not self._header_done:
+                    self._header += SEGMENT_ID.to_bytes(4, "big") + _UNKNOWN_SIZE
+                pos += header_length
+                continue
+
+            if element_id == CLUSTER_ID:
+                self._in_cluster = True
+                self._cluster_timecode = None
+                if not self._header_done:
+                    self._header_done = True
+                pos += header_length
+                continue
+
+            if self._in_cluster and element_id in _LEVEL1_IDS:
+                self._in_cluster = False
+
+            if size is None:
+                raise AudioStreamError(f"Unsupported element 0x{element_id:X} of unknown size")
+            end = pos + header_length + size
+            if end > len(buf):
+                # Discard large elements we don't keep without waiting for all of them
+                if not self._keeps(element_id):
+                    self._skip = end - len(buf)
+                    pos = len(buf)
+                break
+            self._element(element_id, buf[pos:end], buf[pos + header_length:end])
+            pos = end
+        return pos
+
+    def _keeps(self, element_id: int) -> bool:
+        if self._in_cluster:
+            return element_id in (TIMECODE_ID, SIMPLE_BLOCK_ID, BLOCK_GROUP_ID)
+        return element_id == EBML_ID or (not self._header_done and element_id in _HEADER_CHILDREN)
+
+    def _element(self, element_id: int, element, payload):
+        if element_id == EBML_ID:
+            self._start_recording(bytes(element))
+        elif not self._in_cluster:
+            if not self._header_done and element_id in _HEADER_CHILDREN:
+                self._header += element
+        elif element_id == TIMECODE_ID:
+            timecode = int.from_bytes(payload, "big")
+            if self._rebase:
+                # Continue right after the last block of the previous recording
+                self._offset = (self._last_block or 0) + self._block_gap - timecode
+                self._rebase = False
+            self._cluster_timecode = timecode + self._offset
+            self._body += _cluster_start(self._cluster_timecode)
+        elif element_id in (SIMPLE_BLOCK_ID, BLOCK_GROUP_ID) and self._cluster_timecode is not None:
+            self._body += element
+            self._blocks += 1
+            block = payload if element_id == SIMPLE_BLOCK_ID else self._block_of(payload)
+            relative = _block_timecode(block) if block is not None else None
+            if relative is not None:
+                timestamp = self._cluster_timecode + relative
+                if self._last_block is not None and timestamp > self._last_block:
+                    self._block_gap = timestamp - self._last_block
+                self._last_block = max(timestamp, self._last_block or timestamp)
+
+    @staticmethod
+    def _block_of(group):
+        pos = 0
+        while pos < len(group):
+            header = _read_element_header(group, pos)
+            if header is None or header[1] is None:
+                return None
+            element_id, size, header_length = header
+            if element_id == BLOCK_ID:
+                return group[pos + header_length:pos + header_length + size]
+            pos += header_length + size
+        return None
+
+    def _start_recording(self, ebml_header: bytes):
+        """An EBML header: the stream's first, or a recorder restarted with a complete file per chunk"""
+        self._in_segment = False
+        self._in_cluster = False
+        if not self._blocks:
+            # Nothing kept for this answer yet: the new recording starts a fresh stream
+            self._header = ebml_header
+            self._header_done = False
+            self._body = bytearray()
+            self._offset = 0
+            self._rebase = False
+            self._last_block = None
+        else:
+            self._rebase = True
@@ -1,3 +1,3 @@
-def send_password_reset_email(*args, **kwargs):
-    """Password reset email functionality has been removed."""
-    raise RuntimeError("password reset feature disabled")
+def send_password_reset_email(*args, **kwargs):
+    """Password reset email functionality has been removed."""
+    raise RuntimeError("password reset feature disabled")
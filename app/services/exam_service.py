@@ -1,22 +1,53 @@
-from typing import Dict, List
-from datetime import datetime, timedelta
-from app.core.security import IST
+from typing import Dict, List, Tuple
+from datetime import datetime, timedelta, timezone
+from app.core.security import IST, to_ist
 from app.services.cheat_detector import CheatDetector
-from app.services.grok_service import GrokExamService
-from app.services.mongo_service import mongo_service
-import pdfplumber
+from app.services.grok_service import GrokExamService, AsyncGrokExamService
+from app.services.mongo_service import (
+    mongo_service, async_mongo_service, page_cursor, rows_after, sort_rows, matches_results, COMPLETED_EXAM_SORT
+)
+from app.services.pdf_ingest import pdf_ingest_service
+from app.services.pdf_retrieval import select_relevant_text
+from app.services.write_behind import write_behind
+from app.services.session_store import (
+    SessionConflict, create_session_store,
+    SESSION_COMPLETED_GRACE_SECONDS, SESSION_IDLE_TIMEOUT_MINUTES, SESSION_SWEEP_SECONDS
+)
+from concurrent.futures import ThreadPoolExecutor, wait
+import asyncio
 import os
+import time
+
+# Answer grading: max evaluate_answer calls in flight per exam, and the time budget
+# after which still-pending questions get the basic fallback evaluation
+GRADING_CONCURRENCY = int(os.getenv("GRADING_CONCURRENCY") or 8)
+GRADING_DEADLINE_SECONDS = float(os.getenv("GRADING_DEADLINE_SECONDS") or 30)
+# "parallel" sends one evaluation request per question; "batch" grades the whole exam
+# in a single completion and re-grades only the questions whose block failed to parse
+GRADING_MODE = os.getenv("GRADING_MODE") or "parallel"
+# Share of the grading deadline the batch completion may use; the rest is left for
+# grading individually the questions a failed or timed-out batch didn't cover
+GRADING_BATCH_SHARE = float(os.getenv("GRADING_BATCH_SHARE") or 0.5)
 
 class ExamService:
     def __init__(self):
-        self.students: Dict = {}
-        self.exam_schedules: Dict = {}
-        self.active_exams: Dict = {}
-        self.pdf_exams: Dict = {}  # Store PDF exam metadata: exam_id -> exam_data
-        self.student_pdf_exams: Dict = {}  # Store student_id -> [exam_ids] for quick lookup
-        self.completed_pdf_exams: Dict = {}  # Track completed PDF exams: exam_id -> completion_data
+        # exam_id -> session, indexed by student and status; completed/abandoned sessions are evicted.
+        # Shared between workers with SESSION_STORE_BACKEND=redis, so changes must go through update_exam
+        self.active_exams = create_session_store()
+        # Kept on the same backend, so every worker sees them. Records read from a Redis-backed map
+        # are copies: a changed record (or index list) must be assigned back
+        self.students = self.active_exams.record_map("students")
+        self.students_by_email = self.active_exams.record_map("students_by_email")  # Secondary index: email -> student_id
+        self.exam_schedules = self.active_exams.record_map("exam_schedules")
+        self.pdf_exams = self.active_exams.record_map("pdf_exams")  # Store PDF exam metadata: exam_id -> exam_data
+        self.student_pdf_exams = self.active_exams.record_map("student_pdf_exams")  # student_id -> [exam_ids] not yet completed
+        self.completed_pdf_exams = self.active_exams.record_map("completed_pdf_exams")  # exam_id -> completion_data
+        self.student_completed_pdf_exams = self.active_exams.record_map("student_completed_pdf_exams")  # student_id -> [exam_ids]
+        self.pregenerated_questions: Dict = {}  # Questions generated before the exam window: key -> entry
+        self._session_sweeper = None  # asyncio task evicting finished sessions
         self.cheat_detector = CheatDetector()
         self.grok_service = GrokExamService()
+        self.async_grok_service = AsyncGrokExamService()
 
         # Load persisted data from MongoDB if available
         self._load_from_db()
@@ -35,50 +66,273 @@ class ExamService:
                         doc['technologies'] = doc['project_details']['technologies']
                         doc['metrics'] = doc['project_details']['metrics']
                         del doc['project_details']
-                    self.students[doc['student_id']] = doc
+                    # Another worker may have loaded (and since changed) it already
+                    if doc['student_id'] not in self.students:
+                        self.cache_student(doc)
                 print(f"Loaded {len(student_docs)} students from MongoDB")
 
                 # Load completed PDF exams first to prevent them from appearing in upcoming exams
-                completed_pdf_docs = mongo_service.get_all_completed_pdf_exams()
+                completed_pdf_docs = mongo_service.get_all_completed_pdf_exams(
+                    projection=['exam_id', 'student_id', 'completed_at', 'pdf_metadata.exam_id', 'pdf_metadata.exam_name']
+                )
                 for doc in completed_pdf_docs:
                     exam_id = doc.get('exam_id') or doc.get('pdf_metadata', {}).get('exam_id')
-                    if exam_id:
-                        self.completed_pdf_exams[exam_id] = {
+                    if exam_id and exam_id not in self.completed_pdf_exams:
+                        self._mark_pdf_exam_completed({
                             'exam_id': exam_id,
                             'student_id': doc['student_id'],
                             'completed_at': doc.get('completed_at', ''),
                             'exam_name': doc.get('pdf_metadata', {}).get('exam_name', 'PDF Exam')
-                        }
+                        })
                 print(f"Loaded {len(completed_pdf_docs)} completed PDF exams from MongoDB")
 
                 # Load PDF exams and rebuild mappings, excluding completed ones
                 pdf_docs = mongo_service.get_all_pdf_exams()
                 for doc in pdf_docs:
                     exam_id = doc['exam_id']
-                    student_id = doc['student_id']
+                    if exam_id in self.pdf_exams:
+                        continue
                     self.pdf_exams[exam_id] = doc
                     # Only add to student_pdf_exams if not completed
                     if exam_id not in self.completed_pdf_exams:
-                        if student_id not in self.student_pdf_exams:
-                            self.student_pdf_exams[student_id] = []
-                        self.student_pdf_exams[student_id].append(exam_id)
+                        self._index_pdf_exam(doc['student_id'], exam_id)
                 print(f"Loaded {len(pdf_docs)} PDF exams from MongoDB")
                 
-                # Load exam schedules
-                # Since we don't have get_all_schedules, we can skip for now or add later
+                # Load exam schedules (stored as naive UTC; compared against IST times)
+                schedule_docs = mongo_service.get_all_exam_schedules()
+                for doc in schedule_docs:
+                    for field in ('start_time', 'end_time'):
+                        if isinstance(doc.get(field), datetime) and doc[field].tzinfo is None:
+                            doc[field] = doc[field].replace(tzinfo=timezone.utc).astimezone(IST)
+                    if doc['student_id'] not in self.exam_schedules:
+                        self.exam_schedules[doc['student_id']] = doc
+                print(f"Loaded {len(schedule_docs)} exam schedules from MongoDB")
         except Exception as e:
             print(f"Warning: Could not load data from MongoDB: {e}")
 
     def register_student(self, student_data: Dict):
         """Register a new student"""
         # Store in in-memory cache
-        self.students[student_data['student_id']] = student_data
-        # Persist to MongoDB if available
-        try:
-            mongo_service.create_student(student_data)
-        except Exception:
-            pass
+        self.cache_student(student_data)
+        # Persist to MongoDB (written in the background)
+        write_behind.upsert("students", "student_id", student_data)
     
+    # -------- Student lookup --------
+    def cache_student(self, student_data: Dict):
+        """Add or replace a student in the in-memory cache, keeping the email index consistent"""
+        student_id = student_data['student_id']
+        previous = self.students.get(student_id)
+        if previous and previous.get('email') != student_data.get('email'):
+            self._unindex_email(previous.get('email'), student_id)
+        self.students[student_id] = student_data
+        if student_data.get('email'):
+            self.students_by_email[student_data['email']] = student_id
+
+    def remove_student(self, student_id: str) -> Dict:
+        """Drop a student from the in-memory cache (and the email index)"""
+        student = self.students.pop(student_id, None)
+        if student:
+            self._unindex_email(student.get('email'), student_id)
+        return student
+
+    def rename_student(self, old_student_id: str, new_student_id: str) -> Dict:
+        """Re-key a cached student under a new student_id"""
+        student = self.remove_student(old_student_id)
+        student['student_id'] = new_student_id
+        self.cache_student(student)
+        return student
+
+    def _unindex_email(self, email: str, student_id: str):
+        # Only drop the entry if it still points at this student
+        if email and self.students_by_email.get(email) == student_id:
+            del self.students_by_email[email]
+
+    def get_student_id_by_email(self, email: str) -> str:
+        """student_id of the cached student with this email, or None"""
+        return self.students_by_email.get(email)
+
+    def get_student_by_email(self, email: str) -> Dict:
+        """Cached student with this email, or None"""
+        student_id = self.students_by_email.get(email)
+        return self.students.get(student_id) if student_id else None
+
+    # -------- Exam session indexes --------
+    def add_active_exam(self, exam_id: str, exam_data: Dict):
+        """Register an exam session, indexing it by student and status"""
+        self.active_exams.put(exam_id, exam_data)
+
+    def remove_active_exam(self, exam_id: str) -> Dict:
+        return self.active_exams.remove(exam_id)
+
+    def update_exam(self, exam_id: str, fn):
+        """Apply fn to a session without losing concurrent changes; returns fn's result"""
+        return self.active_exams.update(exam_id, fn)
+
+    async def _in_store(self, fn, *args):
+        """Run fn(*args), which uses the session store or record maps, in a thread when they block (Redis)"""
+        if self.active_exams.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def get_student_async(self, student_id: str) -> Dict:
+        """The student, or None; for async handlers"""
+        return await self._in_store(self.students.get, student_id)
+
+    async def get_student_by_email_async(self, email: str) -> Dict:
+        return await self._in_store(self.get_student_by_email, email)
+
+    async def get_exam_async(self, exam_id: str) -> Dict:
+        """The exam session, or None; for async handlers"""
+        return await self._in_store(self.active_exams.get, exam_id)
+
+    async def update_exam_async(self, exam_id: str, fn):
+        """Async variant of update_exam"""
+        return await self._in_store(self.update_exam, exam_id, fn)
+
+    async def touch_exam_async(self, exam_id: str):
+        await self._in_store(self.touch_exam, exam_id)
+
+    async def add_active_exam_async(self, exam_id: str, exam_data: Dict):
+        await self._in_store(self.add_active_exam, exam_id, exam_data)
+
+    def reassign_student_exams(self, old_student_id: str, new_student_id: str) -> int:
+        """Move a student's exam sessions to a new student_id; returns how many moved"""
+        return self.active_exams.reassign_student(old_student_id, new_student_id)
+
+    def migrate_student_id(self, old_student_id: str, new_student_id: str) -> Dict[str, int]:
+        """
+        Re-key everything cached for a student under a new student_id, touching only that student's
+        entries (via the per-student indexes). Returns {kind: entries moved}; migrating back undoes it.
+        """
+        moved = {"students": 0, "exam_schedules": 0, "pdf_exams": 0, "completed_pdf_exams": 0, "sessions": 0}
+        if old_student_id in self.students:
+            self.rename_student(old_student_id, new_student_id)
+            moved["students"] = 1
+
+        schedule = self.exam_schedules.pop(old_student_id, None)
+        if schedule is not None:
+            schedule["student_id"] = new_student_id
+            self.exam_schedules[new_student_id] = schedule
+            moved["exam_schedules"] = 1
+
+        pdf_exam_ids = self.student_pdf_exams.pop(old_student_id, None)
+        if pdf_exam_ids is not None:
+            for exam_id in pdf_exam_ids:
+                self._reassign_record(self.pdf_exams, exam_id, new_student_id)
+            self.student_pdf_exams[new_student_id] = self.student_pdf_exams.get(new_student_id, []) + pdf_exam_ids
+            moved["pdf_exams"] = len(pdf_exam_ids)
+
+        completed_ids = self.student_completed_pdf_exams.pop(old_student_id, [])
+        for exam_id in completed_ids:
+            self._reassign_record(self.completed_pdf_exams, exam_id, new_student_id)
+            # Completed PDF exams drop out of student_pdf_exams but keep their metadata
+            self._reassign_record(self.pdf_exams, exam_id, new_student_id)
+        if completed_ids:
+            existing = self.student_completed_pdf_exams.get(new_student_id, [])
+            self.student_completed_pdf_exams[new_student_id] = existing + [i for i in completed_ids if i not in existing]
+        moved["completed_pdf_exams"] = len(completed_ids)
+
+        moved["sessions"] = self.reassign_student_exams(old_student_id, new_student_id)
+        return moved
+
+    @staticmethod
+    def _reassign_record(records, key: str, new_student_id: str):
+        record = records.get(key)
+        if record is not None:
+            record["student_id"] = new_student_id
+            records[key] = record
+
+    def _mark_pdf_exam_completed(self, entry: Dict):
+        exam_id = entry['exam_id']
+        previous = self.completed_pdf_exams.get(exam_id)
+        if previous:
+            self._unindex(self.student_completed_pdf_exams, previous['student_id'], exam_id)
+        self.completed_pdf_exams[exam_id] = entry
+        completed_ids = self.student_completed_pdf_exams.get(entry['student_id'], [])
+        if exam_id not in completed_ids:
+            self.student_completed_pdf_exams[entry['student_id']] = completed_ids + [exam_id]
+
+    def _index_pdf_exam(self, student_id: str, exam_id: str):
+        exam_ids = self.student_pdf_exams.get(student_id, [])
+        if exam_id not in exam_ids:
+            self.student_pdf_exams[student_id] = exam_ids + [exam_id]
+
+    @staticmethod
+    def _unindex(index, student_id: str, exam_id: str):
+        """Drop exam_id from a student's list in a per-student index"""
+        exam_ids = index.get(student_id)
+        if exam_ids and exam_id in exam_ids:
+            exam_ids.remove(exam_id)
+            index[student_id] = exam_ids
+
+    def get_student_exams(self, student_id: str, status: str = None) -> List[Tuple[str, Dict]]:
+        """(exam_id, exam) pairs of a student's sessions, optionally only those with status"""
+        exams = self._get_exams(self.active_exams.ids_for_student(student_id))
+        return [(exam_id, exam) for exam_id, exam in exams if status is None or exam['status'] == status]
+
+    def get_exams_by_status(self, status: str) -> List[Tuple[str, Dict]]:
+        return self._get_exams(self.active_exams.ids_with_status(status))
+
+    def _get_exams(self, exam_ids: List[str]) -> List[Tuple[str, Dict]]:
+        # Sessions can be removed by another worker between reading an index and the session
+        exams = ((exam_id, self.active_exams.get(exam_id)) for exam_id in exam_ids)
+        return [(exam_id, exam) for exam_id, exam in exams if exam is not None]
+
+    def count_exams_by_status(self, status: str) -> int:
+        return self.active_exams.count_with_status(status)
+
+    def completed_exam_summaries(self, match: Dict = None, sort: List = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> Tuple[List[Dict], str]:
+        """
+        Summary rows of completed exams from MongoDB (aggregated there) merged with completed
+        sessions not yet persisted, filtered, sorted and paged alike: (rows, next_cursor)
+        """
+        match = match or {}
+        try:
+            stored = mongo_service.completed_exam_summaries(match, sort, limit, cursor)
+        except ValueError:
+            raise
+        except Exception as e:
+            # Serve the sessions still in memory rather than nothing
+            print(f"Warning: Could not load completed exams from MongoDB: {e}")
+            stored = None
+        rows = {row['exam_id']: row for row in stored or []}
+        # Persisted sessions are already among the database rows (when they could be read)
+        for exam_id, exam in self.get_exams_by_status('completed'):
+            if exam_id in rows or (stored is not None and self._is_stored(exam_id, exam)):
+                continue
+            row = self._completed_exam_summary(exam_id, exam)
+            if matches_results(row, match):
+                rows[exam_id] = row
+        page = sort_rows(rows_after(list(rows.values()), sort, cursor), sort)
+        if limit:
+            page = page[:limit]
+        for row in page:
+            row['student_name'] = self.students.get(row['student_id'], {}).get('name', 'Unknown')
+        return page, page_cursor(page, sort, limit)
+
+    def _completed_exam_summary(self, exam_id: str, exam: Dict) -> Dict:
+        """Summary row of a completed session, matching MongoService.completed_exam_summaries"""
+        responses = exam.get('responses', [])
+        completed_at = exam.get('completed_at')
+        return {
+            "exam_id": exam_id,
+            "student_id": exam['student_id'],
+            "completed_at": completed_at.isoformat() if hasattr(completed_at, 'isoformat') else completed_at,
+            "total_score": exam.get('total_score', 0),
+            "max_score": exam.get('max_score', len(exam.get('questions', []))),
+            "percentage": exam.get('percentage', 0),
+            "suspicion_score": sum(r.get('cheat_score', 0) for r in responses) / len(responses) if responses else 0,
+            "risk_level": exam.get('risk_level', 'LOW'),
+            "total_questions": len(exam.get('questions', []))
+        }
+
+    def touch_exam(self, exam_id: str):
+        """Record activity on an exam session so it isn't expired as idle"""
+        self.active_exams.touch(exam_id)
+
+    def has_exam_in_progress(self, student_id: str) -> bool:
+        return any(exam['status'] == 'in_progress' for _, exam in self.get_student_exams(student_id))
+
     def schedule_exam(self, student_id: str, start_time: datetime, duration_minutes: int):
         """Schedule an exam for a student"""
         end_time = start_time + timedelta(minutes=duration_minutes)
@@ -92,11 +346,8 @@ class ExamService:
         
         self.exam_schedules[student_id] = schedule_data
         
-        # Persist to MongoDB
-        try:
-            mongo_service.create_exam_schedule(schedule_data)
-        except Exception as e:
-            print(f"Warning: Could not persist exam schedule to DB: {e}")
+        # Persist to MongoDB (written in the background)
+        write_behind.upsert("exam_schedules", "student_id", schedule_data)
     
     def can_start_exam(self, student_id: str, exam_id: str = None) -> tuple[bool, str]:
         """Check if student can start exam now"""
@@ -135,17 +386,16 @@ class ExamService:
                     return False, "Exam window has closed"
             
             # Check if already in progress
-            for exam in self.active_exams.values():
-                if exam['student_id'] == student_id and exam['status'] == 'in_progress':
-                    return False, "Exam already in progress"
+            if self.has_exam_in_progress(student_id):
+                return False, "Exam already in progress"
             return True, "OK"
         
         # Check for scheduled project exam
-        if student_id not in self.exam_schedules:
+        schedule = self.exam_schedules.get(student_id)
+        if schedule is None:
             return False, "Exam not scheduled"
         
         now = datetime.now(IST)
-        schedule = self.exam_schedules[student_id]
         
         if now < schedule['start_time']:
             return False, "Exam has not started yet"
@@ -154,11 +404,13 @@ class ExamService:
             return False, "Exam window has closed"
         
         # Check if already in progress
-        for exam in self.active_exams.values():
-            if exam['student_id'] == student_id and exam['status'] == 'in_progress':
-                return False, "Exam already in progress"
+        if self.has_exam_in_progress(student_id):
+            return False, "Exam already in progress"
         
         return True, "OK"
+
+    async def can_start_exam_async(self, student_id: str, exam_id: str = None) -> tuple[bool, str]:
+        return await self._in_store(self.can_start_exam, student_id, exam_id)
     
     def start_exam(self, student_id: str, exam_data: Dict = None) -> Dict:
         """Start a new exam session with text questions based on project or PDF content"""
@@ -166,173 +418,277 @@ class ExamService:
             exam_id = f"exam_{student_id}_{int(datetime.now(IST).timestamp())}"
 
             student = self.students[student_id]
-        
-            # Check if this is a PDF exam
-            pdf_content = None
-            is_pdf_exam = False
-            pdf_metadata = None
-
-            # First check if PDF content is provided directly in exam_data
-            if exam_data and exam_data.get('pdf_content'):
-                pdf_content = exam_data['pdf_content']
-                is_pdf_exam = True
-                pdf_metadata = exam_data
-                print(f"✅ [START_EXAM] Using provided PDF content ({len(pdf_content)} chars)")
-
-            # Otherwise, try to extract from PDF file
-            elif exam_data and exam_data.get('type') == 'pdf' and exam_data.get('exam_id'):
-                pdf_exam_id = exam_data['exam_id']
-                if pdf_exam_id in self.pdf_exams:
-                    pdf_meta = self.pdf_exams[pdf_exam_id]
-                    is_pdf_exam = True
-                    pdf_metadata = pdf_meta
-                    # Extract PDF content
-                    pdf_path = pdf_meta.get('pdf_path')
-                    if pdf_path:
-                        # Ensure absolute path from project root
-                        if not os.path.isabs(pdf_path):
-                            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                            pdf_path = os.path.join(project_root, pdf_path)
-                        if os.path.exists(pdf_path):
-                            try:
-                                with pdfplumber.open(pdf_path) as pdf:
-                                    pdf_content = ""
-                                    for page in pdf.pages:
-                                        page_text = page.extract_text()
-                                        if page_text:
-                                            pdf_content += page_text + "\n"
-                                    print(f"✅ [START_EXAM] Extracted {len(pdf_content)} chars from PDF")
-                            except Exception as e:
-                                print(f"❌ [START_EXAM] Error extracting PDF content: {e}")
-                                pdf_content = None
-                        else:
-                            print(f"❌ [START_EXAM] PDF file not found: {pdf_path}")
-                    else:
-                        print(f"❌ [START_EXAM] No PDF path in metadata")
-
-            # If no exam_data provided but PDF exams available, use the first available PDF exam
-            elif not exam_data:
-                pdf_exams = self.get_all_pdf_exams_for_student(student_id)
-                if pdf_exams:
-                    pdf_meta = pdf_exams[0]  # Use first available
-                    pdf_exam_id = pdf_meta['exam_id']
-                    is_pdf_exam = True
-                    pdf_metadata = pdf_meta
-                    # Extract PDF content
-                    pdf_path = pdf_meta.get('pdf_path')
-                    if pdf_path:
-                        # Ensure absolute path from project root
-                        if not os.path.isabs(pdf_path):
-                            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                            pdf_path = os.path.join(project_root, pdf_path)
-                        if os.path.exists(pdf_path):
-                            try:
-                                with pdfplumber.open(pdf_path) as pdf:
-                                    pdf_content = ""
-                                    for page in pdf.pages:
-                                        page_text = page.extract_text()
-                                        if page_text:
-                                            pdf_content += page_text + "\n"
-                                    print(f"✅ [START_EXAM] Extracted {len(pdf_content)} chars from PDF")
-                            except Exception as e:
-                                print(f"❌ [START_EXAM] Error extracting PDF content: {e}")
-                                pdf_content = None
-                        else:
-                            print(f"❌ [START_EXAM] PDF file not found: {pdf_path}")
-                    else:
-                        print(f"❌ [START_EXAM] No PDF path in metadata")
-                    pdf_meta = self.pdf_exams[pdf_exam_id]
-                    # Extract PDF content
-                    pdf_path = pdf_meta.get('pdf_path')
-                    if pdf_path:
-                        # Ensure absolute path from project root
-                        if not os.path.isabs(pdf_path):
-                            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                            pdf_path = os.path.join(project_root, pdf_path)
-                        if os.path.exists(pdf_path):
-                            try:
-                                with pdfplumber.open(pdf_path) as pdf:
-                                    pdf_content = ""
-                                    for page in pdf.pages:
-                                        page_text = page.extract_text()
-                                        if page_text:
-                                            pdf_content += page_text + "\n"
-                                    print(f"✅ [START_EXAM] Extracted {len(pdf_content)} chars from PDF")
-                            except Exception as e:
-                                print(f"❌ [START_EXAM] Error extracting PDF content: {e}")
-                                pdf_content = None
-                        else:
-                            print(f"❌ [START_EXAM] PDF file not found: {pdf_path}")
-                    else:
-                        print(f"❌ [START_EXAM] No PDF path in metadata")
-
-            # If PDF content extraction failed, create fallback content for PDF exams
-            if is_pdf_exam and not pdf_content:
-                exam_name = pdf_metadata.get('exam_name', 'the subject') if pdf_metadata else 'the subject'
-                pdf_content = f"This is a PDF-based examination about {exam_name}. The exam covers important concepts and topics related to {exam_name}. Students are expected to demonstrate their understanding of the key principles and applications discussed in the material."
-                print(f"⚠️ [START_EXAM] Using fallback PDF content for {exam_name}")
-
-            # Generate questions
-            questions = self.grok_service.generate_exam_questions(
-                exam_id=exam_id,
-                project_details={
-                    'title': student.get('project_title', 'Project'),
-                    'description': student.get('project_description', 'Project description'),
-                    'technologies': student.get('technologies', []),
-                    'metrics': student.get('metrics', [])
-                },
-                pdf_content=pdf_content,
-                num_questions=8
+            is_pdf_exam, pdf_metadata = self._resolve_pdf_exam(student_id, exam_data)
+
+            # Use questions generated ahead of the exam window, else generate them now
+            questions = self._take_pregenerated_questions(student_id, pdf_metadata)
+            if not questions:
+                pdf_content = self._load_exam_content(exam_data, is_pdf_exam, pdf_metadata)
+                questions = self.grok_service.generate_exam_questions(
+                    exam_id=exam_id,
+                    project_details=self._project_details(student),
+                    pdf_content=pdf_content,
+                    num_questions=8,
+                    instruction=pdf_metadata.get('instruction') if pdf_metadata else None
+                )
+
+            return self._create_exam_session(exam_id, student_id, student, questions, is_pdf_exam, pdf_metadata)
+        except Exception:
+            self._log_start_exam_failure(student_id, exam_data)
+            # Re-raise to be handled by route (which will log and return 500)
+            raise
+
+    async def start_exam_async(self, student_id: str, exam_data: Dict = None) -> Dict:
+        """Async variant of start_exam: question generation doesn't block the event loop"""
+        try:
+            exam_id = f"exam_{student_id}_{int(datetime.now(IST).timestamp())}"
+
+            student, (is_pdf_exam, pdf_metadata) = await self._in_store(
+                lambda: (self.students[student_id], self._resolve_pdf_exam(student_id, exam_data))
             )
 
-            exam_data_to_store = {
-                "exam_id": exam_id,
-                "student_id": student_id,
-                "start_time": datetime.now(IST),
-                "status": "in_progress",
-                "questions": questions,
-                "current_question_index": 0,
-                "answers": {},
-                "responses": [],
-                "cheat_indicators": [],
-                "is_pdf_exam": is_pdf_exam,
-                "pdf_metadata": pdf_metadata
-            }
+            # Use questions generated ahead of the exam window, else generate them now
+            questions = await self._take_pregenerated_questions_async(student_id, pdf_metadata)
+            if not questions:
+                questions = await self._generate_questions_async(exam_id, student, exam_data, is_pdf_exam, pdf_metadata)
 
-            self.active_exams[exam_id] = exam_data_to_store
+            return await self._in_store(
+                self._create_exam_session, exam_id, student_id, student, questions, is_pdf_exam, pdf_metadata
+            )
+        except Exception:
+            self._log_start_exam_failure(student_id, exam_data)
+            raise
 
-            # Get first question
-            first_question_data = questions[0]
-            first_question = first_question_data["question"]
-            if first_question_data["type"] == "mcq":
-                options_text = "\n".join([f"{chr(65+i)}) {opt}" for i, opt in enumerate(first_question_data["options"])])
-                first_question = f"{first_question}\n\n{options_text}"
+    async def _generate_questions_async(self, exam_id: str, student: Dict, exam_data: Dict, is_pdf_exam: bool, pdf_metadata: Dict) -> List[Dict]:
+        if is_pdf_exam and pdf_metadata and pdf_metadata.get('document_id'):
+            # Read the document through Motor; the content load below then finds it in memory
+            await pdf_ingest_service.get_document_async(pdf_metadata['document_id'])
+        pdf_content = await asyncio.to_thread(self._load_exam_content, exam_data, is_pdf_exam, pdf_metadata)
+        return await self.async_grok_service.generate_exam_questions(
+            exam_id=exam_id,
+            project_details=self._project_details(student),
+            pdf_content=pdf_content,
+            num_questions=8,
+            instruction=pdf_metadata.get('instruction') if pdf_metadata else None
+        )
 
-            return {
-                "exam_id": exam_id,
-                "first_question": first_question,
-                "student_name": student['name']
-            }
-        except Exception as e:
-            import traceback, json
-            print(f"❌ [EXAM_SERVICE] Exception in start_exam for student_id={student_id}")
-            try:
-                print(f"  exam_data keys: {list(exam_data.keys()) if isinstance(exam_data, dict) else exam_data}")
-            except Exception:
-                pass
+    def _resolve_pdf_exam(self, student_id: str, exam_data: Dict = None) -> Tuple[bool, Dict]:
+        """Work out whether this is a PDF exam and which one: (is_pdf_exam, pdf_metadata)"""
+        # PDF content provided directly in exam_data
+        if exam_data and exam_data.get('pdf_content'):
+            return True, exam_data
+
+        # A scheduled PDF exam, by id
+        if exam_data and exam_data.get('type') == 'pdf' and exam_data.get('exam_id'):
+            pdf_exam = self.pdf_exams.get(exam_data['exam_id'])
+            if pdf_exam is not None:
+                return True, pdf_exam
+            return False, None
+
+        # If no exam_data provided but PDF exams available, use the first available PDF exam
+        if not exam_data:
+            pdf_exams = self.get_all_pdf_exams_for_student(student_id)
+            if pdf_exams:
+                return True, pdf_exams[0]  # Use first available
+
+        return False, None
+
+    def _load_exam_content(self, exam_data: Dict, is_pdf_exam: bool, pdf_metadata: Dict) -> str:
+        """PDF text to generate questions from (None for project exams)"""
+        if not is_pdf_exam:
+            return None
+
+        pdf_content = None
+        # First check if PDF content is provided directly in exam_data
+        if exam_data and exam_data.get('pdf_content'):
+            # Raw text has no stored index: narrow it to the parts relevant to the instruction
+            pdf_content = select_relevant_text(exam_data['pdf_content'], pdf_metadata.get('instruction') or "")
+            print(f"✅ [START_EXAM] Using provided PDF content ({len(pdf_content)} of {len(exam_data['pdf_content'])} chars)")
+        # Otherwise, use the text extracted when the PDF was uploaded
+        else:
+            pdf_content = self._get_pdf_exam_content(pdf_metadata)
+
+        # If PDF content extraction failed, create fallback content for PDF exams
+        if not pdf_content:
+            exam_name = pdf_metadata.get('exam_name', 'the subject') if pdf_metadata else 'the subject'
+            pdf_content = f"This is a PDF-based examination about {exam_name}. The exam covers important concepts and topics related to {exam_name}. Students are expected to demonstrate their understanding of the key principles and applications discussed in the material."
+            print(f"⚠️ [START_EXAM] Using fallback PDF content for {exam_name}")
+
+        return pdf_content
+
+    def _get_pdf_exam_content(self, pdf_meta: Dict) -> str:
+        """Retrieved text of a PDF exam's document (no PDF parsing on the exam start path)"""
+        document_id = pdf_meta.get('document_id')
+        if not document_id:
+            # Exam scheduled before upload-time ingestion existed: ingest once and remember the document
+            pdf_path = pdf_meta.get('pdf_path')
+            if not pdf_path:
+                print(f"❌ [START_EXAM] No PDF path in metadata")
+                return None
+            # Ensure absolute path from project root
+            if not os.path.isabs(pdf_path):
+                project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+                pdf_path = os.path.join(project_root, pdf_path)
+            if not os.path.exists(pdf_path):
+                print(f"❌ [START_EXAM] PDF file not found: {pdf_path}")
+                return None
             try:
-                print(f"  student present: {student_id in self.students}")
-            except Exception:
-                pass
-            traceback.print_exc()
-            # Re-raise to be handled by route (which will log and return 500)
-            raise
+                job = pdf_ingest_service.ingest(pdf_path, pdf_meta.get('pdf_filename'), pdf_meta.get('instruction'))
+            except Exception as e:
+                print(f"❌ [START_EXAM] Error extracting PDF content: {e}")
+                return None
+            document_id = pdf_meta['document_id'] = job['document_id']
+            pdf_meta['page_ranges'] = job['page_ranges']
+            write_behind.upsert("pdf_exams", "exam_id", pdf_meta)
+
+        # Only the parts of the document relevant to the instructor's instruction go to the model
+        pdf_content = pdf_ingest_service.get_context(document_id, pdf_meta.get('instruction'), pdf_meta.get('page_ranges'))
+        if pdf_content:
+            print(f"✅ [START_EXAM] Using {len(pdf_content)} chars of retrieved PDF text")
+        return pdf_content
+
+    def _project_details(self, student: Dict) -> Dict:
+        return {
+            'title': student.get('project_title', 'Project'),
+            'description': student.get('project_description', 'Project description'),
+            'technologies': student.get('technologies', []),
+            'metrics': student.get('metrics', [])
+        }
+
+    # -------- Pre-generated questions --------
+    def pregeneration_key(self, student_id: str, pdf_metadata: Dict = None) -> str:
+        """Key of a student's pre-generated question set for a scheduled PDF exam or project exam (None if not pre-generatable)"""
+        if pdf_metadata:
+            if pdf_metadata.get('pdf_content') or not pdf_metadata.get('exam_id'):
+                return None
+            return f"{student_id}:{pdf_metadata['exam_id']}"
+        schedule = self.exam_schedules.get(student_id)
+        if not schedule:
+            return None
+        return f"{student_id}:project:{int(schedule['start_time'].timestamp())}"
+
+    async def pregenerate_questions(self, student_id: str, pdf_metadata: Dict = None) -> bool:
+        """Generate and store a student's questions for an upcoming exam; returns whether a set was stored"""
+        key, student = await self._in_store(
+            lambda: (self.pregeneration_key(student_id, pdf_metadata), self.students.get(student_id))
+        )
+        if not key or not student:
+            return False
+
+        questions = await self._generate_questions_async(
+            f"pregen_{student_id}", student, None, bool(pdf_metadata), pdf_metadata
+        )
+        entry = {
+            "key": key,
+            "student_id": student_id,
+            "pdf_exam_id": pdf_metadata.get('exam_id') if pdf_metadata else None,
+            "questions": questions,
+            "created_at": datetime.now(IST)
+        }
+        self.pregenerated_questions[key] = entry
+        await async_mongo_service.save_pregenerated_questions(entry)
+        return True
+
+    def has_pregenerated_questions(self, key: str) -> bool:
+        if key in self.pregenerated_questions:
+            return True
+        try:
+            return mongo_service.get_pregenerated_questions(key) is not None
+        except Exception:
+            return False
+
+    def _take_pregenerated_questions(self, student_id: str, pdf_metadata: Dict = None) -> List[Dict]:
+        """Stored questions for this exam start, consumed so a restarted exam gets a fresh set (None on a miss)"""
+        key = self.pregeneration_key(student_id, pdf_metadata)
+        if not key:
+            return None
+
+        entry = self.pregenerated_questions.pop(key, None)
+        try:
+            entry = mongo_service.take_pregenerated_questions(key) or entry
+        except Exception as e:
+            print(f"Warning: Could not load pre-generated questions from DB: {e}")
+        return self._pregenerated_questions_of(key, entry)
+
+    async def _take_pregenerated_questions_async(self, student_id: str, pdf_metadata: Dict = None) -> List[Dict]:
+        key = await self._in_store(self.pregeneration_key, student_id, pdf_metadata)
+        if not key:
+            return None
+
+        entry = self.pregenerated_questions.pop(key, None)
+        entry = await async_mongo_service.take_pregenerated_questions(key) or entry
+        return self._pregenerated_questions_of(key, entry)
+
+    def _pregenerated_questions_of(self, key: str, entry: Dict) -> List[Dict]:
+        if not entry or not entry.get('questions'):
+            return None
+
+        print(f"⚡ [START_EXAM] Using {len(entry['questions'])} pre-generated questions ({key})")
+        return entry['questions']
+
+    def _create_exam_session(self, exam_id: str, student_id: str, student: Dict, questions: List[Dict], is_pdf_exam: bool, pdf_metadata: Dict) -> Dict:
+        """Store the new exam session and return the first question"""
+        exam_data_to_store = {
+            "exam_id": exam_id,
+            "student_id": student_id,
+            "start_time": datetime.now(IST),
+            "status": "in_progress",
+            "questions": questions,
+            "current_question_index": 0,
+            "answers": {},
+            "responses": [],
+            "cheat_indicators": [],
+            "is_pdf_exam": is_pdf_exam,
+            "pdf_metadata": pdf_metadata
+        }
+
+        self.add_active_exam(exam_id, exam_data_to_store)
+
+        # Get first question
+        first_question_data = questions[0]
+        first_question = first_question_data["question"]
+        if first_question_data["type"] == "mcq":
+            options_text = "\n".join([f"{chr(65+i)}) {opt}" for i, opt in enumerate(first_question_data["options"])])
+            first_question = f"{first_question}\n\n{options_text}"
+
+        return {
+            "exam_id": exam_id,
+            "first_question": first_question,
+            "student_name": student['name']
+        }
+
+    def _log_start_exam_failure(self, student_id: str, exam_data: Dict = None):
+        import traceback
+        print(f"❌ [EXAM_SERVICE] Exception in start_exam for student_id={student_id}")
+        try:
+            print(f"  exam_data keys: {list(exam_data.keys()) if isinstance(exam_data, dict) else exam_data}")
+        except Exception:
+            pass
+        try:
+            print(f"  student present: {student_id in self.students}")
+        except Exception:
+            pass
+        traceback.print_exc()
     
-    def process_answer(self, exam_id: str, answer: str, response_time: float) -> Dict:
-        """Process student answer and get next question"""
-        exam = self.active_exams[exam_id]
+    def process_answer(self, exam_id: str, answer: str, response_time: float, question_number: int = None) -> Dict:
+        """
+        Process student answer and get next question.
+        question_number (1-based) is the question the client is answering; if the exam has
+        moved on (e.g. the answer was already submitted through another worker) SessionConflict is raised.
+        """
+        return self.update_exam(
+            exam_id, lambda exam: self._record_answer(exam, answer, response_time, question_number)
+        )
+
+    async def process_answer_async(self, exam_id: str, answer: str, response_time: float, question_number: int = None) -> Dict:
+        """Async variant of process_answer for WebSocket handlers"""
+        return await self._in_store(self.process_answer, exam_id, answer, response_time, question_number)
+
+    def _record_answer(self, exam: Dict, answer: str, response_time: float, question_number: int = None) -> Dict:
         current_index = exam['current_question_index']
         questions = exam['questions']
+        if question_number is not None and question_number != current_index + 1:
+            raise SessionConflict(f"Answer is for question {question_number} but the exam is at question {current_index + 1}")
         
         # Store the answer for current question
         current_question = questions[current_index]
@@ -385,45 +741,41 @@ class ExamService:
     def end_exam(self, exam_id: str) -> Dict:
         """Complete exam and generate grading"""
         exam = self.active_exams[exam_id]
-        student_id = exam['student_id']
-        questions = exam['questions']
-        answers = exam['answers']
         
-        # Calculate scores for each question (text-based evaluation)
-        total_score = 0
-        max_score = len(questions)
-        question_scores = []
+        # Calculate scores for each question (text-based evaluation, graded concurrently)
+        question_scores = self.grade_answers(exam['questions'], exam['answers'])
+        exam, summary = self._complete_exam(exam_id, question_scores)
+        self._finish_exam(exam_id, exam)
+        return summary
+    
+    async def end_exam_async(self, exam_id: str) -> Dict:
+        """Async variant of end_exam for WebSocket handlers (grading and DB writes don't block the loop)"""
+        exam = await self.get_exam_async(exam_id)
+        if exam is None:
+            raise KeyError(exam_id)
         
-        for question in questions:
-            question_id = question['id']
-            answer = answers.get(question_id, "")
-            
-            # Use AI evaluation for text questions
-            try:
-                evaluation = self.grok_service.evaluate_answer(question['question'], answer)
-                score = evaluation['score']
-                feedback = evaluation['feedback']
-                evaluation_text = evaluation['evaluation']
-            except Exception as e:
-                print(f"⚠️ [EVALUATION] Failed to evaluate answer for question {question_id}: {e}")
-                # Fallback to basic evaluation
-                answer_length = len(answer.strip())
-                score = 1.0 if answer_length > 0 else 0
-                feedback = "Answer recorded but evaluation failed."
-                evaluation_text = "Basic evaluation used"
-            
-            question_scores.append({
-                "question_id": question_id,
-                "question": question['question'],
-                "type": "text",
-                "student_answer": answer,
-                "score": score,
-                "max_score": 1,
-                "feedback": feedback,
-                "evaluation": evaluation_text
-            })
-            
-            total_score += score
+        question_scores = await self.grade_answers_async(exam['questions'], exam['answers'])
+        exam, summary = await self._in_store(self._complete_exam, exam_id, question_scores)
+        await self._in_store(self._finish_exam, exam_id, exam)
+        return summary
+    
+    def _complete_exam(self, exam_id: str, question_scores: List[Dict]) -> Tuple[Dict, Dict]:
+        """
+        Record the graded scores on the stored session through update_exam, so completion is
+        not lost to (and does not overwrite) a concurrent write from another worker: (exam, summary)
+        """
+        def complete(exam: Dict) -> Tuple[Dict, Dict]:
+            summary = self._score_exam(exam_id, exam, question_scores)
+            # Persist completed exam to MongoDB (only persisted exams are evicted from memory)
+            exam['persisted'] = self._persist_completed_exam(exam_id, exam)
+            return exam, summary
+        return self.update_exam(exam_id, complete)
+    
+    def _score_exam(self, exam_id: str, exam: Dict, question_scores: List[Dict]) -> Dict:
+        """Record graded scores on the session and build the result summary"""
+        student_id = exam['student_id']
+        max_score = len(exam['questions'])
+        total_score = sum(q_score['score'] for q_score in question_scores)
         
         # Calculate percentage
         percentage = (total_score / max_score) * 100 if max_score > 0 else 0
@@ -460,99 +812,326 @@ class ExamService:
         exam['max_score'] = max_score
         exam['percentage'] = percentage
         exam['question_scores'] = question_scores
+        exam['risk_level'] = risk_level
+        exam['feedback'] = feedback
         
-        # Persist completed exam to MongoDB
-        try:
-            mongo_service.create_completed_exam({
-                "exam_id": exam_id,
-                "student_id": student_id,
-                "status": "completed",
-                "completed_at": exam['completed_at'].isoformat() if hasattr(exam['completed_at'], 'isoformat') else str(exam['completed_at']),
-                "total_score": total_score,
-                "max_score": max_score,
-                "percentage": percentage,
-                "question_scores": question_scores,
-                "responses": exam.get('responses', []),
-                "cheat_indicators": exam.get('cheat_indicators', []),
-                "risk_level": risk_level,
-                "feedback": feedback,
-                "is_pdf_exam": exam.get('is_pdf_exam', False),
-                "pdf_metadata": exam.get('pdf_metadata', {})
-            })
-            print(f"💾 [EXAM SAVED] Exam {exam_id} saved to database with score {total_score}/{max_score}")
-        except Exception as e:
-            print(f"Warning: Could not persist completed exam to DB: {e}")
+        return {
+            "exam_id": exam_id,
+            "student_id": student_id,
+            "total_questions": max_score,
+            "suspicion_score": avg_cheat_score,
+            "risk_level": risk_level,
+            "cheat_flags": list(set(exam['cheat_indicators']))
+        }
+    
+    def _finish_exam(self, exam_id: str, exam: Dict):
+        """Take a completed exam off the student's upcoming list"""
+        student_id = exam['student_id']
         
         # Mark PDF exam as completed
         if exam.get('is_pdf_exam'):
             pdf_exam_id = exam.get('pdf_metadata', {}).get('exam_id')
-            self.completed_pdf_exams[pdf_exam_id] = {
+            self._mark_pdf_exam_completed({
                 'exam_id': pdf_exam_id,
                 'student_id': student_id,
                 'completed_at': datetime.now(IST),
                 'exam_name': exam.get('pdf_metadata', {}).get('exam_name', 'PDF Exam')
-            }
+            })
             # Remove this exam from the student's upcoming list so it no longer appears
-            try:
-                if student_id in self.student_pdf_exams:
-                    if pdf_exam_id in self.student_pdf_exams[student_id]:
-                        self.student_pdf_exams[student_id].remove(pdf_exam_id)
-            except Exception:
-                pass
+            self._unindex(self.student_pdf_exams, student_id, pdf_exam_id)
         else:
             # If this was a project-based exam, remove any scheduled entry so it no longer appears as upcoming
+            self.exam_schedules.pop(student_id, None)
+            write_behind.delete("exam_schedules", {"student_id": student_id})
+    
+    def _completed_exam_document(self, exam_id: str, exam: Dict) -> Dict:
+        return {
+            "exam_id": exam_id,
+            "student_id": exam['student_id'],
+            "status": "completed",
+            "completed_at": exam['completed_at'].isoformat() if hasattr(exam['completed_at'], 'isoformat') else str(exam['completed_at']),
+            "total_score": exam['total_score'],
+            "max_score": exam['max_score'],
+            "percentage": exam['percentage'],
+            "question_scores": exam['question_scores'],
+            "responses": exam.get('responses', []),
+            "cheat_indicators": exam.get('cheat_indicators', []),
+            "risk_level": exam.get('risk_level'),
+            "feedback": exam.get('feedback'),
+            "frames": exam.get('frames', []),
+            "is_pdf_exam": exam.get('is_pdf_exam', False),
+            "pdf_metadata": exam.get('pdf_metadata', {})
+        }
+    
+    def _persist_completed_exam(self, exam_id: str, exam: Dict) -> bool:
+        """Queue the completed exam for MongoDB; False when there is no database to write it to"""
+        write_behind.upsert("completed_exams", "exam_id", self._completed_exam_document(exam_id, exam))
+        if not mongo_service.is_connected():
+            return False
+        print(f"💾 [EXAM SAVED] Exam {exam_id} queued for the database with score {exam['total_score']}/{exam['max_score']}")
+        return True
+
+    def _is_stored(self, exam_id: str, exam: Dict) -> bool:
+        """Whether a completed session has reached MongoDB (not just the write-behind queue)"""
+        return bool(exam.get('persisted')) and mongo_service.is_connected() and not write_behind.is_pending("completed_exams", {"exam_id": exam_id})
+
+    # -------- Session lifecycle --------
+    def start_session_sweeper(self):
+        """Start evicting finished sessions periodically on the running event loop"""
+        if self._session_sweeper is None or self._session_sweeper.done():
+            self._session_sweeper = asyncio.create_task(self._sweep_sessions_forever())
+
+    async def stop_session_sweeper(self):
+        if self._session_sweeper is not None:
+            self._session_sweeper.cancel()
             try:
-                if student_id in self.exam_schedules:
-                    self.exam_schedules.pop(student_id, None)
-                # Also delete from DB
-                mongo_service.delete_exam_schedule(student_id)
-            except Exception:
+                await self._session_sweeper
+            except asyncio.CancelledError:
                 pass
+            self._session_sweeper = None
+
+    async def _sweep_sessions_forever(self):
+        while True:
+            await asyncio.sleep(SESSION_SWEEP_SECONDS)
+            try:
+                await self.sweep_sessions_async()
+            except Exception as e:
+                print(f"⚠️ [SESSIONS] Session sweep failed: {e}")
+
+    async def sweep_sessions_async(self, now: datetime = None) -> Dict:
+        """Evict persisted completed exams past their grace period and end expired in-progress ones"""
+        # With a shared store, one worker sweeps per interval
+        if not await self._in_store(self.active_exams.try_acquire, "session_sweeper", SESSION_SWEEP_SECONDS - 1):
+            return {"evicted": 0, "expired": 0}
+        now = now or datetime.now(IST)
+        evicted = await asyncio.to_thread(self.evict_completed_sessions, now)
+
+        expired = 0
+        for exam_id in await self._in_store(self.expired_session_ids, now):
+            exam = await self.get_exam_async(exam_id)
+            if not exam or exam['status'] != 'in_progress':
+                continue
+            print(f"⌛ [SESSIONS] Exam {exam_id} expired; grading the answers given so far")
+            try:
+                if exam.get('questions') is not None:
+                    await self.end_exam_async(exam_id)
+                    await self.update_exam_async(exam_id, lambda exam: exam.update(expired=True))
+                else:
+                    # Conversation-only sessions have nothing to grade
+                    await self._in_store(self.remove_active_exam, exam_id)
+            except Exception as e:
+                print(f"⚠️ [SESSIONS] Could not end expired exam {exam_id}: {e}")
+                await self._in_store(self.remove_active_exam, exam_id)
+            expired += 1
+        await self._in_store(self.active_exams.record_evictions, 0, expired)
+
+        if evicted or expired:
+            resident = await self._in_store(len, self.active_exams)
+            print(f"🧹 [SESSIONS] Evicted {evicted} completed, expired {expired} idle; {resident} resident")
+        return {"evicted": evicted, "expired": expired}
+
+    def evict_completed_sessions(self, now: datetime) -> int:
+        evicted = 0
+        for exam_id, exam in self.get_exams_by_status('completed'):
+            completed_at = to_ist(exam.get('completed_at'))
+            if completed_at and (now - completed_at).total_seconds() < SESSION_COMPLETED_GRACE_SECONDS:
+                continue
+            # Without a database completed exams have to stay resident; queued ones stay until written
+            if not self._is_stored(exam_id, exam):
+                continue
+            self.remove_active_exam(exam_id)
+            evicted += 1
+        self.active_exams.record_evictions(evicted=evicted)
+        return evicted
+
+    def expired_session_ids(self, now: datetime) -> List[str]:
+        """In-progress sessions past their schedule window (or idle too long when they have none)"""
+        expired = []
+        for exam_id, exam in self.get_exams_by_status('in_progress'):
+            window_end = self._session_window_end(exam)
+            if window_end is not None:
+                if now > window_end:
+                    expired.append(exam_id)
+            elif self.active_exams.idle_seconds(exam_id) > SESSION_IDLE_TIMEOUT_MINUTES * 60:
+                expired.append(exam_id)
+        return expired
+
+    def _session_window_end(self, exam: Dict) -> datetime:
+        pdf_metadata = exam.get('pdf_metadata') or {}
+        start = to_ist(pdf_metadata.get('start_time'))
+        if exam.get('is_pdf_exam') and start and pdf_metadata.get('duration_minutes'):
+            return start + timedelta(minutes=pdf_metadata['duration_minutes'])
+        schedule = self.exam_schedules.get(exam['student_id'])
+        if not exam.get('is_pdf_exam') and schedule:
+            return to_ist(schedule.get('end_time'))
+        return None
+
+    def session_metrics(self) -> Dict:
+        return self.active_exams.metrics()
+
+    def grade_answers(self, questions: List[Dict], answers: Dict) -> List[Dict]:
+        """Evaluate all answers of an exam (batched or concurrently) within the grading deadline"""
+        evaluations = [None] * len(questions)
+        deadline = time.monotonic() + GRADING_DEADLINE_SECONDS
         
+        if questions:
+            executor = ThreadPoolExecutor(max_workers=max(1, min(GRADING_CONCURRENCY, len(questions))))
+            
+            if GRADING_MODE == "batch":
+                batch = executor.submit(
+                    self.grok_service.evaluate_answers_batch,
+                    [(question['question'], answers.get(question['id'], "")) for question in questions]
+                )
+                try:
+                    evaluations = batch.result(timeout=GRADING_DEADLINE_SECONDS * GRADING_BATCH_SHARE)
+                except Exception as e:
+                    print(f"⚠️ [EVALUATION] Batch evaluation failed, grading questions individually: {e}")
+            
+            # Grade whatever the batch didn't cover (everything in parallel mode)
+            futures = {
+                executor.submit(self.grok_service.evaluate_answer, question['question'], answers.get(question['id'], "")): i
+                for i, question in enumerate(questions)
+                if evaluations[i] is None
+            }
+            done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()))
+            for future in done:
+                try:
+                    evaluations[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"⚠️ [EVALUATION] Failed to evaluate answer for question {questions[futures[future]]['id']}: {e}")
+            for future in not_done:
+                print(f"⚠️ [EVALUATION] Question {questions[futures[future]]['id']} missed the {GRADING_DEADLINE_SECONDS}s grading deadline")
+            # Don't wait for stragglers; their results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return self._build_question_scores(questions, answers, evaluations)
+    
+    async def grade_answers_async(self, questions: List[Dict], answers: Dict) -> List[Dict]:
+        """Async variant of grade_answers: evaluations run as concurrent tasks on the event loop"""
+        evaluations = [None] * len(questions)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + GRADING_DEADLINE_SECONDS
+        
+        if questions:
+            if GRADING_MODE == "batch":
+                try:
+                    evaluations = await asyncio.wait_for(
+                        self.async_grok_service.evaluate_answers_batch(
+                            [(question['question'], answers.get(question['id'], "")) for question in questions]
+                        ),
+                        timeout=GRADING_DEADLINE_SECONDS * GRADING_BATCH_SHARE
+                    )
+                except Exception as e:
+                    print(f"⚠️ [EVALUATION] Batch evaluation failed, grading questions individually: {e}")
+            
+            semaphore = asyncio.Semaphore(GRADING_CONCURRENCY)
+            
+            async def evaluate(question: Dict) -> Dict:
+                async with semaphore:
+                    return await self.async_grok_service.evaluate_answer(question['question'], answers.get(question['id'], ""))
+            
+            tasks = {
+                asyncio.ensure_future(evaluate(question)): i
+                for i, question in enumerate(questions)
+                if evaluations[i] is None
+            }
+            if tasks:
+                done, not_done = await asyncio.wait(tasks, timeout=max(0, deadline - loop.time()))
+                for task in done:
+                    try:
+                        evaluations[tasks[task]] = task.result()
+                    except Exception as e:
+                        print(f"⚠️ [EVALUATION] Failed to evaluate answer for question {questions[tasks[task]]['id']}: {e}")
+                for task in not_done:
+                    print(f"⚠️ [EVALUATION] Question {questions[tasks[task]]['id']} missed the {GRADING_DEADLINE_SECONDS}s grading deadline")
+                    task.cancel()
+        
+        return self._build_question_scores(questions, answers, evaluations)
+    
+    def _build_question_scores(self, questions: List[Dict], answers: Dict, evaluations: List) -> List[Dict]:
+        """Turn evaluations into question_scores, using the fallback where evaluation is missing"""
+        question_scores = []
+        for question, evaluation in zip(questions, evaluations):
+            answer = answers.get(question['id'], "")
+            if evaluation is None:
+                evaluation = self._fallback_evaluation(answer)
+            
+            question_scores.append({
+                "question_id": question['id'],
+                "question": question['question'],
+                "type": "text",
+                "student_answer": answer,
+                "score": evaluation['score'],
+                "max_score": 1,
+                "feedback": evaluation['feedback'],
+                "evaluation": evaluation['evaluation']
+            })
+        
+        return question_scores
+    
+    def _fallback_evaluation(self, answer: str) -> Dict:
+        """Basic evaluation used when AI evaluation fails or misses the deadline"""
+        answer_length = len(answer.strip())
         return {
-            "exam_id": exam_id,
-            "student_id": student_id,
-            "total_questions": max_score,
-            "suspicion_score": avg_cheat_score,
-            "risk_level": risk_level,
-            "cheat_flags": list(set(exam['cheat_indicators']))
+            "score": 1.0 if answer_length > 0 else 0,
+            "feedback": "Answer recorded but evaluation failed.",
+            "evaluation": "Basic evaluation used"
         }
     
-    def store_pdf_exam_metadata(self, student_id: str, pdf_path: str, pdf_filename: str, instruction: str, exam_name: str = None, start_time = None, duration_minutes: int = None):
-        """Store PDF exam metadata for a student"""
+    def store_pdf_exam_metadata(self, student_id: str, pdf_path: str, pdf_filename: str, instruction: str, exam_name: str = None, start_time = None, duration_minutes: int = None, document_id: str = None, page_ranges: List = None):
+        """Store PDF exam metadata for a student (ingesting the PDF unless document_id is given)"""
         import uuid
         exam_id = f"pdf_exam_{uuid.uuid4()}"
         
-        self.pdf_exams[exam_id] = {
+        if not document_id:
+            try:
+                job = pdf_ingest_service.ingest(pdf_path, pdf_filename, instruction)
+                document_id, page_ranges = job['document_id'], job['page_ranges']
+            except Exception as e:
+                # Leave it to start_exam to retry ingestion (or use fallback content)
+                print(f"Warning: Could not extract PDF text for {pdf_filename}: {e}")
+        
+        exam = self._add_pdf_exam(exam_id, student_id, pdf_path, pdf_filename, instruction, exam_name, start_time, duration_minutes, document_id, page_ranges)
+        # Persist to MongoDB (written in the background)
+        write_behind.upsert("pdf_exams", "exam_id", exam)
+
+        return exam_id
+
+    async def store_pdf_exam_metadata_async(self, student_id: str, pdf_path: str, pdf_filename: str, instruction: str, exam_name: str = None, start_time = None, duration_minutes: int = None, document_id: str = None, page_ranges: List = None):
+        """Async variant of store_pdf_exam_metadata for a PDF already submitted for ingestion (document_id given)"""
+        import uuid
+        exam_id = f"pdf_exam_{uuid.uuid4()}"
+        exam = await self._in_store(self._add_pdf_exam, exam_id, student_id, pdf_path, pdf_filename, instruction, exam_name, start_time, duration_minutes, document_id, page_ranges)
+        if not await async_mongo_service.create_pdf_exam(exam):
+            # MongoDB is unavailable: the write-behind queue retries (and spools) it
+            write_behind.upsert("pdf_exams", "exam_id", exam)
+        return exam_id
+    
+    def _add_pdf_exam(self, exam_id: str, student_id: str, pdf_path: str, pdf_filename: str, instruction: str, exam_name: str, start_time, duration_minutes: int, document_id: str, page_ranges: List) -> Dict:
+        exam = {
             "exam_id": exam_id,
             "student_id": student_id,
             "pdf_path": pdf_path,
             "pdf_filename": pdf_filename,
+            "document_id": document_id,
+            "page_ranges": page_ranges,  # pages the instruction refers to (None: whole document, or not resolved yet)
             "instruction": instruction,
             "exam_name": exam_name or "PDF-Based Exam",
             "start_time": start_time,
             "duration_minutes": duration_minutes,
             "created_at": datetime.now(IST)
         }
+        self.pdf_exams[exam_id] = exam
         
         # Add to student's exam list
-        if student_id not in self.student_pdf_exams:
-            self.student_pdf_exams[student_id] = []
-        self.student_pdf_exams[student_id].append(exam_id)
-        # Persist to MongoDB if available
-        try:
-            from app.services.mongo_service import mongo_service
-            mongo_service.create_pdf_exam(self.pdf_exams[exam_id])
-        except Exception:
-            pass
-
-        return exam_id
+        self._index_pdf_exam(student_id, exam_id)
+        return exam
     
     def get_pdf_exam_metadata(self, student_id: str) -> Dict:
         """Get first PDF exam metadata for a student (for backward compatibility)"""
-        if student_id in self.student_pdf_exams and self.student_pdf_exams[student_id]:
-            exam_id = self.student_pdf_exams[student_id][-1]
-            return self.pdf_exams.get(exam_id, None)
+        exam_ids = self.student_pdf_exams.get(student_id)
+        if exam_ids:
+            return self.pdf_exams.get(exam_ids[-1], None)
         return None
     
     def get_all_pdf_exams_for_student(self, student_id: str) -> List[Dict]:
@@ -560,8 +1139,9 @@ class ExamService:
         exam_ids = self.student_pdf_exams.get(student_id, [])
         exams = []
         for exam_id in exam_ids:
-            if exam_id in self.pdf_exams:
-                exams.append(self.pdf_exams[exam_id])
+            exam = self.pdf_exams.get(exam_id)
+            if exam is not None:
+                exams.append(exam)
         return exams
 
     def _check_mcq_answer(self, student_answer: str, correct_answer: str, options: List[str]) -> bool:
@@ -1,13 +1,51 @@
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
+import base64
 import os, re
+import httpx
 from dotenv import load_dotenv
-from groq import Groq
+from groq import Groq, AsyncGroq
+from app.services.question_cache import question_cache
 
 
 # Load .env locally (Render ignores this and uses its own env vars)
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_MODEL = "llama-3.1-8b-instant"
+# Bump whenever the PDF question prompt changes so cached question sets are regenerated
+PDF_QUESTIONS_PROMPT_VERSION = "2"
+
+# Connection pool shared by every AsyncGrokExamService instance
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS") or 50)
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS") or 20)
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS") or 60)
+# Speech-to-text (OpenAI-compatible endpoint; called directly since the SDK has no audio API)
+GROQ_API_BASE = os.getenv("GROQ_API_BASE") or "https://api.groq.com/openai/v1"
+GROQ_TRANSCRIPTION_MODEL = os.getenv("GROQ_TRANSCRIPTION_MODEL") or "whisper-large-v3"
+
+_async_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled HTTP client used for async Groq calls"""
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=GROQ_TIMEOUT_SECONDS
+        )
+    return _async_http_client
+
+
+async def close_async_http_client():
+    """Close the pooled HTTP client (called on application shutdown)"""
+    global _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
 
 
 class GrokExamService:
@@ -22,7 +60,7 @@ class GrokExamService:
 
         try:
             self.client = Groq(api_key=GROQ_API_KEY, proxies=None)
-            self.model = "llama-3.1-8b-instant"
+            self.model = GROQ_MODEL
             masked = GROQ_API_KEY[:4] + "..." + GROQ_API_KEY[-4:]
             print(f"✅ GROQ API Loaded: {masked}")
         except Exception as e:
@@ -32,15 +70,37 @@ class GrokExamService:
 
     # -------- PDF QUESTION GENERATION --------
     def generate_pdf_questions(self, pdf_content: str, instruction: str) -> List[str]:
-        relevant_text = pdf_content[:6000]
+        # If client is not available, return simple fallback questions
+        if not self.client:
+            return self._fallback_pdf_questions()
+
+        cache_key = question_cache.make_key(pdf_content, instruction, self.model, PDF_QUESTIONS_PROMPT_VERSION)
+        cached = question_cache.pick(cache_key)
+        if cached:
+            return cached
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": self._pdf_questions_prompt(pdf_content, instruction)}],
+            temperature=0.7,
+            max_tokens=400
+        )
 
-        prompt = f"""
+        questions = self._parse_pdf_questions(response.choices[0].message.content)
+        if questions:
+            question_cache.add_question_set(cache_key, questions)
+
+        return questions or ["Q1. Explain the main concepts from the given material."]
+
+    def _pdf_questions_prompt(self, pdf_content: str, instruction: str) -> str:
+        # pdf_content is already the retrieved context (raw text is narrowed by ExamService before it gets here)
+        return f"""
 You are a professor conducting an oral exam.
 
 Instruction: {instruction}
 
 Content:
-{relevant_text}
+{pdf_content}
 
 Generate 5 deep viva questions.
 Format:
@@ -51,37 +111,40 @@ Q4. ...
 Q5. ...
 """
 
-        # If client is not available, return simple fallback questions
+    def _fallback_pdf_questions(self) -> List[str]:
+        return [
+            "Q1. Summarize the main points from the provided material.",
+            "Q2. Explain one key concept and its applications.",
+            "Q3. Describe a challenge mentioned and how to address it.",
+            "Q4. Describe how the material relates to your project.",
+            "Q5. What future work or improvements would you suggest?"
+        ]
+
+    def _parse_pdf_questions(self, text: str) -> List[str]:
+        return [
+            q.strip() for q in text.split("\n")
+            if q.strip().startswith("Q")
+        ]
+
+    # -------- PROJECT QUESTION GENERATION --------
+    def generate_project_questions(self, project_details: Dict) -> List[str]:
         if not self.client:
-            return [
-                "Q1. Summarize the main points from the provided material.",
-                "Q2. Explain one key concept and its applications.",
-                "Q3. Describe a challenge mentioned and how to address it.",
-                "Q4. Describe how the material relates to your project.",
-                "Q5. What future work or improvements would you suggest?"
-            ]
+            return self._fallback_project_questions(project_details)
 
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=400
+            messages=[{"role": "user", "content": self._project_questions_prompt(project_details)}],
+            max_tokens=800
         )
 
-        questions = [
-            q.strip() for q in response.choices[0].message.content.split("\n")
-            if q.strip().startswith("Q")
-        ]
-
-        return questions or ["Q1. Explain the main concepts from the given material."]
+        return self._parse_project_questions(response.choices[0].message.content)
 
-    # -------- PROJECT QUESTION GENERATION --------
-    def generate_project_questions(self, project_details: Dict) -> List[str]:
+    def _project_questions_prompt(self, project_details: Dict) -> str:
         title = project_details.get("title", "Project")
         description = project_details.get("description", "")
         technologies = project_details.get("technologies", [])
 
-        prompt = f"""
+        return f"""
 You are a professor conducting an oral exam.
 
 Project: {title}
@@ -92,28 +155,23 @@ Generate 8 technical viva questions.
 Return one per line.
 """
 
-        if not self.client:
-            # Simple heuristics based on project details
-            title = project_details.get("title", "Project")
-            techs = ', '.join(project_details.get('technologies', []))
-            return [
-                f"Explain the primary goal of {title}.",
-                f"Describe the key technologies used: {techs}.",
-                "Walk through the main components and their interactions.",
-                "Explain a difficult bug you encountered and how you fixed it.",
-                "How would you scale this project for more users?",
-                "Discuss security considerations for this project.",
-                "What tests did you write and why?",
-                "What improvements would you prioritize next?"
-            ]
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=800
-        )
+    def _fallback_project_questions(self, project_details: Dict) -> List[str]:
+        # Simple heuristics based on project details
+        title = project_details.get("title", "Project")
+        techs = ', '.join(project_details.get('technologies', []))
+        return [
+            f"Explain the primary goal of {title}.",
+            f"Describe the key technologies used: {techs}.",
+            "Walk through the main components and their interactions.",
+            "Explain a difficult bug you encountered and how you fixed it.",
+            "How would you scale this project for more users?",
+            "Discuss security considerations for this project.",
+            "What tests did you write and why?",
+            "What improvements would you prioritize next?"
+        ]
 
-        return [q.strip() for q in response.choices[0].message.content.split("\n") if q.strip()][:8]
+    def _parse_project_questions(self, text: str) -> List[str]:
+        return [q.strip() for q in text.split("\n") if q.strip()][:8]
 
     # -------- MAIN EXAM GENERATION --------
     def generate_exam_questions(
@@ -121,17 +179,23 @@ Return one per line.
         exam_id: str,
         project_details: Dict = None,
         pdf_content: str = None,
-        num_questions: int = 8
+        num_questions: int = 8,
+        instruction: str = None
     ) -> List[Dict]:
 
         if pdf_content:
-            instruction = project_details.get("title", "PDF Exam") if project_details else "PDF Exam"
-            raw_questions = self.generate_pdf_questions(pdf_content, instruction)
+            raw_questions = self.generate_pdf_questions(pdf_content, instruction or self._exam_instruction(project_details))
         elif project_details:
             raw_questions = self.generate_project_questions(project_details)
         else:
             raise ValueError("No PDF or project details provided")
 
+        return self._build_exam_questions(raw_questions, num_questions)
+
+    def _exam_instruction(self, project_details: Optional[Dict]) -> str:
+        return project_details.get("title", "PDF Exam") if project_details else "PDF Exam"
+
+    def _build_exam_questions(self, raw_questions: List[str], num_questions: int) -> List[Dict]:
         questions = []
         for i, q in enumerate(raw_questions[:num_questions]):
             questions.append({
@@ -146,6 +210,21 @@ Return one per line.
 
     # -------- ANSWER EVALUATION --------
     def evaluate_answer(self, question: str, student_answer: str) -> Dict[str, Any]:
+        local = self._local_evaluation(student_answer)
+        if local:
+            return local
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": self._evaluation_prompt(question, student_answer)}],
+            temperature=0.2,
+            max_tokens=300
+        )
+
+        return self._finish_evaluation(response.choices[0].message.content)
+
+    def _local_evaluation(self, student_answer: str) -> Optional[Dict[str, Any]]:
+        """Evaluate without the LLM when the answer is empty or no client is available"""
         if not student_answer.strip():
             return {
                 "score": 0.0,
@@ -164,8 +243,10 @@ Return one per line.
                 "feedback": feedback,
                 "evaluation": "Fallback evaluation used"
             }
+        return None
 
-        prompt = f"""
+    def _evaluation_prompt(self, question: str, student_answer: str) -> str:
+        return f"""
 Evaluate the student's answer from 0.0 to 1.0.
 
 Question: {question}
@@ -177,17 +258,83 @@ FEEDBACK: ...
 EVALUATION: ...
 """
 
+    def _finish_evaluation(self, text: str) -> Dict[str, Any]:
+        evaluation = self._parse_evaluation(text)
+        if evaluation["score"] is None:
+            evaluation["score"] = 0.5
+        evaluation["score"] = min(1.0, max(0.0, evaluation["score"]))
+
+        return evaluation
+
+    # -------- BATCH ANSWER EVALUATION --------
+    def evaluate_answers_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Grade every (question, answer) pair of an exam in a single completion.
+        Returns one evaluation per item, or None where the model's block could not be parsed
+        so the caller can re-grade those questions individually.
+        """
+        evaluations, pending = self._prepare_batch(items)
+        if not pending:
+            return evaluations
+
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=[{"role": "user", "content": self._batch_evaluation_prompt(items, pending)}],
             temperature=0.2,
-            max_tokens=300
+            max_tokens=200 * len(pending) + 100
+        )
+
+        return self._apply_batch_evaluations(response.choices[0].message.content, pending, evaluations)
+
+    def _prepare_batch(self, items: List[Tuple[str, str]]) -> Tuple[List[Optional[Dict[str, Any]]], List[int]]:
+        evaluations: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+        # Empty answers and fallback mode never need the LLM
+        pending = []
+        for i, (question, student_answer) in enumerate(items):
+            local = self._local_evaluation(student_answer)
+            if local:
+                evaluations[i] = local
+            else:
+                pending.append(i)
+
+        return evaluations, pending
+
+    def _batch_evaluation_prompt(self, items: List[Tuple[str, str]], pending: List[int]) -> str:
+        blocks = "\n".join(
+            f"### Q{n}\nQuestion: {items[i][0]}\nAnswer: {items[i][1]}\n"
+            for n, i in enumerate(pending, start=1)
         )
+        return f"""
+Evaluate each student's answer below from 0.0 to 1.0.
+
+{blocks}
+For every question, reply with one block in exactly this format:
+### Q<number>
+SCORE: x.x
+FEEDBACK: ...
+EVALUATION: ...
+"""
+
+    def _apply_batch_evaluations(self, text: str, pending: List[int], evaluations: List[Optional[Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        for match in re.finditer(r"^[ \t#*]*Q(\d+)\b(.*?)(?=^[ \t#*]*Q\d+\b|\Z)", text, re.MULTILINE | re.DOTALL):
+            n = int(match.group(1))
+            if not 1 <= n <= len(pending):
+                continue
+            evaluation = self._parse_evaluation(match.group(2))
+            if evaluation["score"] is None:
+                continue
+            evaluation["score"] = min(1.0, max(0.0, evaluation["score"]))
+            evaluations[pending[n - 1]] = evaluation
 
-        text = response.choices[0].message.content
-        score, feedback, evaluation = 0.5, "", ""
+        return evaluations
+
+    def _parse_evaluation(self, text: str) -> Dict[str, Any]:
+        """Parse SCORE/FEEDBACK/EVALUATION lines; score is None when missing or unreadable"""
+        score, feedback, evaluation = None, "", ""
 
         for line in text.split("\n"):
+            line = line.strip()
             if line.startswith("SCORE:"):
                 try:
                     score = float(line.replace("SCORE:", "").strip())
@@ -199,15 +346,145 @@ EVALUATION: ...
                 evaluation = line.replace("EVALUATION:", "").strip()
 
         return {
-            "score": min(1.0, max(0.0, score)),
+            "score": score,
             "max_score": 1.0,
             "feedback": feedback,
             "evaluation": evaluation
         }
 
 
-# Global singleton
+class AsyncGrokExamService(GrokExamService):
+    """
+    Async variant of GrokExamService for async routes and WebSocket handlers.
+    Uses the same prompts and parsing; requests go through the shared pooled AsyncClient
+    so a slow completion never blocks the event loop.
+    """
+
+    def __init__(self):
+        self.conversations = {}
+        if not GROQ_API_KEY:
+            self.client = None
+            self.model = None
+            return
+
+        try:
+            self.client = AsyncGroq(
+                api_key=GROQ_API_KEY,
+                http_client=get_async_http_client(),
+                timeout=GROQ_TIMEOUT_SECONDS
+            )
+            self.model = GROQ_MODEL
+        except Exception as e:
+            print(f"⚠️ [GROK] Failed to initialize async Groq client: {e}. Falling back to local mode.")
+            self.client = None
+            self.model = None
+
+    async def generate_pdf_questions(self, pdf_content: str, instruction: str) -> List[str]:
+        if not self.client:
+            return self._fallback_pdf_questions()
+
+        cache_key = question_cache.make_key(pdf_content, instruction, self.model, PDF_QUESTIONS_PROMPT_VERSION)
+        cached = await question_cache.pick_async(cache_key)
+        if cached:
+            return cached
+
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": self._pdf_questions_prompt(pdf_content, instruction)}],
+            temperature=0.7,
+            max_tokens=400
+        )
+
+        questions = self._parse_pdf_questions(response.choices[0].message.content)
+        if questions:
+            await question_cache.add_question_set_async(cache_key, questions)
+
+        return questions or ["Q1. Explain the main concepts from the given material."]
+
+    async def generate_project_questions(self, project_details: Dict) -> List[str]:
+        if not self.client:
+            return self._fallback_project_questions(project_details)
+
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": self._project_questions_prompt(project_details)}],
+            max_tokens=800
+        )
+
+        return self._parse_project_questions(response.choices[0].message.content)
+
+    async def generate_exam_questions(
+        self,
+        exam_id: str,
+        project_details: Dict = None,
+        pdf_content: str = None,
+        num_questions: int = 8,
+        instruction: str = None
+    ) -> List[Dict]:
+
+        if pdf_content:
+            raw_questions = await self.generate_pdf_questions(pdf_content, instruction or self._exam_instruction(project_details))
+        elif project_details:
+            raw_questions = await self.generate_project_questions(project_details)
+        else:
+            raise ValueError("No PDF or project details provided")
+
+        return self._build_exam_questions(raw_questions, num_questions)
+
+    async def evaluate_answer(self, question: str, student_answer: str) -> Dict[str, Any]:
+        local = self._local_evaluation(student_answer)
+        if local:
+            return local
+
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": self._evaluation_prompt(question, student_answer)}],
+            temperature=0.2,
+            max_tokens=300
+        )
+
+        return self._finish_evaluation(response.choices[0].message.content)
+
+    async def evaluate_answers_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        evaluations, pending = self._prepare_batch(items)
+        if not pending:
+            return evaluations
+
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": self._batch_evaluation_prompt(items, pending)}],
+            temperature=0.2,
+            max_tokens=200 * len(pending) + 100
+        )
+
+        return self._apply_batch_evaluations(response.choices[0].message.content, pending, evaluations)
+
+    # -------- SPEECH TO TEXT --------
+    async def transcribe_audio(self, audio: bytes, filename: str = "answer.webm") -> Dict[str, Any]:
+        """Transcribe recorded audio (bytes-like), uploaded as multipart form data rather than base64"""
+        if not self.client:
+            return {"status": "error", "message": "Transcription not available in fallback", "text": ""}
+        try:
+            response = await get_async_http_client().post(
+                f"{GROQ_API_BASE}/audio/transcriptions",
+                headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
+                data={"model": GROQ_TRANSCRIPTION_MODEL, "response_format": "json"},
+                files={"file": (filename, bytes(audio))}
+            )
+            response.raise_for_status()
+            return {"status": "success", "text": response.json().get("text", "").strip()}
+        except Exception as e:
+            print(f"⚠️ [GROK] Transcription failed: {e}")
+            return {"status": "error", "message": str(e), "text": ""}
+
+    async def transcribe_audio_base64(self, audio_b64: str, filename: str = "answer.webm") -> Dict[str, Any]:
+        """transcribe_audio for base64 text (older JSON clients)"""
+        return await self.transcribe_audio(base64.b64decode(audio_b64), filename)
+
+
+# Global singletons
 grok_exam_service = GrokExamService()
+async_grok_exam_service = AsyncGrokExamService()
 
 # Minimal TTS and transcription fallbacks to support voice flows when Groq client is unavailable
 def _fallback_text_to_speech(text: str) -> dict:
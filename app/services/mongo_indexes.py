@@ -0,0 +1,162 @@
+"""
+MongoDB index registry
+Declares the indexes every collection's queries rely on. MongoService syncs them on startup;
+the CLI syncs them on demand and reports profiled queries that still scan a whole collection:
+
+    python -m app.services.mongo_indexes sync [--drop-unknown]
+    python -m app.services.mongo_indexes report [--slow-ms 100] [--enable-profiling]
+"""
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+import argparse
+import json
+
+# collection -> indexes (named, so a synced database can be compared against the registry)
+INDEXES: Dict[str, List[IndexModel]] = {
+    "students": [
+        IndexModel([("student_id", ASCENDING)], name="student_id_unique", unique=True),
+        # Not unique: older profiles may share an email until they are cleaned up
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+    "instructors": [
+        IndexModel([("instructor_id", ASCENDING)], name="instructor_id_unique", unique=True),
+    ],
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ],
+    "pdf_exams": [
+        IndexModel([("exam_id", ASCENDING)], name="exam_id_unique", unique=True),
+        IndexModel([("student_id", ASCENDING)], name="student_id"),
+    ],
+    "completed_exams": [
+        IndexModel([("exam_id", ASCENDING)], name="exam_id_unique", unique=True),
+        # Per-student results and the instructor results listing, newest first
+        IndexModel([("student_id", ASCENDING), ("completed_at", DESCENDING), ("exam_id", ASCENDING)], name="student_completed_at"),
+        IndexModel([("completed_at", DESCENDING), ("exam_id", ASCENDING)], name="completed_at"),
+    ],
+    "completed_pdf_exams": [
+        IndexModel([("student_id", ASCENDING)], name="student_id"),
+        IndexModel([("completed_at", DESCENDING), ("exam_id", ASCENDING)], name="completed_at"),
+    ],
+    "exam_schedules": [
+        IndexModel([("student_id", ASCENDING)], name="student_id_unique", unique=True),
+    ],
+    "pdf_documents": [
+        IndexModel([("document_id", ASCENDING)], name="document_id_unique", unique=True),
+    ],
+    "question_cache": [
+        IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+    ],
+    "pregenerated_questions": [
+        IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+    ],
+}
+
+
+def _same_index(existing: Dict, model: IndexModel) -> bool:
+    spec = model.document
+    return list(existing["key"].items()) == list(spec["key"].items()) and bool(existing.get("unique")) == bool(spec.get("unique"))
+
+
+def sync_indexes(db, drop_unknown: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Create registry indexes missing from db; with drop_unknown, also drop indexes the registry
+    doesn't declare. An index whose definition changed is rebuilt under its name.
+    Returns {collection: {"created", "existing", "dropped", "failed"}} index names.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        result = {"created": [], "existing": [], "dropped": [], "failed": []}
+        existing = {index["name"]: index for index in collection.list_indexes()}
+
+        for model in models:
+            name = model.document["name"]
+            current = existing.get(name) or next(
+                (index for index in existing.values() if list(index["key"].items()) == list(model.document["key"].items())), None
+            )
+            if current and _same_index(current, model):
+                result["existing"].append(current["name"])
+                continue
+            try:
+                if current:
+                    collection.drop_index(current["name"])
+                    result["dropped"].append(current["name"])
+                collection.create_indexes([model])
+                result["created"].append(name)
+            except OperationFailure as e:
+                # e.g. duplicate values under a unique index; keep going with the others
+                print(f"⚠️ [MONGO_INDEXES] Could not create {collection_name}.{name}: {e}")
+                result["failed"].append(name)
+
+        if drop_unknown:
+            declared = {model.document["name"] for model in models} | set(result["existing"])
+            for name in existing:
+                if name != "_id_" and name not in declared and name not in result["dropped"]:
+                    collection.drop_index(name)
+                    result["dropped"].append(name)
+
+        report[collection_name] = result
+    return report
+
+
+def enable_profiling(db, slow_ms: int = 100):
+    """Record operations slower than slow_ms in db.system.profile"""
+    db.command("profile", 1, slowms=slow_ms)
+
+
+def collscan_report(db, slow_ms: int = 0, limit: int = 50) -> List[Dict]:
+    """Profiled queries (slowest first) that scanned a whole collection, grouped by collection and query shape"""
+    pipeline = [
+        {"$match": {"planSummary": "COLLSCAN", "millis": {"$gte": slow_ms}, "ns": {"$not": {"$regex": r"\.system\."}}}},
+        {"$group": {
+            "_id": {"ns": "$ns", "op": "$op", "filter": "$command.filter"},
+            "count": {"$sum": 1},
+            "max_millis": {"$max": "$millis"},
+            "docs_examined": {"$max": "$docsExamined"},
+            "last_seen": {"$max": "$ts"},
+        }},
+        {"$sort": {"max_millis": -1}},
+        {"$limit": limit},
+    ]
+    return [
+        {
+            "namespace": entry["_id"].get("ns"),
+            "op": entry["_id"].get("op"),
+            "filter_keys": sorted((entry["_id"].get("filter") or {}).keys()),
+            "count": entry["count"],
+            "max_millis": entry["max_millis"],
+            "docs_examined": entry.get("docs_examined"),
+            "last_seen": entry["last_seen"].isoformat() if entry.get("last_seen") else None,
+        }
+        for entry in db.system.profile.aggregate(pipeline)
+    ]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m app.services.mongo_indexes", description="Manage MongoDB indexes")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync = commands.add_parser("sync", help="create missing indexes from the registry")
+    sync.add_argument("--drop-unknown", action="store_true", help="drop indexes the registry doesn't declare")
+    report = commands.add_parser("report", help="list profiled queries that scanned a whole collection")
+    report.add_argument("--slow-ms", type=int, default=0, help="only queries at least this slow")
+    report.add_argument("--enable-profiling", action="store_true", help="start profiling operations slower than --slow-ms")
+    args = parser.parse_args(argv)
+
+    from app.services.mongo_service import mongo_service
+    if not mongo_service.is_connected():
+        raise SystemExit("MongoDB is not reachable")
+    db = mongo_service.db
+
+    if args.command == "sync":
+        print(json.dumps(sync_indexes(db, drop_unknown=args.drop_unknown), indent=2))
+    else:
+        if args.enable_profiling:
+            enable_profiling(db, args.slow_ms)
+            print(f"Profiling operations slower than {args.slow_ms} ms")
+        print(json.dumps(collscan_report(db, args.slow_ms), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
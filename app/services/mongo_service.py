@@ -1,38 +1,297 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
+from functools import cmp_to_key
+import base64
+import binascii
 import os
-from pymongo import MongoClient
-from pymongo.errors import ServerSelectionTimeoutError
+import threading
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateMany, UpdateOne
+from pymongo.errors import PyMongoError
 from dotenv import load_dotenv
+from app.core.serialization import dumps, loads
+from app.services.mongo_indexes import sync_indexes
 
 load_dotenv()
 
 MONGODB_URI = os.getenv("MONGODB_URI") or "mongodb://localhost:27017"
 DB_NAME = os.getenv("MONGODB_DB") or "exam_system_db"
+# Connection pool shared by the async and sync clients: a request waits at most
+# MONGODB_WAIT_QUEUE_TIMEOUT_MS for a free connection instead of queueing indefinitely
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE") or 100)
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE") or 0)
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS") or 5000)
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS") or 5000)
+# Create missing registry indexes on startup (python -m app.services.mongo_indexes sync does it on demand)
+MONGODB_SYNC_INDEXES = (os.getenv("MONGODB_SYNC_INDEXES") or "true").lower() in ("1", "true", "yes")
+# Delay before retrying a failed connection, doubled after each failure up to MONGODB_RECONNECT_MAX_SECONDS
+MONGODB_RECONNECT_SECONDS = float(os.getenv("MONGODB_RECONNECT_SECONDS") or 1)
+MONGODB_RECONNECT_MAX_SECONDS = float(os.getenv("MONGODB_RECONNECT_MAX_SECONDS") or 60)
+
+# Sort orders for listings; each ends with a unique field so keyset cursors are unambiguous
+Sort = List[Tuple[str, int]]
+STUDENT_SORT: Sort = [("student_id", ASCENDING)]
+PDF_EXAM_SORT: Sort = [("exam_id", ASCENDING)]
+COMPLETED_EXAM_SORT: Sort = [("completed_at", DESCENDING), ("exam_id", ASCENDING)]
+
+
+def page_cursor(docs: List[Dict], sort: Sort, limit: Optional[int]) -> Optional[str]:
+    """Opaque cursor for the page after docs (None when docs is the last page)"""
+    if not limit or len(docs) < limit:
+        return None
+    values = [docs[-1].get(field) for field, _ in sort]
+    return base64.urlsafe_b64encode(dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: Sort) -> List:
+    """Sort values a cursor from page_cursor points after (ValueError if malformed)"""
+    try:
+        values = loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _page_query(query: Dict, sort: Sort, cursor: Optional[str]) -> Dict:
+    """query restricted to documents after the cursor position in sort order"""
+    if not cursor:
+        return query
+    values = decode_cursor(cursor, sort)
+    after = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {sort_field: value for (sort_field, _), value in zip(sort[:i], values[:i])}
+        clause[field] = {"$gt" if direction == ASCENDING else "$lt": values[i]}
+        after.append(clause)
+    return {"$and": [query, {"$or": after}]} if query else {"$or": after}
+
+
+# Summary row of a completed exam, computed in the database by completed_exam_summaries
+_AVG_CHEAT_SCORE = {"$ifNull": [{"$avg": "$responses.cheat_score"}, 0]}
+# Fields derived from the stored document (defaults for older documents), added before filtering
+# and sorting so both see the values the rows show
+RESULT_SUMMARY_FIELDS = {
+    "total_score": {"$ifNull": ["$total_score", 0]},
+    "max_score": {"$ifNull": ["$max_score", {"$size": {"$ifNull": ["$question_scores", []]}}]},
+    "percentage": {"$ifNull": ["$percentage", 0]},
+    "suspicion_score": _AVG_CHEAT_SCORE,
+    # Stored at completion; derived from the cheat scores for older documents
+    "risk_level": {"$ifNull": ["$risk_level", {"$switch": {
+        "branches": [
+            {"case": {"$gte": [_AVG_CHEAT_SCORE, 6]}, "then": "HIGH"},
+            {"case": {"$gte": [_AVG_CHEAT_SCORE, 3]}, "then": "MEDIUM"},
+        ],
+        "default": "LOW"
+    }}]},
+    "total_questions": {"$size": {"$ifNull": ["$question_scores", []]}},
+}
+RESULT_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "exam_id": 1,
+    "student_id": 1,
+    "completed_at": 1,
+    **{field: 1 for field in RESULT_SUMMARY_FIELDS}
+}
+RESULT_SORT_FIELDS = ("completed_at", "percentage", "total_score", "student_id")
+
+
+def results_sort(sort_by: str = "completed_at", descending: bool = True) -> Sort:
+    """Sort for completed_exam_summaries (ValueError for an unsupported field)"""
+    if sort_by not in RESULT_SORT_FIELDS:
+        raise ValueError(f"sort_by must be one of {', '.join(RESULT_SORT_FIELDS)}")
+    return [(sort_by, DESCENDING if descending else ASCENDING), ("exam_id", ASCENDING)]
+
+
+def results_match(student_id: str = None, risk_level: str = None, min_percentage: float = None, max_percentage: float = None) -> Dict:
+    """Filter for completed_exam_summaries; also applied to in-memory rows by matches_results"""
+    match = {}
+    if student_id:
+        match["student_id"] = student_id
+    if risk_level:
+        match["risk_level"] = risk_level.upper()
+    if min_percentage is not None or max_percentage is not None:
+        match["percentage"] = {}
+        if min_percentage is not None:
+            match["percentage"]["$gte"] = min_percentage
+        if max_percentage is not None:
+            match["percentage"]["$lte"] = max_percentage
+    return match
+
+
+def matches_results(row: Dict, match: Dict) -> bool:
+    for field, condition in match.items():
+        value = row.get(field)
+        if isinstance(condition, dict):
+            if value is None:
+                return False
+            if "$gte" in condition and value < condition["$gte"]:
+                return False
+            if "$lte" in condition and value > condition["$lte"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def dashboard_pipeline(email: str) -> List[Dict]:
+    """
+    Aggregation on students assembling a student's dashboard in one round-trip: the profile plus
+    their exam schedule, PDF exams and completed exam summaries, each joined on an indexed student_id.
+    """
+    def by_student(*stages: Dict) -> List[Dict]:
+        return [{"$match": {"$expr": {"$eq": ["$student_id", "$$student_id"]}}}, *stages]
+
+    return [
+        {"$match": {"email": email}},
+        {"$limit": 1},
+        {"$lookup": {"from": "exam_schedules", "let": {"student_id": "$student_id"}, "as": "schedule",
+                     "pipeline": by_student({"$limit": 1}, {"$project": {"_id": 0}})}},
+        {"$lookup": {"from": "pdf_exams", "let": {"student_id": "$student_id"}, "as": "pdf_exams",
+                     "pipeline": by_student({"$project": {"_id": 0, "exam_id": 1, "exam_name": 1, "start_time": 1, "duration_minutes": 1}})}},
+        {"$lookup": {"from": "completed_exams", "let": {"student_id": "$student_id"}, "as": "completed_exams",
+                     "pipeline": by_student({"$sort": dict(COMPLETED_EXAM_SORT)}, {"$project": {
+                         "_id": 0, "exam_id": 1, "completed_at": 1,
+                         "total_score": {"$ifNull": ["$total_score", 0]},
+                         "total_questions": {"$ifNull": ["$total_questions", {"$size": {"$ifNull": ["$question_scores", []]}}]},
+                         "risk_level": {"$ifNull": ["$risk_level", "UNKNOWN"]},
+                     }})}},
+        {"$project": {"_id": 0, "student": "$$ROOT", "schedule": {"$arrayElemAt": ["$schedule", 0]}, "pdf_exams": 1, "completed_exams": 1}},
+        {"$project": {"student._id": 0, "student.schedule": 0, "student.pdf_exams": 0, "student.completed_exams": 0}},
+    ]
+
+
+def summaries_pipeline(match: Dict = None, sort: Sort = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+    """Aggregation behind completed_exam_summaries"""
+    # MongoDB moves the parts of $match on stored fields (student_id, completed_at) ahead of
+    # $addFields itself, so those still use indexes
+    pipeline = [
+        {"$addFields": RESULT_SUMMARY_FIELDS},
+        {"$match": _page_query(match or {}, sort, cursor)},
+        {"$sort": dict(sort)}
+    ]
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$project": RESULT_SUMMARY_PROJECTION})
+    return pipeline
+
+
+def question_set_update(key: str, questions: List[str], keep: int) -> List[Dict]:
+    """Update pipeline appending questions to key's question sets (moving an identical set to the end), keeping the newest keep"""
+    others = {"$filter": {
+        "input": {"$ifNull": ["$question_sets", []]},
+        "cond": {"$ne": ["$$this", {"$literal": questions}]}
+    }}
+    return [{"$set": {
+        "key": key,
+        "question_sets": {"$slice": [{"$concatArrays": [others, [{"$literal": questions}]]}, -keep]}
+    }}]
+
+
+def _compare_rows(a: Dict, b: Dict, sort: Sort) -> int:
+    for field, direction in sort:
+        x, y = a.get(field), b.get(field)
+        if x == y:
+            continue
+        # Missing values sort first, as in MongoDB
+        order = -1 if x is None else 1 if y is None else (-1 if x < y else 1)
+        return order * direction
+    return 0
+
+
+def sort_rows(rows: List[Dict], sort: Sort) -> List[Dict]:
+    """Sort in-memory rows the way MongoDB sorts documents by sort"""
+    return sorted(rows, key=cmp_to_key(lambda a, b: _compare_rows(a, b, sort)))
+
+
+def rows_after(rows: List[Dict], sort: Sort, cursor: Optional[str]) -> List[Dict]:
+    """In-memory rows past the cursor position (the counterpart of a keyset query)"""
+    if not cursor:
+        return rows
+    position = dict(zip((field for field, _ in sort), decode_cursor(cursor, sort)))
+    return [row for row in rows if _compare_rows(row, position, sort) > 0]
+
+
+def _projection(fields: Optional[List[str]], sort: Sort) -> Optional[Dict]:
+    """Inclusion projection of fields plus the sort fields the next cursor is built from"""
+    if not fields:
+        return None
+    return {field: 1 for field in list(fields) + [field for field, _ in sort]}
+
 
 class MongoService:
+    """
+    Synchronous data access for legacy callers (startup loading, sync routes, worker threads).
+    async_mongo_service has their coroutine versions for the event loop and shares this service's pool.
+    """
     def __init__(self):
         self.client: Optional[MongoClient] = None
+        self.async_client: Optional[AsyncIOMotorClient] = None
         self.db = None
+        self._connect_lock = threading.Lock()
+        self._next_connect = 0.0
+        self._connect_delay = MONGODB_RECONNECT_SECONDS
         self._connect()
 
-    def _connect(self):
+    def _connect(self) -> bool:
         try:
-            self.client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
+            # Motor wraps a pymongo client; using it as the sync client means one pool for both
+            self.async_client = AsyncIOMotorClient(
+                MONGODB_URI,
+                maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                minPoolSize=MONGODB_MIN_POOL_SIZE,
+                waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS
+            )
+            self.client = self.async_client.delegate
             # Trigger connection attempt
             self.client.server_info()
             self.db = self.client[DB_NAME]
-            # Ensure indexes
-            self.db.students.create_index("student_id", unique=True)
-            self.db.instructors.create_index("instructor_id", unique=True)
-            self.db.users.create_index("username", unique=True)
-        except ServerSelectionTimeoutError:
+            # Ensure the indexes declared in mongo_indexes
+            if MONGODB_SYNC_INDEXES:
+                report = sync_indexes(self.db)
+                created = [f"{name}.{index}" for name, result in report.items() for index in result["created"]]
+                if created:
+                    print(f"🗂️ [MONGO_INDEXES] Created indexes: {', '.join(created)}")
+            self._connect_delay = MONGODB_RECONNECT_SECONDS
+            return True
+        except PyMongoError as e:
+            if self.client is not None:
+                # Stop the failed client's monitor threads; the next attempt creates a new one
+                self.client.close()
             self.client = None
+            self.async_client = None
             self.db = None
-            print(f"⚠️ Could not connect to MongoDB at {MONGODB_URI}. Running without DB persistence.")
+            self._next_connect = time.monotonic() + self._connect_delay
+            print(
+                f"⚠️ Could not connect to MongoDB at {MONGODB_URI} ({e.__class__.__name__}). "
+                f"Running without DB persistence; retrying in {self._connect_delay:g}s."
+            )
+            self._connect_delay = min(self._connect_delay * 2, MONGODB_RECONNECT_MAX_SECONDS)
+            return False
 
     def is_connected(self) -> bool:
         return self.client is not None and self.db is not None
 
+    def ensure_connected(self) -> bool:
+        """
+        Reconnect if the connection failed and the backoff has elapsed; True when connected.
+        Blocks for up to the server selection timeout, so it is called from the write-behind thread.
+        """
+        if self.is_connected():
+            return True
+        if time.monotonic() < self._next_connect or not self._connect_lock.acquire(blocking=False):
+            return False
+        try:
+            if self.is_connected():
+                return True
+            if self._connect():
+                print(f"✅ Reconnected to MongoDB at {MONGODB_URI}")
+                return True
+            return False
+        finally:
+            self._connect_lock.release()
+
     # Student operations
     def create_student(self, student: Dict) -> bool:
         if not self.is_connected():
@@ -56,10 +315,22 @@ class MongoService:
             return None
         return self.db.students.find_one({"student_id": student_id})
 
-    def list_students(self) -> List[Dict]:
+    def list_students(self, projection: List[str] = None, sort: Sort = STUDENT_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        return self.find_page("students", {}, projection, sort, limit, cursor)
+
+    def find_page(self, collection: str, query: Dict, projection: List[str] = None, sort: Sort = None, limit: int = None, cursor: str = None) -> List[Dict]:
+        """
+        Documents matching query with only the projected fields, in sort order.
+        With limit, returns one page; pass page_cursor(page, sort, limit) as cursor for the next one.
+        Raises ValueError for a malformed cursor.
+        """
         if not self.is_connected():
             return []
-        docs = list(self.db.students.find({}))
+        sort = sort or [("_id", ASCENDING)]
+        docs = self.db[collection].find(_page_query(query, sort, cursor), _projection(projection, sort)).sort(sort)
+        if limit:
+            docs = docs.limit(limit)
+        docs = list(docs)
         # Convert any ObjectId fields if present - keep as-is since we store string ids
         for d in docs:
             d.pop("_id", None)
@@ -131,13 +402,59 @@ class MongoService:
             doc.pop("_id", None)
         return doc
 
-    def get_all_pdf_exams(self) -> List[Dict]:
+    def get_all_pdf_exams(self, projection: List[str] = None, sort: Sort = PDF_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        return self.find_page("pdf_exams", {}, projection, sort, limit, cursor)
+
+    # PDF document operations (extracted page text shared by PDF exams)
+    def create_pdf_document(self, document: Dict) -> bool:
         if not self.is_connected():
-            return []
-        docs = list(self.db.pdf_exams.find({}))
-        for d in docs:
-            d.pop("_id", None)
-        return docs
+            return False
+        try:
+            self.db.pdf_documents.update_one({"document_id": document["document_id"]}, {"$set": document}, upsert=True)
+            return True
+        except Exception as e:
+            print(f"Error creating pdf document in MongoDB: {e}")
+            return False
+
+    def set_pdf_document_pages(self, document_id: str, pages: Dict[int, str]) -> bool:
+        """Write extracted page texts into an existing document by page index"""
+        if not self.is_connected() or not pages:
+            return False
+        try:
+            update = {f"pages.{index}": text for index, text in pages.items()}
+            self.db.pdf_documents.update_one({"document_id": document_id}, {"$set": update})
+            return True
+        except Exception as e:
+            print(f"Error storing pdf document pages in MongoDB: {e}")
+            return False
+
+    def set_pdf_document_sections(self, document_id: str, sections: List[Dict]) -> bool:
+        if not self.is_connected():
+            return False
+        try:
+            self.db.pdf_documents.update_one({"document_id": document_id}, {"$set": {"sections": sections}})
+            return True
+        except Exception as e:
+            print(f"Error storing pdf sections in MongoDB: {e}")
+            return False
+
+    def set_pdf_document_index(self, document_id: str, index: Dict) -> bool:
+        if not self.is_connected():
+            return False
+        try:
+            self.db.pdf_documents.update_one({"document_id": document_id}, {"$set": {"retrieval_index": index}})
+            return True
+        except Exception as e:
+            print(f"Error storing pdf retrieval index in MongoDB: {e}")
+            return False
+
+    def get_pdf_document(self, document_id: str) -> Optional[Dict]:
+        if not self.is_connected():
+            return None
+        doc = self.db.pdf_documents.find_one({"document_id": document_id})
+        if doc:
+            doc.pop("_id", None)
+        return doc
 
     # Completed exams operations
     def create_completed_exam(self, exam: Dict) -> bool:
@@ -150,13 +467,8 @@ class MongoService:
             print(f"Error creating completed exam in MongoDB: {e}")
             return False
 
-    def get_completed_exams_by_student(self, student_id: str) -> List[Dict]:
-        if not self.is_connected():
-            return []
-        docs = list(self.db.completed_exams.find({"student_id": student_id}))
-        for d in docs:
-            d.pop("_id", None)
-        return docs
+    def get_completed_exams_by_student(self, student_id: str, projection: List[str] = None, sort: Sort = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        return self.find_page("completed_exams", {"student_id": student_id}, projection, sort, limit, cursor)
 
     def get_completed_exam_by_id(self, exam_id: str) -> Optional[Dict]:
         """Get a completed exam by exam_id"""
@@ -167,23 +479,34 @@ class MongoService:
             doc.pop("_id", None)
         return doc
 
-    def get_all_completed_exams(self) -> List[Dict]:
-        """Get all completed exams"""
+    def get_all_completed_exams(self, projection: List[str] = None, sort: Sort = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        """Get all completed exams (most recent first)"""
+        return self.find_page("completed_exams", {}, projection, sort, limit, cursor)
+
+    def completed_exam_summaries(self, match: Dict = None, sort: Sort = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        """
+        One summary row per completed exam (see RESULT_SUMMARY_FIELDS), computed by an
+        aggregation so responses and question scores never leave the database.
+        match filters on the summary fields (see results_match); sort/limit/cursor page as in find_page.
+        """
         if not self.is_connected():
             return []
-        docs = list(self.db.completed_exams.find({}))
-        for d in docs:
-            d.pop("_id", None)
-        return docs
+        return list(self.db.completed_exams.aggregate(summaries_pipeline(match, sort, limit, cursor)))
 
-    def get_all_completed_pdf_exams(self) -> List[Dict]:
+    def get_student_dashboard(self, email: str) -> Optional[Dict]:
+        """
+        {"student", "schedule", "pdf_exams", "completed_exams"} for the student with this email
+        (see dashboard_pipeline), or None if there is no such student
+        """
         if not self.is_connected():
-            return []
+            return None
+        return next(self.db.students.aggregate(dashboard_pipeline(email)), None)
+
+    def get_all_completed_pdf_exams(self, projection: List[str] = None, sort: Sort = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
         try:
-            docs = list(self.db.completed_pdf_exams.find({}))
-            for d in docs:
-                d.pop("_id", None)
-            return docs
+            return self.find_page("completed_pdf_exams", {}, projection, sort, limit, cursor)
+        except ValueError:
+            raise
         except Exception as e:
             print(f"Error getting completed PDF exams from MongoDB: {e}")
             return []
@@ -205,6 +528,14 @@ class MongoService:
             doc.pop("_id", None)
         return doc
 
+    def get_all_exam_schedules(self) -> List[Dict]:
+        if not self.is_connected():
+            return []
+        docs = list(self.db.exam_schedules.find({}))
+        for d in docs:
+            d.pop("_id", None)
+        return docs
+
     def delete_exam_schedule(self, student_id: str) -> bool:
         if not self.is_connected():
             return False
@@ -215,41 +546,318 @@ class MongoService:
             print(f"Error deleting exam schedule in MongoDB: {e}")
             return False
 
-    def update_student_id(self, old_student_id: str, new_student_id: str) -> bool:
+    # Question cache operations
+    def get_question_sets(self, key: str) -> List[List[str]]:
+        if not self.is_connected():
+            return []
+        doc = self.db.question_cache.find_one({"key": key}, {"question_sets": 1})
+        return doc.get("question_sets", []) if doc else []
+
+    def add_question_set(self, key: str, questions: List[str], keep: int) -> bool:
         """
-        Migrate a student's identifier across collections.
-        Returns True on success, False on failure.
+        Append a question set to key's entry in one atomic update (an identical set moves to the end),
+        keeping the newest keep sets, so concurrent workers' sets are never overwritten
         """
         if not self.is_connected():
             return False
         try:
-            # Update students collection (change the student_id field)
-            students = self.db.students
-            # Ensure target id does not exist
-            if students.find_one({"student_id": new_student_id}):
-                print(f"Error: target student_id {new_student_id} already exists in DB")
-                return False
+            self.db.question_cache.update_one({"key": key}, question_set_update(key, questions, keep), upsert=True)
+            return True
+        except Exception as e:
+            print(f"Error saving question cache entry in MongoDB: {e}")
+            return False
+
+    # Pre-generated exam questions (one set per student and scheduled exam)
+    def save_pregenerated_questions(self, entry: Dict) -> bool:
+        if not self.is_connected():
+            return False
+        try:
+            self.db.pregenerated_questions.update_one({"key": entry["key"]}, {"$set": entry}, upsert=True)
+            return True
+        except Exception as e:
+            print(f"Error saving pre-generated questions in MongoDB: {e}")
+            return False
 
-            res = students.update_one({"student_id": old_student_id}, {"$set": {"student_id": new_student_id}})
+    def get_pregenerated_questions(self, key: str) -> Optional[Dict]:
+        if not self.is_connected():
+            return None
+        doc = self.db.pregenerated_questions.find_one({"key": key})
+        if doc:
+            doc.pop("_id", None)
+        return doc
+
+    def take_pregenerated_questions(self, key: str) -> Optional[Dict]:
+        """Fetch and remove a pre-generated question set (each set is used by one exam start)"""
+        if not self.is_connected():
+            return None
+        try:
+            doc = self.db.pregenerated_questions.find_one_and_delete({"key": key})
+        except Exception as e:
+            print(f"Error taking pre-generated questions from MongoDB: {e}")
+            return None
+        if doc:
+            doc.pop("_id", None)
+        return doc
+
+    def supports_transactions(self) -> bool:
+        """Multi-document transactions need a replica set or sharded cluster"""
+        return self.is_connected() and self.client.topology_description.topology_type_name in (
+            "ReplicaSetWithPrimary", "Sharded", "LoadBalanced"
+        )
 
-            # Update related collections that reference student_id
-            try:
-                self.db.pdf_exams.update_many({"student_id": old_student_id}, {"$set": {"student_id": new_student_id}})
-            except Exception:
-                pass
-            try:
-                self.db.completed_exams.update_many({"student_id": old_student_id}, {"$set": {"student_id": new_student_id}})
-            except Exception:
-                pass
-            try:
-                self.db.exam_schedules.update_one({"student_id": old_student_id}, {"$set": {"student_id": new_student_id}})
-            except Exception:
-                pass
+    def migrate_student_id(self, old_student_id: str, new_student_id: str, student: Dict = None) -> Dict[str, int]:
+        """
+        Move a student and every document referencing them to a new student_id, one bulk_write
+        per collection, inside a transaction when the deployment supports one.
+        student (if given) is written as the migrated student document.
+        Returns {collection: documents moved}; raises ValueError if new_student_id is taken
+        and PyMongoError if the migration fails (nothing is changed when it ran in a transaction).
+        """
+        if not self.is_connected():
+            return {}
+
+        def migrate(session=None) -> Dict[str, int]:
+            if self.db.students.find_one({"student_id": new_student_id}, {"_id": 1}, session=session):
+                raise ValueError(f"student_id {new_student_id} already exists")
+            moved = {}
+            for collection, ops in self._student_id_migration(old_student_id, new_student_id, student):
+                result = self.db[collection].bulk_write(ops, ordered=True, session=session)
+                moved[collection] = result.modified_count + result.upserted_count
+            return moved
+
+        if not self.supports_transactions():
+            # Standalone server: the students update runs first, so a clash stops it before the rest
+            return migrate()
+        with self.client.start_session() as session:
+            return session.with_transaction(migrate)
+
+    @staticmethod
+    def _student_id_migration(old_student_id: str, new_student_id: str, student: Dict = None) -> List[Tuple[str, List]]:
+        rename = {"$set": {"student_id": new_student_id}}
+        student_update = {"$set": {**{k: v for k, v in student.items() if k != "_id"}, "student_id": new_student_id}} if student else rename
+        return [
+            ("students", [UpdateOne({"student_id": old_student_id}, student_update, upsert=bool(student))]),
+            ("exam_schedules", [UpdateOne({"student_id": old_student_id}, rename)]),
+            ("pdf_exams", [UpdateMany({"student_id": old_student_id}, rename)]),
+            ("completed_exams", [UpdateMany({"student_id": old_student_id}, rename)]),
+            ("completed_pdf_exams", [UpdateMany({"student_id": old_student_id}, rename)]),
+        ]
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+
+
+class AsyncMongoService:
+    """
+    Coroutine versions of MongoService's operations (Motor), so async routes and WebSocket
+    handlers don't block the event loop on database round-trips. Shares MongoService's pool.
+    """
+    def __init__(self, sync_service: MongoService):
+        self._sync = sync_service
+
+    @property
+    def db(self):
+        client = self._sync.async_client
+        return client[DB_NAME] if client is not None and self._sync.is_connected() else None
+
+    def is_connected(self) -> bool:
+        return self.db is not None
+
+    async def _upsert(self, collection: str, key_field: str, doc: Dict, label: str) -> bool:
+        if not self.is_connected():
+            return False
+        try:
+            await self.db[collection].update_one({key_field: doc[key_field]}, {"$set": doc}, upsert=True)
+            return True
+        except Exception as e:
+            print(f"Error creating {label} in MongoDB: {e}")
+            return False
 
+    async def _update(self, collection: str, query: Dict, update: Dict, label: str) -> bool:
+        if not self.is_connected():
+            return False
+        try:
+            await self.db[collection].update_one(query, update)
             return True
         except Exception as e:
-            print(f"Error migrating student_id in MongoDB: {e}")
+            print(f"Error storing {label} in MongoDB: {e}")
             return False
 
-# Global instance
+    async def _find_one(self, collection: str, query: Dict, projection: Dict = None) -> Optional[Dict]:
+        if not self.is_connected():
+            return None
+        doc = await self.db[collection].find_one(query, projection)
+        if doc:
+            doc.pop("_id", None)
+        return doc
+
+    async def _find_all(self, collection: str, query: Dict) -> List[Dict]:
+        return await self.find_page(collection, query)
+
+    async def find_page(self, collection: str, query: Dict, projection: List[str] = None, sort: Sort = None, limit: int = None, cursor: str = None) -> List[Dict]:
+        """See MongoService.find_page"""
+        if not self.is_connected():
+            return []
+        sort = sort or [("_id", ASCENDING)]
+        docs = self.db[collection].find(_page_query(query, sort, cursor), _projection(projection, sort)).sort(sort)
+        if limit:
+            docs = docs.limit(limit)
+        docs = await docs.to_list(length=None)
+        for d in docs:
+            d.pop("_id", None)
+        return docs
+
+    # Student operations
+    async def create_student(self, student: Dict) -> bool:
+        return await self._upsert("students", "student_id", student, "student")
+
+    async def get_student_by_email(self, email: str) -> Optional[Dict]:
+        return await self._find_one("students", {"email": email})
+
+    async def get_student_by_id(self, student_id: str) -> Optional[Dict]:
+        return await self._find_one("students", {"student_id": student_id})
+
+    async def list_students(self, projection: List[str] = None, sort: Sort = STUDENT_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        return await self.find_page("students", {}, projection, sort, limit, cursor)
+
+    # User operations (for auth)
+    async def create_user(self, user: Dict) -> bool:
+        return await self._upsert("users", "username", user, "user")
+
+    async def get_user_by_username(self, username: str) -> Optional[Dict]:
+        return await self._find_one("users", {"username": username})
+
+    # Instructor operations
+    async def create_instructor(self, instructor: Dict) -> bool:
+        return await self._upsert("instructors", "instructor_id", instructor, "instructor")
+
+    async def list_instructors(self) -> List[Dict]:
+        return await self._find_all("instructors", {})
+
+    # PDF exam operations
+    async def create_pdf_exam(self, exam: Dict) -> bool:
+        return await self._upsert("pdf_exams", "exam_id", exam, "pdf exam")
+
+    async def get_pdf_exams_by_student(self, student_id: str) -> List[Dict]:
+        return await self._find_all("pdf_exams", {"student_id": student_id})
+
+    async def get_pdf_exam_by_id(self, exam_id: str) -> Optional[Dict]:
+        return await self._find_one("pdf_exams", {"exam_id": exam_id})
+
+    async def get_all_pdf_exams(self, projection: List[str] = None, sort: Sort = PDF_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        return await self.find_page("pdf_exams", {}, projection, sort, limit, cursor)
+
+    # PDF document operations
+    async def create_pdf_document(self, document: Dict) -> bool:
+        return await self._upsert("pdf_documents", "document_id", document, "pdf document")
+
+    async def set_pdf_document_pages(self, document_id: str, pages: Dict[int, str]) -> bool:
+        if not pages:
+            return False
+        update = {f"pages.{index}": text for index, text in pages.items()}
+        return await self._update("pdf_documents", {"document_id": document_id}, {"$set": update}, "pdf document pages")
+
+    async def set_pdf_document_sections(self, document_id: str, sections: List[Dict]) -> bool:
+        return await self._update("pdf_documents", {"document_id": document_id}, {"$set": {"sections": sections}}, "pdf sections")
+
+    async def set_pdf_document_index(self, document_id: str, index: Dict) -> bool:
+        return await self._update("pdf_documents", {"document_id": document_id}, {"$set": {"retrieval_index": index}}, "pdf retrieval index")
+
+    async def get_pdf_document(self, document_id: str) -> Optional[Dict]:
+        return await self._find_one("pdf_documents", {"document_id": document_id})
+
+    # Completed exams operations
+    async def create_completed_exam(self, exam: Dict) -> bool:
+        return await self._upsert("completed_exams", "exam_id", exam, "completed exam")
+
+    async def get_completed_exams_by_student(self, student_id: str, projection: List[str] = None, sort: Sort = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        return await self.find_page("completed_exams", {"student_id": student_id}, projection, sort, limit, cursor)
+
+    async def get_completed_exam_by_id(self, exam_id: str) -> Optional[Dict]:
+        return await self._find_one("completed_exams", {"exam_id": exam_id})
+
+    async def get_all_completed_exams(self, projection: List[str] = None, sort: Sort = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        return await self.find_page("completed_exams", {}, projection, sort, limit, cursor)
+
+    async def completed_exam_summaries(self, match: Dict = None, sort: Sort = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        """See MongoService.completed_exam_summaries"""
+        if not self.is_connected():
+            return []
+        return await self.db.completed_exams.aggregate(summaries_pipeline(match, sort, limit, cursor)).to_list(length=None)
+
+    async def get_student_dashboard(self, email: str) -> Optional[Dict]:
+        if not self.is_connected():
+            return None
+        docs = await self.db.students.aggregate(dashboard_pipeline(email)).to_list(length=1)
+        return docs[0] if docs else None
+
+    async def get_all_completed_pdf_exams(self, projection: List[str] = None, sort: Sort = COMPLETED_EXAM_SORT, limit: int = None, cursor: str = None) -> List[Dict]:
+        try:
+            return await self.find_page("completed_pdf_exams", {}, projection, sort, limit, cursor)
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"Error getting completed PDF exams from MongoDB: {e}")
+            return []
+
+    # Exam schedule operations
+    async def create_exam_schedule(self, schedule: Dict) -> bool:
+        return await self._upsert("exam_schedules", "student_id", schedule, "exam schedule")
+
+    async def get_exam_schedule(self, student_id: str) -> Optional[Dict]:
+        return await self._find_one("exam_schedules", {"student_id": student_id})
+
+    async def get_all_exam_schedules(self) -> List[Dict]:
+        return await self._find_all("exam_schedules", {})
+
+    async def delete_exam_schedule(self, student_id: str) -> bool:
+        if not self.is_connected():
+            return False
+        try:
+            await self.db.exam_schedules.delete_one({"student_id": student_id})
+            return True
+        except Exception as e:
+            print(f"Error deleting exam schedule in MongoDB: {e}")
+            return False
+
+    # Question cache operations
+    async def get_question_sets(self, key: str) -> List[List[str]]:
+        doc = await self._find_one("question_cache", {"key": key}, {"question_sets": 1})
+        return doc.get("question_sets", []) if doc else []
+
+    async def add_question_set(self, key: str, questions: List[str], keep: int) -> bool:
+        """See MongoService.add_question_set"""
+        if not self.is_connected():
+            return False
+        try:
+            await self.db.question_cache.update_one({"key": key}, question_set_update(key, questions, keep), upsert=True)
+            return True
+        except Exception as e:
+            print(f"Error saving question cache entry in MongoDB: {e}")
+            return False
+
+    # Pre-generated exam questions
+    async def save_pregenerated_questions(self, entry: Dict) -> bool:
+        return await self._upsert("pregenerated_questions", "key", entry, "pre-generated questions")
+
+    async def get_pregenerated_questions(self, key: str) -> Optional[Dict]:
+        return await self._find_one("pregenerated_questions", {"key": key})
+
+    async def take_pregenerated_questions(self, key: str) -> Optional[Dict]:
+        """Fetch and remove a pre-generated question set (each set is used by one exam start)"""
+        if not self.is_connected():
+            return None
+        try:
+            doc = await self.db.pregenerated_questions.find_one_and_delete({"key": key})
+        except Exception as e:
+            print(f"Error taking pre-generated questions from MongoDB: {e}")
+            return None
+        if doc:
+            doc.pop("_id", None)
+        return doc
+
+
+# Global instances (the async service shares the sync service's client and pool)
 mongo_service = MongoService()
+async_mongo_service = AsyncMongoService(mongo_service)
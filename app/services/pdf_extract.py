@@ -0,0 +1,76 @@
+"""
+PDF text extraction primitives
+Kept free of app imports so process-pool workers can load it without connecting to
+MongoDB or reading settings.
+"""
+from typing import Dict, List, Optional, Tuple
+import pdfplumber
+from pdfminer.pdfdocument import PDFNoOutlines
+from pdfminer.pdftypes import PDFObjRef, resolve1
+from pdfminer.psparser import PSException, PSLiteral
+
+# Top fraction of a page, and number of its lines, scanned for headings
+HEADING_BAND_FRACTION = 0.2
+HEADING_LINES = 2
+
+
+def count_pages(pdf_path: str) -> int:
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_range(pdf_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """Extract text of pages [start, end) as (page_index, text) pairs"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [(i, pdf.pages[i].extract_text() or "") for i in range(start, min(end, len(pdf.pages)))]
+
+
+
+def read_outline(pdf_path: str) -> List[Dict]:
+    """
+    Bookmarks of a PDF as [{title, level, page}] (page is a 0-based index), in outline order.
+    Returns [] when the PDF has no outline or it can't be read.
+    """
+    entries = []
+    with pdfplumber.open(pdf_path) as pdf:
+        page_indexes = {page.page_obj.pageid: i for i, page in enumerate(pdf.pages)}
+        try:
+            for level, title, dest, action, _ in pdf.doc.get_outlines():
+                page = _outline_page(pdf.doc, dest, action, page_indexes)
+                if title and page is not None:
+                    entries.append({"title": str(title).strip(), "level": level, "page": page})
+        except (PDFNoOutlines, PSException, KeyError, TypeError, ValueError):
+            return []
+    return entries
+
+
+def _outline_page(doc, dest, action, page_indexes: Dict) -> Optional[int]:
+    if dest is None and action:
+        action = resolve1(action)
+        if isinstance(action, dict):
+            dest = action.get("D")
+    dest = resolve1(dest)
+    # Named destinations point into the document's name tree
+    if isinstance(dest, (str, bytes, PSLiteral)):
+        name = dest.name if isinstance(dest, PSLiteral) else dest
+        try:
+            dest = resolve1(doc.get_dest(name))
+        except Exception:
+            return None
+    if isinstance(dest, dict):
+        dest = resolve1(dest.get("D"))
+    if isinstance(dest, list) and dest and isinstance(dest[0], PDFObjRef):
+        return page_indexes.get(dest[0].objid)
+    return None
+
+
+def extract_page_headings(pdf_path: str, start: int, end: int) -> List[Tuple[int, List[str]]]:
+    """First lines of the top band of pages [start, end), where chapter/section headings usually sit"""
+    headings = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for i in range(start, min(end, len(pdf.pages))):
+            page = pdf.pages[i]
+            top = page.crop((0, 0, page.width, page.height * HEADING_BAND_FRACTION))
+            lines = [line.strip() for line in (top.extract_text() or "").splitlines() if line.strip()]
+            headings.append((i, lines[:HEADING_LINES]))
+    return headings
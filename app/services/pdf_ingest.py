@@ -0,0 +1,419 @@
+"""
+PDF ingestion pipeline
+Extracts per-page text once, when an instructor uploads a PDF, and stores it as a document
+shared by every exam built from the same file, so starting an exam does no PDF parsing.
+Extraction runs on a process pool in page batches; finished pages are streamed into
+storage as they arrive and progress is tracked as an ingestion job.
+"""
+from typing import Dict, List, Optional
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from datetime import datetime
+from app.core.security import IST
+from app.services.mongo_service import mongo_service, async_mongo_service
+from app.services.pdf_extract import count_pages, extract_page_headings, extract_page_range, read_outline
+from app.services import pdf_retrieval, pdf_sections
+import hashlib
+import multiprocessing
+import os
+import threading
+import uuid
+
+# Worker processes used for extraction, and pages handed to a worker per task
+PDF_INGEST_WORKERS = int(os.getenv("PDF_INGEST_WORKERS") or max(1, (os.cpu_count() or 2) - 1))
+PDF_INGEST_BATCH_PAGES = int(os.getenv("PDF_INGEST_BATCH_PAGES") or 8)
+# How long a reader of a document still being extracted waits for the job to finish
+PDF_INGEST_WAIT_SECONDS = float(os.getenv("PDF_INGEST_WAIT_SECONDS") or 30)
+# How long a finished job stays queryable (and its Future kept) before it is dropped
+PDF_INGEST_JOB_TTL_SECONDS = float(os.getenv("PDF_INGEST_JOB_TTL_SECONDS") or 3600)
+
+
+def document_id_for(pdf_path: str) -> str:
+    """Content address of a PDF file: identical uploads share one document"""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return f"pdf_{digest.hexdigest()}"
+
+
+def _page_batches(pages: List[int]):
+    """Group sorted page indexes into contiguous [start, end) runs of at most PDF_INGEST_BATCH_PAGES"""
+    batch_start = None
+    previous = None
+    for page in sorted(pages):
+        if batch_start is not None and (page != previous + 1 or page - batch_start >= PDF_INGEST_BATCH_PAGES):
+            yield batch_start, previous + 1
+            batch_start = None
+        if batch_start is None:
+            batch_start = page
+        previous = page
+    if batch_start is not None:
+        yield batch_start, previous + 1
+
+
+class PDFIngestService:
+    def __init__(self):
+        self.documents: Dict = {}  # document_id -> document (pages, page_count, status, ...)
+        self.jobs: Dict = {}  # job_id -> ingestion job status
+        self._document_jobs: Dict = {}  # document_id -> ids of jobs currently extracting its pages
+        self._running_requests: Dict = {}  # (document_id, page ranges) -> id of the job extracting them
+        self._job_futures: Dict = {}  # job_id -> Future resolved with the document when the job ends
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Spawned (not forked) workers: safe alongside the server's threads and event loop
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=PDF_INGEST_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    # -------- Ingestion jobs --------
+    def submit(self, pdf_path: str, pdf_filename: str = None, instruction: str = None) -> Dict:
+        """
+        Start extracting a PDF in the background and return its job.
+        With an instruction naming chapters, sections or pages, only the pages it resolves to
+        (job["page_ranges"]) are extracted. Pages already extracted complete immediately; the
+        same request for a document already being extracted returns the running job.
+        Resolving chapters or sections may need the PDF's outline or headings, so unless they
+        are already known that happens in the job and job["page_ranges"] is set once it has.
+        """
+        document_id = document_id_for(pdf_path)
+        document = self.get_document(document_id)
+        resolved, page_ranges = self._resolve_known_page_ranges(document, instruction)
+        if resolved:
+            request_key = (document_id, tuple(page_ranges or ()))
+        else:
+            request_key = (document_id, (instruction or "").strip().lower())
+
+        self._prune_jobs()
+
+        # Checked and registered in one critical section, so identical requests share one job
+        with self._lock:
+            running_job_id = self._running_requests.get(request_key)
+            if running_job_id:
+                return self.jobs[running_job_id]
+
+            job_id = f"ingest_{uuid.uuid4()}"
+            job = {
+                "job_id": job_id,
+                "document_id": document_id,
+                "pdf_filename": pdf_filename,
+                "page_ranges": self._job_page_ranges(page_ranges) if resolved else None,
+                "status": "queued",
+                "pages_done": 0,
+                "page_count": None,
+                "error": None,
+                "created_at": datetime.now(IST),
+                "finished_at": None
+            }
+            future = Future()
+            self.jobs[job_id] = job
+            self._job_futures[job_id] = future
+
+            missing_pages = None
+            if resolved and document:
+                missing_pages = self._count_job_pages(job, document, page_ranges)
+            if missing_pages == []:
+                job.update({"status": "completed", "finished_at": datetime.now(IST)})
+            else:
+                self._running_requests[request_key] = job_id
+                self._document_jobs.setdefault(document_id, set()).add(job_id)
+
+        if missing_pages == []:
+            future.set_result(document)
+            return job
+
+        threading.Thread(
+            target=self._run_job,
+            args=(job_id, request_key, pdf_path, pdf_filename, instruction),
+            name=f"pdf-ingest-{job_id}",
+            daemon=True
+        ).start()
+        return job
+
+    @staticmethod
+    def _job_page_ranges(page_ranges: Optional[List]) -> Optional[List]:
+        return [list(span) for span in page_ranges] if page_ranges else None
+
+    @staticmethod
+    def _count_job_pages(job: Dict, document: Dict, page_ranges: Optional[List]) -> List[int]:
+        """Record the job's page counts (call under the lock); returns the wanted pages not yet extracted"""
+        wanted_pages = pdf_sections.pages_in(page_ranges, document["page_count"])
+        missing_pages = [page for page in wanted_pages if document["pages"][page] is None]
+        job["page_count"] = len(wanted_pages)
+        job["pages_done"] = len(wanted_pages) - len(missing_pages)
+        return missing_pages
+
+    def _prune_jobs(self):
+        """Drop jobs (and their Futures) that finished more than PDF_INGEST_JOB_TTL_SECONDS ago"""
+        now = datetime.now(IST)
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self.jobs.items()
+                if job["finished_at"] and (now - job["finished_at"]).total_seconds() > PDF_INGEST_JOB_TTL_SECONDS
+            ]
+            for job_id in expired:
+                self.jobs.pop(job_id, None)
+                self._job_futures.pop(job_id, None)
+
+    def _get_or_create_document(self, document_id: str, pdf_path: str, pdf_filename: str) -> Dict:
+        document = self.get_document(document_id)
+        if document:
+            return document
+
+        page_count = count_pages(pdf_path)
+        document = {
+            "document_id": document_id,
+            "pdf_path": pdf_path,
+            "pdf_filename": pdf_filename,
+            "page_count": page_count,
+            "pages": [None] * page_count,  # None until the page has been extracted
+            "sections": None,  # outline/heading entries, read when an instruction first needs them
+            "status": "processing",
+            "created_at": datetime.now(IST)
+        }
+        with self._lock:
+            document = self.documents.setdefault(document_id, document)
+        self._persist(document)
+        return document
+
+    def _resolve_known_page_ranges(self, document: Optional[Dict], instruction: str):
+        """(resolved, page_ranges) without reading the PDF: resolved is False when its sections are needed first"""
+        if not pdf_sections.references_sections(instruction):
+            return True, None
+        if not document:
+            return False, None
+        if pdf_sections.references_only_pages(instruction):
+            return True, pdf_sections.resolve_page_ranges(instruction, [], document["page_count"])
+        if document.get("sections") is not None:
+            return True, pdf_sections.resolve_page_ranges(instruction, document["sections"], document["page_count"])
+        return False, None
+
+    def resolve_page_ranges(self, document: Dict, instruction: str) -> Optional[List]:
+        """Page spans an instruction refers to, or None for the whole document (reads the PDF's sections if needed)"""
+        resolved, page_ranges = self._resolve_known_page_ranges(document, instruction)
+        if resolved:
+            return page_ranges
+
+        sections = self._read_sections(document["pdf_path"], document["page_count"])
+        with self._lock:
+            if document.get("sections") is None:
+                document["sections"] = sections
+            sections = document["sections"]
+        try:
+            mongo_service.set_pdf_document_sections(document["document_id"], sections)
+        except Exception as e:
+            print(f"Warning: Could not store sections of {document['document_id']} in DB: {e}")
+        return pdf_sections.resolve_page_ranges(instruction, sections, document["page_count"])
+
+    def _read_sections(self, pdf_path: str, page_count: int) -> List[Dict]:
+        """Section entries from the PDF outline, or from page headings when it has none"""
+        try:
+            outline = read_outline(pdf_path)
+        except Exception as e:
+            print(f"Warning: Could not read PDF outline: {e}")
+            outline = []
+        if outline:
+            return pdf_sections.sections_from_outline(outline)
+
+        pool = self._get_pool()
+        tasks = [
+            pool.submit(extract_page_headings, pdf_path, start, start + PDF_INGEST_BATCH_PAGES)
+            for start in range(0, page_count, PDF_INGEST_BATCH_PAGES)
+        ]
+        headings = [heading for task in tasks for heading in task.result()]
+        return pdf_sections.sections_from_headings(headings)
+
+    def _run_job(self, job_id: str, request_key, pdf_path: str, pdf_filename: str, instruction: str):
+        job = self.jobs[job_id]
+        document_id = job["document_id"]
+        future = self._job_futures[job_id]
+        document = None
+        page_ranges = None
+
+        try:
+            job["status"] = "running"
+            document = self._get_or_create_document(document_id, pdf_path, pdf_filename)
+            if pdf_sections.references_sections(instruction):
+                # Resolved here, off the request path, when the outline or headings have to be read
+                page_ranges = self.resolve_page_ranges(document, instruction)
+                if page_ranges:
+                    print(f"📑 [PDF_INGEST] '{instruction}' -> pages {', '.join(f'{s + 1}-{e}' for s, e in page_ranges)}")
+                else:
+                    print(f"⚠️ [PDF_INGEST] Could not locate '{instruction}' in the PDF; using the whole document")
+            with self._lock:
+                job["page_ranges"] = self._job_page_ranges(page_ranges)
+                pages = self._count_job_pages(job, document, page_ranges)
+
+            pool = self._get_pool()
+            tasks = [pool.submit(extract_page_range, pdf_path, start, end) for start, end in _page_batches(pages)]
+            # Stream each batch into storage as soon as it finishes
+            for task in as_completed(tasks):
+                extracted = task.result()
+                with self._lock:
+                    for page_index, text in extracted:
+                        document["pages"][page_index] = text
+                    job["pages_done"] += len(extracted)
+                try:
+                    mongo_service.set_pdf_document_pages(document_id, dict(extracted))
+                except Exception as e:
+                    print(f"Warning: Could not store pages of {document_id} in DB: {e}")
+
+            # Index the pages extracted so far, once; it is rebuilt only when more pages land
+            document["retrieval_index"] = self._build_index(document)
+            document["status"] = "ready" if all(page is not None for page in document["pages"]) else "partial"
+            self._persist(document)
+            job["status"] = "completed"
+            print(f"📄 [PDF_INGEST] Extracted {len(pages)} of {document['page_count']} pages from {pdf_filename or pdf_path}")
+            future.set_result(document)
+        except Exception as e:
+            print(f"❌ [PDF_INGEST] Job {job_id} failed: {e}")
+            job["status"] = "failed"
+            job["error"] = str(e)
+            with self._lock:
+                if document and document.get("status") != "ready":
+                    document["status"] = "failed"
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                job["finished_at"] = datetime.now(IST)
+                self._running_requests.pop(request_key, None)
+                self._document_jobs.get(document_id, set()).discard(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        return self.jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float = None) -> Dict:
+        """Block until a job finishes; returns the document or raises the job's error"""
+        return self._job_futures[job_id].result(timeout=timeout)
+
+    def future(self, job_id: str) -> Future:
+        """Future resolved when the job finishes (wrap with asyncio.wrap_future to await it)"""
+        return self._job_futures[job_id]
+
+    def ingest(self, pdf_path: str, pdf_filename: str = None, instruction: str = None) -> Dict:
+        """Extract and store a PDF's pages (those the instruction refers to), blocking until done; returns the job"""
+        job = self.submit(pdf_path, pdf_filename, instruction)
+        self.wait(job["job_id"])
+        return job
+
+    # -------- Stored documents --------
+    def _persist(self, document: Dict):
+        # Persist to MongoDB if available
+        try:
+            mongo_service.create_pdf_document(document)
+        except Exception as e:
+            print(f"Warning: Could not persist PDF document {document['document_id']} to DB: {e}")
+
+    def get_document(self, document_id: str) -> Optional[Dict]:
+        """Get a stored document from memory, falling back to MongoDB"""
+        document = self.documents.get(document_id)
+        if document:
+            return document
+
+        try:
+            document = mongo_service.get_pdf_document(document_id)
+        except Exception:
+            document = None
+        if document:
+            with self._lock:
+                self.documents[document_id] = document
+        return document
+
+    async def get_document_async(self, document_id: str) -> Optional[Dict]:
+        """get_document for the event loop: the MongoDB fallback is awaited through Motor"""
+        document = self.documents.get(document_id)
+        if document:
+            return document
+
+        try:
+            document = await async_mongo_service.get_pdf_document(document_id)
+        except Exception:
+            document = None
+        if document:
+            with self._lock:
+                self.documents[document_id] = document
+        return document
+
+    def _get_finished_document(self, document_id: str, wait_timeout: float) -> Optional[Dict]:
+        """Document, after waiting up to wait_timeout for a running extraction job"""
+        for job_id in list(self._document_jobs.get(document_id, ())):
+            try:
+                self.wait(job_id, timeout=wait_timeout)
+            except Exception as e:
+                print(f"⚠️ [PDF_INGEST] Waiting for job {job_id} ended early: {e!r}")
+
+        document = self.get_document(document_id)
+        if document and document.get("status") in ("processing", "failed"):
+            print(f"⚠️ [PDF_INGEST] Document {document_id} is {document.get('status')}; using pages extracted so far")
+        return document
+
+    def get_text(self, document_id: str, wait_timeout: float = PDF_INGEST_WAIT_SECONDS) -> Optional[str]:
+        """Stored text of a document, or None if it hasn't been ingested"""
+        document = self._get_finished_document(document_id, wait_timeout)
+        if not document:
+            return None
+        return self.document_text(document)
+
+    def get_context(
+        self,
+        document_id: str,
+        instruction: str,
+        page_ranges: Optional[List] = None,
+        token_budget: int = pdf_retrieval.PDF_CONTEXT_TOKEN_BUDGET,
+        wait_timeout: float = PDF_INGEST_WAIT_SECONDS
+    ) -> Optional[str]:
+        """
+        Text of the document's chunks most relevant to instruction (within page_ranges, if given) in token_budget.
+        Without page_ranges, the pages the instruction refers to are resolved from the stored sections.
+        """
+        document = self._get_finished_document(document_id, wait_timeout)
+        if not document:
+            return None
+        if page_ranges is None:
+            page_ranges = self.resolve_page_ranges(document, instruction)
+        allowed_pages = set(pdf_sections.pages_in(page_ranges, document["page_count"])) if page_ranges else None
+        return pdf_retrieval.select_context(
+            document["pages"], self._get_retrieval_index(document), instruction, token_budget, allowed_pages
+        )
+
+    def _build_index(self, document: Dict) -> Dict:
+        """Retrieval index over the pages extracted so far, stamped with how many there were"""
+        with self._lock:
+            pages = list(document["pages"])
+        index = pdf_retrieval.build_index(pages)
+        index["pages_indexed"] = sum(page is not None for page in pages)
+        return index
+
+    def _get_retrieval_index(self, document: Dict) -> Dict:
+        index = document.get("retrieval_index")
+        extracted = sum(page is not None for page in document["pages"])
+        # Indexes stored before the stamp existed were only kept for complete documents
+        if pdf_retrieval.is_current(index) and index.get("pages_indexed", document["page_count"]) == extracted:
+            return index
+
+        # Legacy, re-chunked, or pages have landed since: index once more and keep it
+        index = self._build_index(document)
+        document["retrieval_index"] = index
+        try:
+            mongo_service.set_pdf_document_index(document["document_id"], index)
+        except Exception as e:
+            print(f"Warning: Could not store retrieval index of {document['document_id']} in DB: {e}")
+        return index
+
+    def document_text(self, document: Dict) -> str:
+        return "".join(page + "\n" for page in document.get("pages", []) if page)
+
+
+# Global instance
+pdf_ingest_service = PDFIngestService()
@@ -0,0 +1,164 @@
+"""
+BM25 retrieval over extracted PDF pages
+Pages are split into word-window chunks and indexed once per document; question generation
+then receives the chunks most relevant to the instructor's instruction, within a token budget,
+instead of just the start of the document.
+"""
+from typing import Dict, List, Optional, Set
+from collections import Counter
+import math
+import os
+import re
+
+# Words per chunk and words shared between consecutive chunks of a page
+PDF_CHUNK_WORDS = int(os.getenv("PDF_CHUNK_WORDS") or 180)
+PDF_CHUNK_OVERLAP_WORDS = int(os.getenv("PDF_CHUNK_OVERLAP_WORDS") or 30)
+# Approximate prompt tokens of PDF text sent for question generation
+PDF_CONTEXT_TOKEN_BUDGET = int(os.getenv("PDF_CONTEXT_TOKEN_BUDGET") or 1500)
+
+INDEX_VERSION = 1
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this
+to was were will with about based focus questions question ask generate exam student students
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+# ~4 characters per token for English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def fits_budget(text: str, token_budget: int) -> bool:
+    """Whether text is within token_budget (the same limit select_context truncates to)"""
+    return len(text) <= token_budget * CHARS_PER_TOKEN
+
+
+def chunk_pages(pages: List[Optional[str]]) -> List[Dict]:
+    """Split each page into overlapping word windows: [{page, start, end}] (word offsets in the page)"""
+    step = max(1, PDF_CHUNK_WORDS - PDF_CHUNK_OVERLAP_WORDS)
+    chunks = []
+    for page_index, page in enumerate(pages):
+        words = (page or "").split()
+        for start in range(0, len(words), step):
+            chunks.append({"page": page_index, "start": start, "end": min(start + PDF_CHUNK_WORDS, len(words))})
+            if start + PDF_CHUNK_WORDS >= len(words):
+                break
+    return chunks
+
+
+def chunk_text(pages: List[Optional[str]], chunk: Dict) -> str:
+    return " ".join((pages[chunk["page"]] or "").split()[chunk["start"]:chunk["end"]])
+
+
+def build_index(pages: List[Optional[str]]) -> Dict:
+    """Build a serializable BM25 index over a document's pages"""
+    chunks = chunk_pages(pages)
+    term_freqs = []
+    doc_freqs: Counter = Counter()
+    lengths = []
+    for chunk in chunks:
+        tokens = tokenize(chunk_text(pages, chunk))
+        counts = Counter(tokens)
+        term_freqs.append(dict(counts))
+        doc_freqs.update(counts.keys())
+        lengths.append(len(tokens))
+
+    return {
+        "version": INDEX_VERSION,
+        "chunk_words": PDF_CHUNK_WORDS,
+        "chunks": chunks,
+        "term_freqs": term_freqs,
+        "doc_freqs": dict(doc_freqs),
+        "lengths": lengths,
+        "avg_length": (sum(lengths) / len(lengths)) if lengths else 0.0
+    }
+
+
+def is_current(index: Optional[Dict]) -> bool:
+    return bool(index) and index.get("version") == INDEX_VERSION and index.get("chunk_words") == PDF_CHUNK_WORDS
+
+
+def score_chunks(index: Dict, query: str) -> List[float]:
+    """BM25 score of every chunk for query"""
+    query_terms = set(tokenize(query or ""))
+    n = len(index["chunks"])
+    avg_length = index["avg_length"] or 1.0
+    idf = {
+        term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for term in query_terms
+        if (df := index["doc_freqs"].get(term))
+    }
+
+    scores = []
+    for freqs, length in zip(index["term_freqs"], index["lengths"]):
+        score = 0.0
+        for term, weight in idf.items():
+            tf = freqs.get(term)
+            if tf:
+                score += weight * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+        scores.append(score)
+    return scores
+
+
+def select_context(
+    pages: List[Optional[str]],
+    index: Dict,
+    query: str,
+    token_budget: int = PDF_CONTEXT_TOKEN_BUDGET,
+    allowed_pages: Optional[Set[int]] = None
+) -> str:
+    """
+    Text of the highest-scoring chunks for query that fit in token_budget, in document order.
+    With no matching chunks (e.g. a generic instruction) the document is read from the start.
+    allowed_pages restricts selection to those pages; the budget is then filled with the rest
+    of those pages in order once the matching chunks are in.
+    """
+    scores = score_chunks(index, query)
+    candidates = [
+        i for i, chunk in enumerate(index["chunks"])
+        if allowed_pages is None or chunk["page"] in allowed_pages
+    ]
+    matched = sorted((i for i in candidates if scores[i] > 0), key=lambda i: (-scores[i], i))
+    if not matched or allowed_pages is not None:
+        ranked = matched + [i for i in candidates if scores[i] <= 0]
+    else:
+        ranked = matched
+
+    selected = []
+    used_tokens = 0
+    for i in ranked:
+        text = chunk_text(pages, index["chunks"][i])
+        cost = estimate_tokens(text)
+        if used_tokens + cost > token_budget:
+            if selected:
+                continue
+            cost = token_budget  # a single oversized chunk is truncated below
+        selected.append(i)
+        used_tokens += cost
+        if used_tokens >= token_budget:
+            break
+
+    parts = []
+    for i in sorted(selected):
+        chunk = index["chunks"][i]
+        parts.append(f"[Page {chunk['page'] + 1}]\n{chunk_text(pages, chunk)}")
+    return "\n\n".join(parts)[:token_budget * CHARS_PER_TOKEN]
+
+
+def select_relevant_text(text: str, query: str, token_budget: int = PDF_CONTEXT_TOKEN_BUDGET) -> str:
+    """Retrieve from raw text that has no stored index (short text is returned unchanged)"""
+    if fits_budget(text, token_budget):
+        return text
+    pages = text.split("\f") if "\f" in text else [text]
+    return select_context(pages, build_index(pages), query, token_budget)
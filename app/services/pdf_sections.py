@@ -0,0 +1,142 @@
+"""
+Instruction-aware page ranges for PDF exams
+Maps instructions such as "3.2.4", "chapter 1 to chapter 3" or "pages 10-20" onto page
+spans using the PDF's outline (or, without one, the headings at the top of its pages), so
+extraction and question generation only touch the pages the instructor asked about.
+"""
+from typing import Dict, List, Optional, Tuple
+import re
+
+_KEYWORDS = r"(?:chapters?|units?|sections?|parts?|modules?|lessons?|topics?)"
+_NUMBER = r"\d+(?:\.\d+)*"
+_RANGE_WORDS = r"(?:-|–|to|through|till|until|upto|up\s+to)"
+
+_PAGE_RANGE_RE = re.compile(rf"\bp(?:ages?|p?\.)\s*(\d+)\s*{_RANGE_WORDS}\s*(\d+)", re.I)
+_PAGE_RE = re.compile(r"\bp(?:age|\.)\s*(\d+)\b", re.I)
+_SECTION_RANGE_RE = re.compile(
+    rf"(?:\b{_KEYWORDS}\s*({_NUMBER})|\b(\d+\.\d+(?:\.\d+)*))\s*{_RANGE_WORDS}\s*(?:{_KEYWORDS}\s*)?({_NUMBER})\b", re.I
+)
+_SECTION_LIST_RE = re.compile(rf"\b{_KEYWORDS}\s*({_NUMBER}(?:\s*(?:,|and|&)\s*{_NUMBER})*)", re.I)
+_DOTTED_RE = re.compile(r"(?<![\d.])(\d+\.\d+(?:\.\d+)*)(?![\d.])")
+
+# Section number at the start of an outline title or page heading
+_TITLE_NUMBER_RE = re.compile(rf"^\s*(?:({_KEYWORDS})\s+)?({_NUMBER})\.?(?:\s+|:|$)", re.I)
+_HEADING_NUMBER_RE = re.compile(rf"^\s*(?:{_KEYWORDS}\s+({_NUMBER})\b|({_NUMBER})\.?\s+[A-Za-z])", re.I)
+
+Span = Tuple[int, int]
+
+
+def _number(text: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in text.split("."))
+
+
+def sections_from_outline(outline: List[Dict]) -> List[Dict]:
+    """Outline entries with their section numbers: [{title, level, page, number}]"""
+    sections = []
+    for entry in outline:
+        match = _TITLE_NUMBER_RE.match(entry["title"])
+        sections.append({**entry, "number": list(_number(match.group(2))) if match else None})
+    return sections
+
+
+def sections_from_headings(headings: List[Tuple[int, List[str]]]) -> List[Dict]:
+    """Numbered headings found at the top of pages: [{title, level, page, number}]"""
+    sections = []
+    for page, lines in sorted(headings):
+        for line in lines:
+            match = _HEADING_NUMBER_RE.match(line)
+            if match:
+                number = _number(match.group(1) or match.group(2))
+                sections.append({"title": line, "level": len(number), "page": page, "number": list(number)})
+                break
+    return sections
+
+
+def references_sections(instruction: str) -> bool:
+    """Whether an instruction names pages or sections at all (otherwise no resolution is needed)"""
+    instruction = instruction or ""
+    return bool(
+        _PAGE_RE.search(instruction) or _PAGE_RANGE_RE.search(instruction)
+        or _SECTION_LIST_RE.search(instruction) or _DOTTED_RE.search(instruction)
+    )
+
+
+def references_only_pages(instruction: str) -> bool:
+    """Whether an instruction names page numbers and nothing else (so no outline or headings are needed)"""
+    instruction = instruction or ""
+    if not (_PAGE_RE.search(instruction) or _PAGE_RANGE_RE.search(instruction)):
+        return False
+    rest = _PAGE_RE.sub(" ", _PAGE_RANGE_RE.sub(" ", instruction))
+    return not (_SECTION_LIST_RE.search(rest) or _DOTTED_RE.search(rest))
+
+
+def resolve_page_ranges(instruction: str, sections: List[Dict], page_count: int) -> Optional[List[Span]]:
+    """
+    Page spans [start, end) (0-based) the instruction refers to, merged and sorted.
+    Returns None when the instruction names nothing that can be located, meaning the whole document.
+    """
+    instruction = instruction or ""
+    spans: List[Span] = []
+
+    for match in _PAGE_RANGE_RE.finditer(instruction):
+        spans.append((int(match.group(1)) - 1, int(match.group(2))))
+    instruction_rest = _PAGE_RANGE_RE.sub(" ", instruction)
+    for match in _PAGE_RE.finditer(instruction_rest):
+        spans.append((int(match.group(1)) - 1, int(match.group(1))))
+
+    for match in _SECTION_RANGE_RE.finditer(instruction):
+        first = _section_span(_number(match.group(1) or match.group(2)), sections, page_count)
+        last = _section_span(_number(match.group(3)), sections, page_count)
+        if first and last:
+            spans.append((min(first[0], last[0]), max(first[1], last[1])))
+    instruction_rest = _SECTION_RANGE_RE.sub(" ", instruction)
+    for match in _SECTION_LIST_RE.finditer(instruction_rest):
+        for number in re.findall(_NUMBER, match.group(1)):
+            span = _section_span(_number(number), sections, page_count)
+            if span:
+                spans.append(span)
+    instruction_rest = _SECTION_LIST_RE.sub(" ", instruction_rest)
+    for match in _DOTTED_RE.finditer(instruction_rest):
+        span = _section_span(_number(match.group(1)), sections, page_count)
+        if span:
+            spans.append(span)
+
+    spans = [(max(0, start), min(page_count, end)) for start, end in spans]
+    return merge_spans([span for span in spans if span[0] < span[1]]) or None
+
+
+def _section_span(number: Tuple[int, ...], sections: List[Dict], page_count: int) -> Optional[Span]:
+    """Pages covered by a section: from its entry up to the next entry that isn't one of its subsections"""
+    for i, section in enumerate(sections):
+        if section["number"] is None or tuple(section["number"]) != number:
+            continue
+        start = section["page"]
+        end = page_count
+        for following in sections[i + 1:]:
+            following_number = following["number"]
+            if following_number is None:
+                ends_section = following["level"] <= section["level"]
+            else:
+                ends_section = tuple(following_number[:len(number)]) != number
+            if ends_section:
+                # Subsections often end part-way down the page where the next one starts
+                end = following["page"] + (1 if len(number) > 1 else 0)
+                break
+        return start, max(end, start + 1)
+    return None
+
+
+def merge_spans(spans: List[Span]) -> List[Span]:
+    merged: List[List[int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def pages_in(spans: Optional[List[Span]], page_count: int) -> List[int]:
+    if not spans:
+        return list(range(page_count))
+    return [page for start, end in spans for page in range(start, min(end, page_count))]
@@ -0,0 +1,169 @@
+"""
+Content-addressed cache for generated PDF exam questions
+Keys are derived from the extracted text, instruction, model and prompt version, so the
+same PDF + instruction reuses questions instead of calling the LLM on every exam start.
+"""
+from typing import List, Optional
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+from app.services.mongo_service import mongo_service, async_mongo_service
+
+QUESTION_CACHE_SIZE = int(os.getenv("QUESTION_CACHE_SIZE") or 256)
+# Number of distinct question sets generated per key before cached sets are reused,
+# so students sharing a PDF and instruction don't all get identical questions
+QUESTION_SETS_PER_KEY = int(os.getenv("QUESTION_SETS_PER_KEY") or 1)
+# Local disk store used when MongoDB is not available
+QUESTION_CACHE_DIR = os.getenv("QUESTION_CACHE_DIR") or (
+    os.path.join(os.getcwd(), 'question_cache') if os.name == 'nt' else '/tmp/question_cache'
+)
+
+
+class QuestionCache:
+    """LRU of question sets in front of a persistent store (MongoDB, or local disk)"""
+
+    def __init__(self, max_entries: int = QUESTION_CACHE_SIZE, sets_per_key: int = QUESTION_SETS_PER_KEY):
+        self.max_entries = max_entries
+        self.sets_per_key = max(1, sets_per_key)
+        self._lru: "OrderedDict[str, List[List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, pdf_content: str, instruction: str, model: str, prompt_version: str) -> str:
+        """Hash of everything that determines the generated questions"""
+        digest = hashlib.sha256()
+        for part in (pdf_content, instruction or "", model or "", prompt_version):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def pick(self, key: str) -> Optional[List[str]]:
+        """
+        Return a cached question set for key, or None when a new set should be generated
+        (nothing cached yet, or fewer than sets_per_key distinct sets stored)
+        """
+        return self._choose(self.get_question_sets(key))
+
+    async def pick_async(self, key: str) -> Optional[List[str]]:
+        """Async variant of pick (MongoDB through Motor, the disk store in a thread)"""
+        return self._choose(await self.get_question_sets_async(key))
+
+    def _choose(self, question_sets: List[List[str]]) -> Optional[List[str]]:
+        if len(question_sets) < self.sets_per_key:
+            return None
+        return list(random.choice(question_sets))
+
+    def get_question_sets(self, key: str) -> List[List[str]]:
+        question_sets = self._cached(key)
+        if question_sets is None:
+            question_sets = self._loaded(key, self._load(key))
+        return question_sets
+
+    async def get_question_sets_async(self, key: str) -> List[List[str]]:
+        question_sets = self._cached(key)
+        if question_sets is None:
+            question_sets = self._loaded(key, await self._load_async(key))
+        return question_sets
+
+    def add_question_set(self, key: str, questions: List[str]):
+        """Store a newly generated question set under key (identical sets are kept once)"""
+        self._forget(key)
+        try:
+            self._append(key, list(questions))
+        except Exception as e:
+            print(f"Warning: Could not persist question cache entry {key[:12]}: {e}")
+
+    async def add_question_set_async(self, key: str, questions: List[str]):
+        self._forget(key)
+        try:
+            await self._append_async(key, list(questions))
+        except Exception as e:
+            print(f"Warning: Could not persist question cache entry {key[:12]}: {e}")
+
+    def _cached(self, key: str) -> Optional[List[List[str]]]:
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._lru[key]
+        return None
+
+    def _loaded(self, key: str, question_sets: List[List[str]]) -> List[List[str]]:
+        # Only complete entries are kept in memory: other workers may still be adding sets to the rest
+        if len(question_sets) >= self.sets_per_key:
+            self._remember(key, question_sets)
+        return question_sets
+
+    def _forget(self, key: str):
+        with self._lock:
+            # The stored entry changes; the next read loads it (with other workers' sets)
+            self._lru.pop(key, None)
+
+    def _remember(self, key: str, question_sets: List[List[str]]):
+        with self._lock:
+            self._lru[key] = question_sets
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    # -------- Persistent backends --------
+    def _load(self, key: str) -> List[List[str]]:
+        if mongo_service.is_connected():
+            try:
+                return mongo_service.get_question_sets(key)
+            except Exception as e:
+                # A cache miss: the questions are generated instead
+                print(f"Warning: Could not read question cache entry {key[:12]} from MongoDB: {e}")
+                return []
+        return self._load_file(key)
+
+    async def _load_async(self, key: str) -> List[List[str]]:
+        if async_mongo_service.is_connected():
+            try:
+                return await async_mongo_service.get_question_sets(key)
+            except Exception as e:
+                print(f"Warning: Could not read question cache entry {key[:12]} from MongoDB: {e}")
+                return []
+        return await asyncio.to_thread(self._load_file, key)
+
+    def _load_file(self, key: str) -> List[List[str]]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not read question cache entry {key[:12]}: {e}")
+            return []
+
+    def _append(self, key: str, questions: List[str]):
+        if mongo_service.is_connected():
+            mongo_service.add_question_set(key, questions, self.sets_per_key)
+            return
+        self._append_file(key, questions)
+
+    async def _append_async(self, key: str, questions: List[str]):
+        if async_mongo_service.is_connected():
+            await async_mongo_service.add_question_set(key, questions, self.sets_per_key)
+            return
+        await asyncio.to_thread(self._append_file, key, questions)
+
+    def _append_file(self, key: str, questions: List[str]):
+        question_sets = [qs for qs in self._load_file(key) if qs != questions]
+        question_sets = (question_sets + [questions])[-self.sets_per_key:]
+        os.makedirs(QUESTION_CACHE_DIR, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(question_sets, f)
+        os.replace(tmp_path, path)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(QUESTION_CACHE_DIR, f"{key}.json")
+
+
+# Global instance
+question_cache = QuestionCache()
@@ -0,0 +1,113 @@
+"""
+Background pre-generation of exam questions
+Looks at scheduled project exams and PDF exams with a start_time and generates each student's
+question set a few minutes before the window opens, so POST /api/exams/start only loads stored
+questions instead of waiting on the LLM while every student starts at once.
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from app.core.security import IST, to_ist
+from app.services.exam_service import exam_service
+import asyncio
+import os
+
+# How far ahead of an exam window questions are generated, how often schedules are
+# checked, and how many students are generated for at once
+PREGEN_LEAD_MINUTES = int(os.getenv("PREGEN_LEAD_MINUTES") or 10)
+PREGEN_POLL_SECONDS = int(os.getenv("PREGEN_POLL_SECONDS") or 60)
+PREGEN_CONCURRENCY = int(os.getenv("PREGEN_CONCURRENCY") or 4)
+
+
+class QuestionPregenerator:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight = set()
+
+    def start(self):
+        """Start the scheduler loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            print(f"⏰ [PREGEN] Pre-generating questions {PREGEN_LEAD_MINUTES} min before exam windows")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"⚠️ [PREGEN] Pre-generation pass failed: {e}")
+            await asyncio.sleep(PREGEN_POLL_SECONDS)
+
+    async def run_once(self, now: datetime = None) -> int:
+        """Pre-generate questions for every exam whose window opens within the lead time; returns sets stored"""
+        if not exam_service.async_grok_service.client:
+            return 0  # Nothing to gain from storing local fallback questions
+
+        due = await asyncio.to_thread(self.due_exams, now or datetime.now(IST))
+        if not due:
+            return 0
+
+        semaphore = asyncio.Semaphore(PREGEN_CONCURRENCY)
+
+        async def pregenerate(key: str, student_id: str, pdf_metadata: Dict) -> bool:
+            async with semaphore:
+                self._in_flight.add(key)
+                try:
+                    return await exam_service.pregenerate_questions(student_id, pdf_metadata)
+                except Exception as e:
+                    print(f"⚠️ [PREGEN] Could not pre-generate questions ({key}): {e}")
+                    return False
+                finally:
+                    self._in_flight.discard(key)
+
+        results = await asyncio.gather(*(pregenerate(*item) for item in due))
+        stored = sum(1 for result in results if result)
+        print(f"⏰ [PREGEN] Pre-generated {stored}/{len(due)} question sets")
+        return stored
+
+    def due_exams(self, now: datetime) -> List[Tuple[str, str, Optional[Dict]]]:
+        """
+        (key, student_id, pdf_metadata) of exams opening within the lead time that have no stored questions.
+        Only before the window opens: starting an exam consumes its set, and one generated after
+        that would never be used.
+        """
+        lead = timedelta(minutes=PREGEN_LEAD_MINUTES)
+        candidates = []
+
+        for exam_id, pdf_metadata in list(exam_service.pdf_exams.items()):
+            start = to_ist(pdf_metadata.get('start_time'))
+            if not start or exam_id in exam_service.completed_pdf_exams:
+                continue
+            if start - lead <= now < start:
+                candidates.append((pdf_metadata['student_id'], pdf_metadata))
+
+        for student_id, schedule in list(exam_service.exam_schedules.items()):
+            start = to_ist(schedule.get('start_time'))
+            # Students with pending PDF exams start those instead of the project exam
+            if not start or exam_service.get_all_pdf_exams_for_student(student_id):
+                continue
+            if start - lead <= now < start:
+                candidates.append((student_id, None))
+
+        due = []
+        for student_id, pdf_metadata in candidates:
+            key = exam_service.pregeneration_key(student_id, pdf_metadata)
+            if not key or key in self._in_flight or student_id not in exam_service.students:
+                continue
+            if exam_service.has_exam_in_progress(student_id):
+                continue
+            if not exam_service.has_pregenerated_questions(key):
+                due.append((key, student_id, pdf_metadata))
+        return due
+
+
+# Global instance
+question_pregenerator = QuestionPregenerator()
@@ -0,0 +1,458 @@
+"""
+Exam session store
+Dict-compatible map of exam_id -> session that records when each session was last active,
+so ExamService can evict completed exams once they are persisted and expire abandoned
+in-progress ones, keeping memory bounded by live sessions rather than exam history.
+
+Sessions are indexed by student and by status, and every write bumps a per-session
+version. The in-memory backend serves a single process; the Redis backend shares
+sessions between uvicorn workers and instances (SESSION_STORE_BACKEND=redis).
+record_map() gives the other state every worker must see (students, schedules, PDF exams)
+the same backend: a plain dict in memory, a Redis hash when sessions are shared.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
+from app.core.serialization import dumps, loads
+import os
+import threading
+import time
+
+# Completed exams stay resident this long (for result pages and final WebSocket messages)
+SESSION_COMPLETED_GRACE_SECONDS = int(os.getenv("SESSION_COMPLETED_GRACE_SECONDS") or 300)
+# In-progress sessions without a schedule window expire after this much inactivity
+SESSION_IDLE_TIMEOUT_MINUTES = int(os.getenv("SESSION_IDLE_TIMEOUT_MINUTES") or 120)
+SESSION_SWEEP_SECONDS = int(os.getenv("SESSION_SWEEP_SECONDS") or 60)
+# "memory" (single process) or "redis" (shared between workers)
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND") or "memory"
+REDIS_URL = os.getenv("REDIS_URL") or "redis://localhost:6379/0"
+SESSION_KEY_PREFIX = os.getenv("SESSION_KEY_PREFIX") or "exam_session"
+# Attempts of an optimistic read-modify-write before giving up with SessionConflict
+SESSION_UPDATE_RETRIES = int(os.getenv("SESSION_UPDATE_RETRIES") or 5)
+
+
+class SessionConflict(Exception):
+    """A session changed between reading and writing it (or the client is out of step with it)"""
+
+
+class SessionStore(MutableMapping, ABC):
+    """
+    Base class of session backends. Sessions read from a store must be written back with
+    put() (or changed through update()) for other workers to see the change.
+    """
+    backend = None
+    blocking = False  # operations wait on the network; async callers run them in a thread
+
+    # -------- Backend operations --------
+    @abstractmethod
+    def get(self, exam_id: str, default=None) -> Optional[Dict]:
+        """The stored session, or default"""
+
+    @abstractmethod
+    def put(self, exam_id: str, session: Dict, expected_version: int = None) -> int:
+        """Store a session and update its indexes; returns the new version.
+        With expected_version, raises SessionConflict if the stored version differs."""
+
+    @abstractmethod
+    def remove(self, exam_id: str) -> Optional[Dict]:
+        """Delete a session and its index entries; returns it (None if absent)"""
+
+    @abstractmethod
+    def ids(self) -> List[str]:
+        """Every stored exam id"""
+
+    @abstractmethod
+    def ids_for_student(self, student_id: str) -> List[str]:
+        """Exam ids of a student's sessions"""
+
+    @abstractmethod
+    def ids_with_status(self, status: str) -> List[str]:
+        """Exam ids of sessions with a status"""
+
+    def count_with_status(self, status: str) -> int:
+        return len(self.ids_with_status(status))
+
+    def reassign_student(self, old_student_id: str, new_student_id: str) -> int:
+        """Move a student's sessions to a new student_id; returns how many moved"""
+        exam_ids = self.ids_for_student(old_student_id)
+        for exam_id in exam_ids:
+            self.update(exam_id, lambda session: session.update(student_id=new_student_id))
+        return len(exam_ids)
+
+    @abstractmethod
+    def touch(self, exam_id: str):
+        """Record activity on a session (answers, transcriptions)"""
+
+    @abstractmethod
+    def idle_seconds(self, exam_id: str) -> float:
+        """Seconds since the session was last written or touched"""
+
+    @abstractmethod
+    def try_acquire(self, name: str, ttl_seconds: int) -> bool:
+        """Take a named lease for ttl_seconds (e.g. so only one worker sweeps sessions)"""
+
+    @abstractmethod
+    def record_evictions(self, evicted: int = 0, expired: int = 0):
+        """Add to the eviction counters"""
+
+    @abstractmethod
+    def counters(self) -> Dict[str, int]:
+        """Eviction counters (evicted_total, expired_total)"""
+
+    def update(self, exam_id: str, fn: Callable[[Dict], Any]) -> Any:
+        """
+        Apply fn to the stored session and write it back if nothing else wrote it meanwhile,
+        retrying on conflicts. Returns fn's result; exceptions raised by fn abort the update.
+        """
+        for _ in range(SESSION_UPDATE_RETRIES):
+            session = self.get(exam_id)
+            if session is None:
+                raise KeyError(exam_id)
+            version = session.get('version', 0)
+            result = fn(session)
+            try:
+                self.put(exam_id, session, expected_version=version)
+                return result
+            except SessionConflict:
+                continue
+        raise SessionConflict(f"Exam {exam_id} kept changing; update abandoned after {SESSION_UPDATE_RETRIES} attempts")
+
+    def record_map(self, name: str) -> MutableMapping:
+        """Map of other shared state kept on this backend (values are copies unless in memory)"""
+        return {}
+
+    # -------- Mapping interface --------
+    def __getitem__(self, exam_id: str) -> Dict:
+        session = self.get(exam_id)
+        if session is None:
+            raise KeyError(exam_id)
+        return session
+
+    def __setitem__(self, exam_id: str, session: Dict):
+        self.put(exam_id, session)
+
+    def __delitem__(self, exam_id: str):
+        if self.remove(exam_id) is None:
+            raise KeyError(exam_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids())
+
+    def __len__(self) -> int:
+        return len(self.ids())
+
+    def metrics(self) -> Dict:
+        """Resident session counts and approximate size (serialized bytes)"""
+        by_status: Dict[str, int] = {}
+        resident_bytes = 0
+        for exam_id in self.ids():
+            session = self.get(exam_id)
+            if session is None:
+                continue
+            status = session.get('status', 'unknown')
+            by_status[status] = by_status.get(status, 0) + 1
+            try:
+                resident_bytes += len(dumps(session))
+            except (TypeError, ValueError):
+                pass
+        return {
+            "backend": self.backend,
+            "resident_sessions": sum(by_status.values()),
+            "sessions_by_status": by_status,
+            "resident_bytes": resident_bytes,
+            **self.counters()
+        }
+
+
+class InMemorySessionStore(SessionStore):
+    """Sessions held in this process; get() returns the live session object"""
+    backend = "memory"
+
+    def __init__(self):
+        self._sessions: Dict[str, Dict] = {}
+        self._last_activity: Dict[str, float] = {}  # exam_id -> time.monotonic() of last activity
+        # Secondary indexes (exam id sets kept as insertion-ordered dicts)
+        self._by_student: Dict[str, Dict[str, None]] = {}
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        self._indexed: Dict[str, tuple] = {}  # exam_id -> (student_id, status) it is indexed under
+        self._lock = threading.RLock()
+        self.evicted_total = 0
+        self.expired_total = 0
+
+    def get(self, exam_id: str, default=None) -> Optional[Dict]:
+        return self._sessions.get(exam_id, default)
+
+    def __contains__(self, exam_id) -> bool:
+        return exam_id in self._sessions
+
+    def put(self, exam_id: str, session: Dict, expected_version: int = None) -> int:
+        with self._lock:
+            current = self._sessions.get(exam_id)
+            current_version = current.get('version', 0) if current else 0
+            if expected_version is not None and current_version != expected_version:
+                raise SessionConflict(f"Exam {exam_id} is at version {current_version}, not {expected_version}")
+            session['version'] = current_version + 1
+            self._sessions[exam_id] = session
+            self._last_activity[exam_id] = time.monotonic()
+            self._reindex(exam_id, session)
+            return session['version']
+
+    def update(self, exam_id: str, fn: Callable[[Dict], Any]) -> Any:
+        # The live object is mutated in place, so hold the lock instead of retrying
+        with self._lock:
+            session = self._sessions[exam_id]
+            result = fn(session)
+            self.put(exam_id, session)
+            return result
+
+    def remove(self, exam_id: str) -> Optional[Dict]:
+        with self._lock:
+            session = self._sessions.pop(exam_id, None)
+            self._last_activity.pop(exam_id, None)
+            self._unindex(exam_id)
+            return session
+
+    def _reindex(self, exam_id: str, session: Dict):
+        key = (session.get('student_id'), session.get('status'))
+        if self._indexed.get(exam_id) == key:
+            return
+        self._unindex(exam_id)
+        self._by_student.setdefault(key[0], {})[exam_id] = None
+        self._by_status.setdefault(key[1], {})[exam_id] = None
+        self._indexed[exam_id] = key
+
+    def _unindex(self, exam_id: str):
+        key = self._indexed.pop(exam_id, None)
+        if key is None:
+            return
+        for index, value in ((self._by_student, key[0]), (self._by_status, key[1])):
+            exam_ids = index.get(value, {})
+            exam_ids.pop(exam_id, None)
+            if not exam_ids:
+                index.pop(value, None)
+
+    def ids(self) -> List[str]:
+        return list(self._sessions)
+
+    def ids_for_student(self, student_id: str) -> List[str]:
+        return list(self._by_student.get(student_id, {}))
+
+    def ids_with_status(self, status: str) -> List[str]:
+        return list(self._by_status.get(status, {}))
+
+    def count_with_status(self, status: str) -> int:
+        return len(self._by_status.get(status, {}))
+
+    def touch(self, exam_id: str):
+        if exam_id in self._sessions:
+            self._last_activity[exam_id] = time.monotonic()
+
+    def idle_seconds(self, exam_id: str) -> float:
+        return time.monotonic() - self._last_activity.get(exam_id, time.monotonic())
+
+    def try_acquire(self, name: str, ttl_seconds: int) -> bool:
+        return True  # Only this process can hold it
+
+    def record_evictions(self, evicted: int = 0, expired: int = 0):
+        self.evicted_total += evicted
+        self.expired_total += expired
+
+    def counters(self) -> Dict[str, int]:
+        return {"evicted_total": self.evicted_total, "expired_total": self.expired_total}
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions as JSON strings in Redis, shared by every worker pointed at the same server.
+    Writes use WATCH/MULTI so concurrent writers of one session can't silently overwrite each other.
+    Keys: {prefix}:session:{exam_id}, {prefix}:ids, {prefix}:student:{id} and {prefix}:status:{status}
+    (sorted by time added), {prefix}:activity (hash of last activity), {prefix}:counters.
+    """
+    backend = "redis"
+    blocking = True
+
+    def __init__(self, client, prefix: str = SESSION_KEY_PREFIX):
+        self._redis = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str = REDIS_URL) -> "RedisSessionStore":
+        import redis
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self._prefix,) + parts)
+
+    def _session_key(self, exam_id: str) -> str:
+        return self._key("session", exam_id)
+
+    def get(self, exam_id: str, default=None) -> Optional[Dict]:
+        raw = self._redis.get(self._session_key(exam_id))
+        return loads(raw) if raw is not None else default
+
+    def __contains__(self, exam_id) -> bool:
+        return bool(self._redis.exists(self._session_key(exam_id)))
+
+    def put(self, exam_id: str, session: Dict, expected_version: int = None) -> int:
+        from redis.exceptions import WatchError
+
+        key = self._session_key(exam_id)
+        with self._redis.pipeline() as pipe:
+            for _ in range(SESSION_UPDATE_RETRIES):
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    current = loads(raw) if raw is not None else None
+                    current_version = current.get('version', 0) if current else 0
+                    if expected_version is not None and current_version != expected_version:
+                        raise SessionConflict(f"Exam {exam_id} is at version {current_version}, not {expected_version}")
+                    session['version'] = current_version + 1
+
+                    pipe.multi()
+                    pipe.set(key, dumps(session))
+                    pipe.zadd(self._key("ids"), {exam_id: time.time()}, nx=True)
+                    if current:
+                        self._unindex(pipe, exam_id, current, keep=session)
+                    pipe.zadd(self._key("student", str(session.get('student_id'))), {exam_id: time.time()}, nx=True)
+                    pipe.zadd(self._key("status", str(session.get('status'))), {exam_id: time.time()}, nx=True)
+                    pipe.hset(self._key("activity"), exam_id, time.time())
+                    pipe.execute()
+                    return session['version']
+                except WatchError:
+                    if expected_version is not None:
+                        raise SessionConflict(f"Exam {exam_id} was written concurrently")
+        raise SessionConflict(f"Exam {exam_id} kept changing; write abandoned after {SESSION_UPDATE_RETRIES} attempts")
+
+    def _unindex(self, pipe, exam_id: str, session: Dict, keep: Dict = None):
+        """Queue removal of exam_id from the indexes session is in (except those it stays in)"""
+        for field in ('student_id', 'status'):
+            if keep is None or keep.get(field) != session.get(field):
+                name = "student" if field == 'student_id' else "status"
+                pipe.zrem(self._key(name, str(session.get(field))), exam_id)
+
+    def remove(self, exam_id: str) -> Optional[Dict]:
+        key = self._session_key(exam_id)
+        session = self.get(exam_id)
+        if session is None:
+            return None
+        pipe = self._redis.pipeline()
+        pipe.delete(key)
+        pipe.zrem(self._key("ids"), exam_id)
+        self._unindex(pipe, exam_id, session)
+        pipe.hdel(self._key("activity"), exam_id)
+        pipe.execute()
+        return session
+
+    def ids(self) -> List[str]:
+        return self._redis.zrange(self._key("ids"), 0, -1)
+
+    def ids_for_student(self, student_id: str) -> List[str]:
+        return self._redis.zrange(self._key("student", str(student_id)), 0, -1)
+
+    def ids_with_status(self, status: str) -> List[str]:
+        return self._redis.zrange(self._key("status", str(status)), 0, -1)
+
+    def count_with_status(self, status: str) -> int:
+        return self._redis.zcard(self._key("status", str(status)))
+
+    def __len__(self) -> int:
+        return self._redis.zcard(self._key("ids"))
+
+    def touch(self, exam_id: str):
+        if exam_id in self:
+            self._redis.hset(self._key("activity"), exam_id, time.time())
+
+    def idle_seconds(self, exam_id: str) -> float:
+        last = self._redis.hget(self._key("activity"), exam_id)
+        return time.time() - float(last) if last is not None else 0.0
+
+    def try_acquire(self, name: str, ttl_seconds: int) -> bool:
+        # Not released: the lease lapses after ttl_seconds, so one worker acts per interval
+        return bool(self._redis.set(self._key("lock", name), os.getpid(), nx=True, ex=max(1, int(ttl_seconds))))
+
+    def record_evictions(self, evicted: int = 0, expired: int = 0):
+        pipe = self._redis.pipeline()
+        pipe.hincrby(self._key("counters"), "evicted_total", evicted)
+        pipe.hincrby(self._key("counters"), "expired_total", expired)
+        pipe.execute()
+
+    def counters(self) -> Dict[str, int]:
+        values = self._redis.hgetall(self._key("counters"))
+        return {
+            "evicted_total": int(values.get("evicted_total", 0)),
+            "expired_total": int(values.get("expired_total", 0))
+        }
+
+    def record_map(self, name: str) -> "RedisRecordMap":
+        return RedisRecordMap(self._redis, self._key("records", name))
+
+
+class RedisRecordMap(MutableMapping):
+    """
+    key -> JSON value map in one Redis hash ({prefix}:records:{name}), shared by every worker.
+    Reads return copies, so a changed record must be assigned back to be seen elsewhere.
+    """
+    def __init__(self, client, key: str):
+        self._redis = client
+        self._key = key
+
+    def get(self, key: str, default=None) -> Any:
+        raw = self._redis.hget(self._key, key)
+        return loads(raw) if raw is not None else default
+
+    def __getitem__(self, key: str) -> Any:
+        raw = self._redis.hget(self._key, key)
+        if raw is None:
+            raise KeyError(key)
+        return loads(raw)
+
+    def __setitem__(self, key: str, value: Any):
+        self._redis.hset(self._key, key, dumps(value))
+
+    def __delitem__(self, key: str):
+        if not self._redis.hdel(self._key, key):
+            raise KeyError(key)
+
+    def pop(self, key: str, *default) -> Any:
+        # Read and delete in one transaction, so two workers can't both pop the same record
+        pipe = self._redis.pipeline()
+        pipe.hget(self._key, key)
+        pipe.hdel(self._key, key)
+        raw, _ = pipe.execute()
+        if raw is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        return loads(raw)
+
+    def __contains__(self, key) -> bool:
+        return bool(self._redis.hexists(self._key, key))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._redis.hkeys(self._key))
+
+    def __len__(self) -> int:
+        return self._redis.hlen(self._key)
+
+    def keys(self) -> List[str]:
+        return self._redis.hkeys(self._key)
+
+    def items(self) -> List[tuple]:
+        # One round trip instead of a read per key
+        return [(key, loads(raw)) for key, raw in self._redis.hgetall(self._key).items()]
+
+    def values(self) -> List[Any]:
+        return [loads(raw) for raw in self._redis.hvals(self._key)]
+
+
+def create_session_store() -> SessionStore:
+    """Session store selected by SESSION_STORE_BACKEND (in-memory if Redis is unreachable)"""
+    if SESSION_STORE_BACKEND == "redis":
+        try:
+            store = RedisSessionStore.from_url(REDIS_URL)
+            store._redis.ping()
+            print(f"🗄️ [SESSIONS] Sharing exam sessions through Redis at {REDIS_URL}")
+            return store
+        except Exception as e:
+            print(f"⚠️ [SESSIONS] Could not connect to Redis at {REDIS_URL} ({e}). Keeping exam sessions in memory; run a single worker.")
+    return InMemorySessionStore()
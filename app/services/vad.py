@@ -0,0 +1,131 @@
+"""
+Streaming voice activity detection for answer endpointing
+Clients that stream 16-bit mono PCM let the server decide when an answer has ended instead of
+trusting the browser's is_final flag. StreamingVAD runs webrtcvad once over each 10/20/30 ms
+frame as the audio arrives, keeping only a partial frame between chunks, and reports:
+
+    speech_start  the student started answering
+    endpoint      the student has been silent for the adaptive pause (3-5 s by default)
+
+The pause that ends an answer adapts to the speaker: it starts at VAD_MIN_PAUSE_SECONDS and
+grows with the longest pause the student made mid-answer (so someone who stops to think is not
+cut off), never beyond VAD_MAX_PAUSE_SECONDS.
+"""
+from typing import Dict, List
+from collections import deque
+import os
+import webrtcvad
+
+VAD_SAMPLE_RATE = int(os.getenv("VAD_SAMPLE_RATE") or 16000)
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS") or 30)
+# 0 (least aggressive about filtering out non-speech) to 3 (most)
+VAD_AGGRESSIVENESS = int(os.getenv("VAD_AGGRESSIVENESS") or 2)
+VAD_MIN_PAUSE_SECONDS = float(os.getenv("VAD_MIN_PAUSE_SECONDS") or 3.0)
+VAD_MAX_PAUSE_SECONDS = float(os.getenv("VAD_MAX_PAUSE_SECONDS") or 5.0)
+# Required pause = longest mid-answer pause x this factor, clamped to [min, max]
+VAD_PAUSE_FACTOR = float(os.getenv("VAD_PAUSE_FACTOR") or 1.5)
+# Speech starts once this share of the frames in the last VAD_ONSET_MS is voiced
+VAD_ONSET_MS = int(os.getenv("VAD_ONSET_MS") or 300)
+VAD_ONSET_RATIO = float(os.getenv("VAD_ONSET_RATIO") or 0.8)
+# Silences shorter than this are gaps between words, not pauses
+VAD_MIN_GAP_SECONDS = float(os.getenv("VAD_MIN_GAP_SECONDS") or 0.5)
+
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+SUPPORTED_FRAME_MS = (10, 20, 30)
+
+
+class StreamingVAD:
+    """Incremental voice activity detector for one answer stream (one per connection)"""
+
+    def __init__(
+        self,
+        sample_rate: int = VAD_SAMPLE_RATE,
+        frame_ms: int = VAD_FRAME_MS,
+        aggressiveness: int = VAD_AGGRESSIVENESS,
+        min_pause: float = VAD_MIN_PAUSE_SECONDS,
+        max_pause: float = VAD_MAX_PAUSE_SECONDS
+    ):
+        if sample_rate not in SUPPORTED_SAMPLE_RATES:
+            raise ValueError(f"webrtcvad needs a sample rate of {SUPPORTED_SAMPLE_RATES}, got {sample_rate}")
+        if frame_ms not in SUPPORTED_FRAME_MS:
+            raise ValueError(f"webrtcvad needs {SUPPORTED_FRAME_MS} ms frames, got {frame_ms}")
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2  # 16-bit samples
+        self.min_pause = min_pause
+        self.max_pause = max_pause
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self._buf = bytearray()  # partial frame carried to the next chunk
+        self._frames = 0  # frames processed on this stream
+        self._onset = deque(maxlen=max(1, VAD_ONSET_MS // frame_ms))
+        self.reset()
+
+    def reset(self):
+        """Forget the current answer (the audio position keeps counting)"""
+        self.in_speech = False
+        self._onset.clear()
+        self._speech_frames = 0
+        self._silent_frames = 0  # since the last voiced frame
+        self._longest_gap = 0  # longest mid-answer pause, in frames
+
+    @property
+    def position(self) -> float:
+        """Seconds of audio processed"""
+        return self._frames * self.frame_ms / 1000
+
+    @property
+    def pause(self) -> float:
+        """Seconds of silence since the student last spoke (0 before they started)"""
+        return self._silent_frames * self.frame_ms / 1000 if self.in_speech else 0.0
+
+    @property
+    def required_pause(self) -> float:
+        """Silence that ends the current answer"""
+        longest = self._longest_gap * self.frame_ms / 1000
+        return min(self.max_pause, max(self.min_pause, longest * VAD_PAUSE_FACTOR))
+
+    def feed(self, pcm: bytes) -> List[Dict]:
+        """Process the next PCM chunk (bytes-like); returns the events it produced, in order"""
+        events = []
+        self._buf += pcm
+        whole = len(self._buf) - len(self._buf) % self.frame_bytes
+        view = memoryview(self._buf)
+        try:
+            for offset in range(0, whole, self.frame_bytes):
+                event = self._frame(self._vad.is_speech(view[offset:offset + self.frame_bytes], self.sample_rate))
+                if event:
+                    events.append(event)
+        finally:
+            view.release()
+        del self._buf[:whole]
+        return events
+
+    def _frame(self, voiced: bool):
+        self._frames += 1
+        if not self.in_speech:
+            self._onset.append(voiced)
+            if len(self._onset) == self._onset.maxlen and sum(self._onset) >= VAD_ONSET_RATIO * len(self._onset):
+                self.in_speech = True
+                self._speech_frames = sum(self._onset)
+                return {"type": "speech_start", "at": round(self.position - len(self._onset) * self.frame_ms / 1000, 3)}
+            return None
+
+        if voiced:
+            if self._silent_frames * self.frame_ms / 1000 >= VAD_MIN_GAP_SECONDS:
+                self._longest_gap = max(self._longest_gap, self._silent_frames)
+            self._silent_frames = 0
+            self._speech_frames += 1
+            return None
+
+        self._silent_frames += 1
+        if self.pause >= self.required_pause:
+            event = {
+                "type": "endpoint",
+                "at": round(self.position, 3),
+                "pause": round(self.pause, 3),
+                "required_pause": round(self.required_pause, 3),
+                "speech_seconds": round(self._speech_frames * self.frame_ms / 1000, 3)
+            }
+            self.reset()
+            return event
+        return None
@@ -0,0 +1,409 @@
+"""
+Write-behind persistence
+Request handlers update the in-memory state and queue their MongoDB writes here, so a slow or
+unreachable database never holds up a request. A background thread writes the queue in batches
+(one ordered bulk_write per collection) and retries failures with exponential backoff.
+Writes that still fail, or that arrive while MongoDB is unreachable, are appended to a local
+spool file and replayed in order once the database answers again (also on the next start), so
+completed exams are not lost to an outage. While MongoDB is unreachable the writer thread retries
+the connection (MongoService.ensure_connected backs off between attempts). stop() flushes the queue on shutdown.
+
+Every worker process shares the spool file: appending, replaying and rewriting it happen under an
+exclusive lock on {spool}.lock, so one worker's rewrite never drops another's appended writes and
+a spooled write is replayed by exactly one of them.
+"""
+from typing import Dict, List, Optional
+from collections import Counter
+from contextlib import contextmanager
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from app.core.serialization import dumps, loads
+from app.services.mongo_service import mongo_service
+import atexit
+import os
+import queue
+import threading
+import time
+
+try:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+# Writes per batch, and how long the writer waits for a batch to fill once a write arrives
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE") or 200)
+WRITE_BEHIND_LINGER_SECONDS = float(os.getenv("WRITE_BEHIND_LINGER_SECONDS") or 0.05)
+# Retries of a failed batch before it is spooled; the delay doubles per retry up to the max
+WRITE_BEHIND_RETRIES = int(os.getenv("WRITE_BEHIND_RETRIES") or 4)
+WRITE_BEHIND_BACKOFF_SECONDS = float(os.getenv("WRITE_BEHIND_BACKOFF_SECONDS") or 0.5)
+WRITE_BEHIND_MAX_BACKOFF_SECONDS = float(os.getenv("WRITE_BEHIND_MAX_BACKOFF_SECONDS") or 30)
+WRITE_BEHIND_SPOOL_PATH = os.getenv("WRITE_BEHIND_SPOOL_PATH") or os.path.join("results", "write_behind_spool.jsonl")
+# How long shutdown waits for queued writes before spooling the rest
+WRITE_BEHIND_SHUTDOWN_SECONDS = float(os.getenv("WRITE_BEHIND_SHUTDOWN_SECONDS") or 10)
+
+_STOP = None  # queue sentinel
+
+
+def _operation(write: Dict):
+    if write["op"] == "delete":
+        return DeleteOne(write["filter"])
+    return UpdateOne(write["filter"], {"$set": write["doc"]}, upsert=True)
+
+
+class WriteBehindQueue:
+    def __init__(self, mongo=mongo_service, spool_path: str = WRITE_BEHIND_SPOOL_PATH):
+        self._mongo = mongo
+        self._spool_path = spool_path
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._atexit_registered = False
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        # Writes in this process's queue (not yet written or spooled); spooled ones are read from the spool
+        self._pending = Counter()  # (collection, filter) -> queued writes
+        self._pending_students = Counter()  # student_id -> queued writes
+        self._spool_index = (None, Counter(), Counter())  # (spool file signature, pending keys, students)
+        self._next_replay = 0.0
+        self._replay_delay = WRITE_BEHIND_BACKOFF_SECONDS
+        self._counters = Counter()
+
+    # -------- Producers --------
+    def upsert(self, collection: str, key_field: str, doc: Dict):
+        """Queue an upsert of doc (matched on key_field) into collection"""
+        self._put({"op": "upsert", "collection": collection, "filter": {key_field: doc[key_field]}, "doc": doc})
+
+    def delete(self, collection: str, query: Dict):
+        """Queue deleting the document matching query"""
+        self._put({"op": "delete", "collection": collection, "filter": query})
+
+    def _put(self, write: Dict):
+        # Serialized right away: a snapshot of the document, and the form the spool stores
+        line = dumps(write)
+        with self._lock:
+            self._track(write, 1)
+            self._counters["queued"] += 1
+        self._queue.put(line)
+        self.start()
+
+    def is_pending(self, collection: str, key: Dict) -> bool:
+        """Whether a write to the document matching key (e.g. {"exam_id": ...}) hasn't reached MongoDB yet"""
+        pending_key = (collection, dumps(key))
+        with self._lock:
+            if self._pending[pending_key] > 0:
+                return True
+        return self._spooled_writes()[0][pending_key] > 0
+
+    def is_pending_for_student(self, student_id: str) -> bool:
+        """Whether a write to a document of this student (by student_id) hasn't reached MongoDB yet"""
+        with self._lock:
+            if self._pending_students[student_id] > 0:
+                return True
+        return self._spooled_writes()[1][student_id] > 0
+
+    @staticmethod
+    def _pending_key(write: Dict):
+        return write["collection"], dumps(write["filter"])
+
+    @staticmethod
+    def _student_of(write: Dict) -> Optional[str]:
+        return write["filter"].get("student_id") or (write.get("doc") or {}).get("student_id")
+
+    def _track(self, write: Dict, delta: int):
+        """Count a queued write (delta 1) or one that left the queue (delta -1); call with the lock held"""
+        student_id = self._student_of(write)
+        for counter, key in ((self._pending, self._pending_key(write)), (self._pending_students, student_id)):
+            if key is None or (delta < 0 and counter[key] <= 0):
+                continue
+            counter[key] += delta
+            if not counter[key]:
+                del counter[key]
+
+    def _dequeued(self, lines: List[str]):
+        """Queued writes that were written, rejected or spooled"""
+        with self._lock:
+            for line in lines:
+                self._track(loads(line), -1)
+
+    # -------- Lifecycle --------
+    def start(self):
+        """Start the writer thread (also started by the first queued write)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+        spooled = self._spool_size()
+        if spooled:
+            print(f"💾 [WRITE_BEHIND] {spooled} spooled writes waiting to be replayed")
+
+    def stop(self, timeout: float = WRITE_BEHIND_SHUTDOWN_SECONDS):
+        """Write everything queued, spooling what can't be written within timeout"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            # Stop retrying: the writer spools what is left and exits
+            self._stopping.set()
+            thread.join()
+        self._thread = None
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every queued write has been written or spooled; False on timeout"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def metrics(self) -> Dict:
+        return {**self._counters, "queue_depth": self._queue.qsize(), "spool_size": self._spool_size()}
+
+    # -------- Writer thread --------
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            try:
+                if batch:
+                    self._write_batch(batch)
+                elif not stop:
+                    # Idle tick: retry a failed connection, then replay what was spooled meanwhile
+                    self._mongo.ensure_connected()
+                    if self._has_spool():
+                        self._replay_spool()
+            except Exception as e:
+                # Never lose a batch to an unexpected error: keep it for the next replay
+                print(f"⚠️ [WRITE_BEHIND] Unexpected error writing {len(batch)} writes: {e}")
+                self._spool(batch)
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _next_batch(self):
+        """(writes, stop): up to WRITE_BEHIND_BATCH_SIZE queued writes, waiting briefly for more after the first"""
+        try:
+            first = self._queue.get(timeout=max(self._replay_delay, WRITE_BEHIND_BACKOFF_SECONDS))
+        except queue.Empty:
+            return [], False
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + WRITE_BEHIND_LINGER_SECONDS
+        while len(batch) < WRITE_BEHIND_BATCH_SIZE:
+            try:
+                line = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if line is _STOP:
+                # Write this batch, then stop
+                self._queue.task_done()
+                self._queue.put(_STOP)
+                break
+            batch.append(line)
+        return batch, False
+
+    def _write_batch(self, batch: List[str]):
+        if self._has_spool() or not self._mongo.ensure_connected():
+            # Keep writes in order behind the ones already waiting in the spool
+            self._spool(batch)
+            self._replay_spool()
+            return
+        remaining = self._write_with_retry(list(batch))
+        self._spool(remaining)
+        # Spooled writes are dequeued by _spool; the rest were written (or rejected)
+        left = Counter(remaining)
+        written = []
+        for line in batch:
+            if left[line]:
+                left[line] -= 1
+            else:
+                written.append(line)
+        self._dequeued(written)
+
+    def _write_with_retry(self, lines: List[str], retries: int = WRITE_BEHIND_RETRIES) -> List[str]:
+        """Write lines, retrying with backoff; returns the lines that could not be written"""
+        delay = WRITE_BEHIND_BACKOFF_SECONDS
+        for attempt in range(retries + 1):
+            try:
+                lines = self._bulk_write(lines)
+                return []
+            except PyMongoError as e:
+                if attempt == retries or self._stopping.is_set():
+                    print(f"⚠️ [WRITE_BEHIND] Giving up on {len(lines)} writes for now: {e}")
+                    return lines
+                self._counters["retries"] += 1
+                print(f"⚠️ [WRITE_BEHIND] Write of {len(lines)} failed ({e}); retrying in {delay:.1f}s")
+                self._stopping.wait(delay)
+                delay = min(delay * 2, WRITE_BEHIND_MAX_BACKOFF_SECONDS)
+        return lines
+
+    def _bulk_write(self, lines: List[str]) -> List[str]:
+        """
+        One ordered bulk_write per collection. Returns [] once everything is applied; raises
+        PyMongoError for a retryable failure, after which the writes not yet applied are in lines.
+        """
+        by_collection: Dict[str, List[str]] = {}
+        for line in lines:
+            by_collection.setdefault(loads(line)["collection"], []).append(line)
+
+        done: List[str] = []
+        try:
+            for collection, collection_lines in by_collection.items():
+                while collection_lines:
+                    try:
+                        self._mongo.db[collection].bulk_write(
+                            [_operation(loads(line)) for line in collection_lines], ordered=True
+                        )
+                        done.extend(collection_lines)
+                        collection_lines = []
+                    except BulkWriteError as e:
+                        errors = e.details.get("writeErrors") or []
+                        if not errors:
+                            raise  # write concern error: retry the whole collection
+                        # The writes before the failing one are applied; the failing one never will be
+                        index = errors[0]["index"]
+                        done.extend(collection_lines[:index])
+                        self._reject(collection_lines[index], errors[0].get("errmsg"))
+                        done.append(collection_lines[index])
+                        collection_lines = collection_lines[index + 1:]
+        finally:
+            self._counters["written"] += len(done)
+            if done:
+                self._counters["batches"] += 1
+            applied = Counter(done)
+            remaining = []
+            for line in lines:
+                if applied[line]:
+                    applied[line] -= 1
+                else:
+                    remaining.append(line)
+            lines[:] = remaining
+        return lines
+
+    def _reject(self, line: str, reason: str):
+        self._counters["rejected"] += 1
+        print(f"❌ [WRITE_BEHIND] MongoDB rejected a write ({reason}); kept in {self._spool_path}.rejected")
+        with open(f"{self._spool_path}.rejected", "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    # -------- Spool --------
+    @contextmanager
+    def _spool_lock(self):
+        """Exclusive lock on the spool, held across processes (and threads)"""
+        os.makedirs(os.path.dirname(self._spool_path) or ".", exist_ok=True)
+        with open(f"{self._spool_path}.lock", "a+") as f:
+            _lock_file(f)
+            try:
+                yield
+            finally:
+                _unlock_file(f)
+
+    def _read_spool(self) -> List[str]:
+        try:
+            with open(self._spool_path, encoding="utf-8") as f:
+                return [line.rstrip("\n") for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _has_spool(self) -> bool:
+        return os.path.exists(self._spool_path)
+
+    def _spool_size(self) -> int:
+        return sum(self._spooled_writes()[0].values())
+
+    def _spooled_writes(self):
+        """(pending keys, students) of the writes in the spool, re-read only when the file changes"""
+        try:
+            stat = os.stat(self._spool_path)
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            return Counter(), Counter()
+        if self._spool_index[0] != signature:
+            keys, students = Counter(), Counter()
+            with self._spool_lock():
+                for line in self._read_spool():
+                    write = loads(line)
+                    keys[self._pending_key(write)] += 1
+                    student_id = self._student_of(write)
+                    if student_id is not None:
+                        students[student_id] += 1
+            self._spool_index = (signature, keys, students)
+        return self._spool_index[1], self._spool_index[2]
+
+    def _spool(self, lines: List[str]):
+        """Append queued writes to the spool (they are then pending through the spool, not the queue)"""
+        if not lines:
+            return
+        with self._spool_lock():
+            with open(self._spool_path, "a", encoding="utf-8") as f:
+                f.writelines(line + "\n" for line in lines)
+                f.flush()
+                os.fsync(f.fileno())
+        self._dequeued(lines)
+        self._counters["spooled"] += len(lines)
+
+    def _replay_spool(self):
+        """Write spooled writes in order, batch by batch, keeping the rest on failure"""
+        if not self._mongo.is_connected() or time.monotonic() < self._next_replay:
+            return
+        replayed = 0
+        # Held throughout, so other workers neither replay the same writes nor append while it is rewritten
+        with self._spool_lock():
+            lines = self._read_spool()
+            while lines:
+                batch = lines[:WRITE_BEHIND_BATCH_SIZE]
+                # One attempt per replay; replays themselves back off
+                remaining = self._write_with_retry(list(batch), retries=0)
+                written = len(batch) - len(remaining)
+                lines = remaining + lines[len(batch):]
+                replayed += written
+                self._rewrite_spool(lines)
+                if remaining:
+                    # Still unreachable: back off before the next attempt
+                    self._next_replay = time.monotonic() + self._replay_delay
+                    self._replay_delay = min(self._replay_delay * 2, WRITE_BEHIND_MAX_BACKOFF_SECONDS)
+                    break
+            else:
+                self._replay_delay = WRITE_BEHIND_BACKOFF_SECONDS
+        if replayed:
+            self._counters["replayed"] += replayed
+            print(f"💾 [WRITE_BEHIND] Replayed {replayed} spooled writes; {len(lines)} left")
+
+    def _rewrite_spool(self, lines: List[str]):
+        """Replace the spool's contents; call with the spool lock held"""
+        if not lines:
+            if os.path.exists(self._spool_path):
+                os.remove(self._spool_path)
+            return
+        tmp_path = f"{self._spool_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._spool_path)
+
+
+# Global instance
+write_behind = WriteBehindQueue()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark silence segmentation in VoiceService
+Compares the previous detect_adaptive_pause (librosa RMS, then a per-frame Python loop building
+silence runs) with the NumPy engine behind silence_intervals (running-sum RMS, run-length
+encoding), stage by stage, and reports the cost per minute of audio.
+
+    python benchmark_silence.py [--minutes 1 5 10] [--repeat 5]
+"""
+import argparse
+import time
+
+import librosa
+import numpy as np
+
+from app.services.voice_service import voice_service, _frame_rms, _runs
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_answer(minutes: float, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Speech-like bursts (0.2-3 s) separated by pauses (0.1-5 s), with background noise"""
+    rng = np.random.default_rng(0)
+    total = int(minutes * 60 * sr)
+    audio = rng.normal(0, 0.002, total).astype(np.float32)
+    pos = 0
+    while pos < total:
+        burst = int(rng.uniform(0.2, 3.0) * sr)
+        t = np.arange(min(burst, total - pos)) / sr
+        audio[pos:pos + len(t)] += 0.5 * np.sin(2 * np.pi * rng.uniform(120, 300) * t)
+        pos += burst + int(rng.uniform(0.1, 5.0) * sr)
+    return audio
+
+
+def loop_silence_runs(silent_frames: np.ndarray, frame_duration: float) -> list:
+    """The previous per-frame loop (silence run durations only)"""
+    silence_segments = []
+    current_silence_start = None
+    for i, is_silent in enumerate(silent_frames):
+        if is_silent:
+            if current_silence_start is None:
+                current_silence_start = i
+        else:
+            if current_silence_start is not None:
+                silence_segments.append((i - current_silence_start) * frame_duration)
+                current_silence_start = None
+    if current_silence_start is not None:
+        silence_segments.append((len(silent_frames) - current_silence_start) * frame_duration)
+    return silence_segments
+
+
+def loop_adaptive_pause(audio: np.ndarray, sr: int) -> float:
+    """The previous detect_adaptive_pause, end to end (longest pause)"""
+    rms = librosa.feature.rms(y=audio)[0]
+    silent_frames = rms / (np.max(rms) + 1e-10) < 0.1
+    return max(loop_silence_runs(silent_frames, len(audio) / len(rms) / sr), default=0.0)
+
+
+def best_of(fn, repeat: int) -> float:
+    """Fastest of repeat runs, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark silence segmentation")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'audio':>8} | {'loop runs':>10} {'numpy runs':>10} | {'librosa rms':>11} {'running rms':>11} | "
+          f"{'pause before':>12} {'pause after':>11} {'speedup':>8}")
+    print(f"{'':>8} | {'(ms per minute of audio)':^87}")
+    print("-" * 98)
+    for minutes in args.minutes:
+        audio = synthetic_answer(minutes)
+        rms = librosa.feature.rms(y=audio)[0]
+        silent = rms / (np.max(rms) + 1e-10) < 0.1
+        frame_duration = len(audio) / len(rms) / SAMPLE_RATE
+
+        loop = best_of(lambda: loop_silence_runs(silent, frame_duration), args.repeat)
+        vectorized = best_of(lambda: _runs(silent), args.repeat)
+        librosa_rms = best_of(lambda: librosa.feature.rms(y=audio), args.repeat)
+        running_rms = best_of(lambda: _frame_rms(audio, 2048, 512), args.repeat)
+        before = best_of(lambda: loop_adaptive_pause(audio, SAMPLE_RATE), args.repeat)
+        after = best_of(lambda: voice_service.detect_adaptive_pause(audio, SAMPLE_RATE), args.repeat)
+
+        # Both must find the same longest pause (to within a frame)
+        longest_before = loop_adaptive_pause(audio, SAMPLE_RATE)
+        longest_after = voice_service.detect_adaptive_pause(audio, SAMPLE_RATE)[1]
+        assert abs(longest_before - longest_after) <= frame_duration, (longest_before, longest_after)
+
+        per_minute = 1000 / minutes
+        print(f"{minutes:>6.1f} m | {loop * per_minute:>10.3f} {vectorized * per_minute:>10.3f} | "
+              f"{librosa_rms * per_minute:>11.3f} {running_rms * per_minute:>11.3f} | "
+              f"{before * per_minute:>12.3f} {after * per_minute:>11.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,88 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import auth, students, exams, instructor, debug
-from app.core.config import get_settings
-import os
-import uvicorn
-settings = get_settings()
-
-app = FastAPI(
-    title="AI Oral Examination System",
-    version="2.0.0",
-    docs_url="/api/docs"
-)
-
-# CORS Configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router)
-app.include_router(students.router)
-app.include_router(exams.router)
-app.include_router(instructor.router)
-app.include_router(debug.router)
-
-@app.get("/")
-def root():
-    return {
-        "message": "AI Oral Examination API",
-        "version": "2.0.0",
-        "docs": "/api/docs"
-    }
-
-@app.get("/health")
-def health_check():
-    return {
-        "status": "healthy",
-        "groq_configured": bool(settings.GROQ_API_KEY)
-    }
-
-@app.on_event("startup")
-async def startup_event():
-    print("🚀 AI Oral Examination System Starting...")
-    print(f"📚 Documentation: http://localhost:8000/api/docs")
-    
-    # Create necessary directories
-    os.makedirs("results", exist_ok=True)
-    os.makedirs("uploads", exist_ok=True)
-
-if __name__ == "__main__":
-    
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from app.api.routes import auth, students, exams, instructor, debug
+from app.core.config import get_settings
+from app.services.grok_service import close_async_http_client
+from app.services.pdf_ingest import pdf_ingest_service
+from app.services.question_pregen import question_pregenerator
+from app.services.exam_service import exam_service
+from app.services.mongo_service import mongo_service
+from app.services.write_behind import write_behind
+import asyncio
+import os
+import uvicorn
+settings = get_settings()
+
+app = FastAPI(
+    title="AI Oral Examination System",
+    version="2.0.0",
+    docs_url="/api/docs"
+)
+
+# CORS Configuration
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Include routers
+app.include_router(auth.router)
+app.include_router(students.router)
+app.include_router(exams.router)
+app.include_router(instructor.router)
+app.include_router(debug.router)
+
+@app.get("/")
+def root():
+    return {
+        "message": "AI Oral Examination API",
+        "version": "2.0.0",
+        "docs": "/api/docs"
+    }
+
+@app.get("/health")
+def health_check():
+    return {
+        "status": "healthy",
+        "groq_configured": bool(settings.GROQ_API_KEY)
+    }
+
+@app.on_event("startup")
+async def startup_event():
+    print("🚀 AI Oral Examination System Starting...")
+    print(f"📚 Documentation: http://localhost:8000/api/docs")
+    
+    # Create necessary directories
+    os.makedirs("results", exist_ok=True)
+    os.makedirs("uploads", exist_ok=True)
+
+    # Generate questions for upcoming exams ahead of their start time
+    question_pregenerator.start()
+    # Evict finished exam sessions from memory
+    exam_service.start_session_sweeper()
+    # Write database updates in the background, replaying any spooled by a previous run
+    write_behind.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await question_pregenerator.stop()
+    await exam_service.stop_session_sweeper()
+    # Release pooled connections held by the async Groq client
+    await close_async_http_client()
+    # Stop PDF extraction worker processes
+    pdf_ingest_service.shutdown()
+    # Write queued database writes (spooling any MongoDB can't take), then close the pool
+    await asyncio.to_thread(write_behind.stop)
+    mongo_service.close()
+
+if __name__ == "__main__":
+    
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True
     )
\ No newline at end of file
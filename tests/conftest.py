@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Run from anywhere: make the app package importable and give the settings the values they require
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("GROQ_API_KEY", "")
@@ -0,0 +1,240 @@
+import pytest
+
+from app.services.audio_stream import (
+    AudioStreamAssembler, AudioStreamError, audio_filename, _read_element_header,
+    EBML_ID, SEGMENT_ID, CLUSTER_ID, INFO_ID, TRACKS_ID, TIMECODE_ID, SIMPLE_BLOCK_ID, BLOCK_GROUP_ID, BLOCK_ID
+)
+
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+SEEK_HEAD_ID = 0x114D9B74
+CUES_ID = 0x1C53BB6B
+
+
+# -------- Hand-built WebM --------
+def element_id(value: int) -> bytes:
+    return value.to_bytes((value.bit_length() + 7) // 8, "big")
+
+
+def element(value: int, payload: bytes) -> bytes:
+    """Element with a one-byte size (payloads under 127 bytes)"""
+    assert len(payload) < 0x7F
+    return element_id(value) + bytes([0x80 | len(payload)]) + payload
+
+
+def simple_block(relative: int, data: bytes = b"\x00\x01") -> bytes:
+    # Track 1, timecode relative to the cluster, keyframe flag
+    return element(SIMPLE_BLOCK_ID, b"\x81" + relative.to_bytes(2, "big", signed=True) + b"\x80" + data)
+
+
+def block_group(relative: int) -> bytes:
+    return element(BLOCK_GROUP_ID, element(BLOCK_ID, b"\x81" + relative.to_bytes(2, "big", signed=True) + b"\x00\x02"))
+
+
+def cluster(timecode: int, *blocks: bytes, known_size: bool = False) -> bytes:
+    body = element(TIMECODE_ID, timecode.to_bytes(2, "big")) + b"".join(blocks)
+    if known_size:
+        return element(CLUSTER_ID, body)
+    return element_id(CLUSTER_ID) + UNKNOWN_SIZE + body
+
+
+EBML_HEADER = element(EBML_ID, element(0x4282, b"webm"))
+INFO = element(INFO_ID, element(0x2AD7B1, b"\x0f\x42\x40"))
+TRACKS = element(TRACKS_ID, element(0xAE, element(0xD7, b"\x01")))
+SEEK_HEAD = element(SEEK_HEAD_ID, b"\x00" * 8)
+
+
+def recording(*clusters: bytes) -> bytes:
+    """A complete file as a live recorder writes it: Segment of unknown size, then clusters"""
+    return EBML_HEADER + element_id(SEGMENT_ID) + UNKNOWN_SIZE + SEEK_HEAD + INFO + TRACKS + b"".join(clusters)
+
+
+def timeline(stream: bytes):
+    """[(cluster timecode, [absolute block timecodes])] of an assembled stream, checking its layout"""
+    assert stream.startswith(EBML_HEADER + element_id(SEGMENT_ID) + UNKNOWN_SIZE + INFO + TRACKS)
+    pos = len(EBML_HEADER) + 4 + len(UNKNOWN_SIZE) + len(INFO) + len(TRACKS)
+    clusters = []
+    while pos < len(stream):
+        element_value, size, header_length = _read_element_header(stream, pos)
+        if element_value == CLUSTER_ID:
+            assert size is None  # rewritten as a live (unknown-size) cluster
+            pos += header_length
+            continue
+        payload = stream[pos + header_length:pos + header_length + size]
+        if element_value == TIMECODE_ID:
+            assert size == 8
+            clusters.append((int.from_bytes(payload, "big"), []))
+        elif element_value == SIMPLE_BLOCK_ID:
+            clusters[-1][1].append(clusters[-1][0] + int.from_bytes(payload[1:3], "big", signed=True))
+        elif element_value == BLOCK_GROUP_ID:
+            block = payload[2:]
+            clusters[-1][1].append(clusters[-1][0] + int.from_bytes(block[1:3], "big", signed=True))
+        else:
+            pytest.fail(f"unexpected element 0x{element_value:X} in the stream")
+        pos += header_length + size
+    return clusters
+
+
+def feed_in_pieces(assembler: AudioStreamAssembler, data: bytes, piece: int):
+    for start in range(0, len(data), piece):
+        assembler.feed(data[start:start + piece])
+
+
+# -------- Parsing --------
+def test_single_recording_keeps_header_and_blocks():
+    assembler = AudioStreamAssembler()
+    assembler.feed(recording(cluster(0, simple_block(0), simple_block(20)), cluster(40, simple_block(0))))
+
+    assert assembler.format == "webm"
+    stream = assembler.take()
+    # SeekHead is dropped (its offsets no longer hold); Info and Tracks are kept once
+    assert timeline(stream) == [(0, [0, 20]), (40, [40])]
+    assert assembler.take() == b""
+
+
+@pytest.mark.parametrize("piece", [1, 3, 7, 64])
+def test_chunk_boundaries_do_not_matter(piece):
+    data = recording(cluster(0, simple_block(0), block_group(20)), cluster(40, simple_block(0), simple_block(20)))
+    whole = AudioStreamAssembler()
+    whole.feed(data)
+    pieces = AudioStreamAssembler()
+    feed_in_pieces(pieces, data, piece)
+
+    assert pieces.take() == whole.take()
+
+
+def test_known_size_cluster_is_rewritten_with_unknown_size():
+    assembler = AudioStreamAssembler()
+    assembler.feed(recording(cluster(300, simple_block(0), simple_block(20), known_size=True)))
+
+    assert timeline(assembler.take()) == [(300, [300, 320])]
+
+
+def test_elements_after_clusters_are_dropped():
+    assembler = AudioStreamAssembler()
+    assembler.feed(recording(cluster(0, simple_block(0))) + element(CUES_ID, b"\x00" * 4))
+    assembler.feed(cluster(20, simple_block(0)))
+
+    assert timeline(assembler.take()) == [(0, [0]), (20, [20])]
+
+
+def test_block_group_is_kept():
+    assembler = AudioStreamAssembler()
+    assembler.feed(recording(cluster(0, block_group(0), block_group(30))))
+
+    assert timeline(assembler.take()) == [(0, [0, 30])]
+
+
+def test_invalid_vint_raises():
+    assembler = AudioStreamAssembler()
+    with pytest.raises(AudioStreamError):
+        assembler.feed(EBML_HEADER + b"\x00\x00\x00\x00")
+
+
+def test_element_larger_than_limit_raises():
+    assembler = AudioStreamAssembler(max_bytes=1000)
+    oversized = element_id(TRACKS_ID) + b"\x01" + (5000).to_bytes(7, "big")
+    with pytest.raises(AudioStreamError):
+        assembler.feed(EBML_HEADER + element_id(SEGMENT_ID) + UNKNOWN_SIZE + oversized)
+
+
+# -------- Restarted recordings --------
+def test_restarted_recording_is_rebased_after_the_previous_one():
+    assembler = AudioStreamAssembler()
+    assembler.feed(recording(cluster(0, simple_block(0), simple_block(20), simple_block(40))))
+    # The recorder restarted: a complete file whose timestamps start at 0 again
+    assembler.feed(recording(cluster(0, simple_block(0), simple_block(20))))
+
+    # One header; the second recording follows the first at the observed block spacing
+    assert timeline(assembler.take()) == [(0, [0, 20, 40]), (60, [60, 80])]
+
+
+def test_rebasing_accumulates_over_several_restarts():
+    assembler = AudioStreamAssembler()
+    assembler.feed(recording(cluster(500, simple_block(0), simple_block(10))))
+    assembler.feed(recording(cluster(0, simple_block(0))))
+    assembler.feed(recording(cluster(1000, simple_block(0), simple_block(10))))
+
+    assert timeline(assembler.take()) == [(500, [500, 510]), (520, [520]), (530, [530, 540])]
+
+
+def test_restart_before_any_audio_starts_a_fresh_stream():
+    assembler = AudioStreamAssembler()
+    # A header without audio, then a new recording: nothing of the first is kept
+    assembler.feed(recording())
+    assembler.feed(recording(cluster(200, simple_block(0))))
+
+    assert timeline(assembler.take()) == [(200, [200])]
+
+
+# -------- take() --------
+def test_take_carries_the_open_cluster_into_the_next_answer():
+    assembler = AudioStreamAssembler()
+    assembler.feed(recording(cluster(1000, simple_block(0), simple_block(20))))
+    first = assembler.take()
+    # The recorder keeps writing the same cluster
+    assembler.feed(simple_block(40) + simple_block(60))
+    second = assembler.take()
+
+    assert timeline(first) == [(1000, [1000, 1020])]
+    assert timeline(second) == [(1000, [1040, 1060])]
+
+
+def test_take_without_new_audio_is_empty():
+    assembler = AudioStreamAssembler()
+    assembler.feed(recording(cluster(0, simple_block(0))))
+    assembler.take()
+
+    assert assembler.size == 0
+    assert assembler.take() == b""
+    # The cluster header alone is not an answer either
+    assembler.feed(cluster(20))
+    assert assembler.take() == b""
+
+
+def test_incomplete_element_waits_for_the_next_chunk():
+    assembler = AudioStreamAssembler()
+    data = recording(cluster(0, simple_block(0), simple_block(20)))
+    assembler.feed(data[:-3])
+    assert timeline(assembler.take()) == [(0, [0])]
+
+    assembler.feed(data[-3:])
+    assert timeline(assembler.take()) == [(0, [20])]
+
+
+def test_size_matches_take():
+    assembler = AudioStreamAssembler()
+    assert assembler.size == 0
+    assembler.feed(recording(cluster(0, simple_block(0))))
+    size = assembler.size
+    assert size == len(assembler.take())
+
+
+# -------- Raw audio and limits --------
+def test_non_webm_audio_is_concatenated():
+    assembler = AudioStreamAssembler()
+    assembler.feed(b"OggS" + b"\x00" * 10)
+    assembler.feed(b"\x01" * 5)
+
+    assert assembler.format == "raw"
+    data = assembler.take()
+    assert data == b"OggS" + b"\x00" * 10 + b"\x01" * 5
+    assert audio_filename(data) == "answer.ogg"
+    assert assembler.take() == b""
+
+
+def test_chunks_past_the_limit_are_dropped():
+    assembler = AudioStreamAssembler(max_bytes=16)
+    assembler.feed(b"\x01" * 10)
+    assembler.feed(b"\x02" * 10)
+
+    assert assembler.truncated
+    assert assembler.take() == b"\x01" * 10
+    assert not assembler.truncated
+
+
+@pytest.mark.parametrize("head, name", [
+    (EBML_HEADER, "answer.webm"), (b"RIFF\x00\x00\x00\x00WAVE", "answer.wav"),
+    (b"fLaC", "answer.flac"), (b"ID3\x04", "answer.mp3"), (b"\x00\x00\x00\x18ftypmp42", "answer.mp4")
+])
+def test_audio_filename(head, name):
+    assert audio_filename(head) == name
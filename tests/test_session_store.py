@@ -0,0 +1,247 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services import session_store
+from app.services.session_store import InMemorySessionStore, RedisSessionStore, SessionConflict, SessionStore
+
+
+def fake_redis():
+    return pytest.importorskip("fakeredis").FakeRedis(decode_responses=True)
+
+
+def make_redis_store():
+    return RedisSessionStore(fake_redis(), prefix="test")
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    return InMemorySessionStore() if request.param == "memory" else make_redis_store()
+
+
+def session(student_id="s1", status="in_progress", **fields):
+    return {"student_id": student_id, "status": status, **fields}
+
+
+def interleave_write(monkeypatch, store, exam_id, times=1):
+    """Make the next `times` reads inside put() be followed by a write from another client"""
+    other = RedisSessionStore(store._redis, prefix=store._prefix)
+    real_loads = session_store.loads
+    state = {"remaining": times, "writing": False}
+
+    def loads(raw):
+        value = real_loads(raw)
+        if state["remaining"] > 0 and not state["writing"]:
+            state["remaining"] -= 1
+            concurrent = real_loads(raw)
+            concurrent["note"] = "written by another worker"
+            state["writing"] = True
+            try:
+                other.put(exam_id, concurrent)
+            finally:
+                state["writing"] = False
+        return value
+
+    monkeypatch.setattr(session_store, "loads", loads)
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+# -------- Versions and conflicts --------
+def test_put_bumps_version(store):
+    assert store.put("e1", session()) == 1
+    assert store.put("e1", store["e1"]) == 2
+    assert store["e1"]["version"] == 2
+
+
+def test_put_rejects_stale_expected_version(store):
+    store.put("e1", session())
+    store.put("e1", store["e1"])
+    with pytest.raises(SessionConflict):
+        store.put("e1", session(answer="stale"), expected_version=1)
+    assert "answer" not in store["e1"]
+
+
+def test_watch_conflict_raises_with_expected_version(monkeypatch):
+    store = make_redis_store()
+    store.put("e1", session())
+    interleave_write(monkeypatch, store, "e1")
+    with pytest.raises(SessionConflict):
+        store.put("e1", session(answer="mine"), expected_version=1)
+    # The concurrent write won; ours was discarded rather than overwriting it
+    assert store["e1"]["note"] == "written by another worker"
+    assert "answer" not in store["e1"]
+
+
+def test_watch_conflict_retries_unconditional_put(monkeypatch):
+    store = make_redis_store()
+    store.put("e1", session())
+    interleave_write(monkeypatch, store, "e1")
+    # The first attempt is aborted by the interleaved write (version 2); the retry lands on top of it
+    assert store.put("e1", session(answer="mine")) == 3
+    assert store["e1"]["answer"] == "mine"
+
+
+def test_watch_conflict_gives_up_after_retries(monkeypatch):
+    store = make_redis_store()
+    store.put("e1", session())
+    interleave_write(monkeypatch, store, "e1", times=session_store.SESSION_UPDATE_RETRIES)
+    with pytest.raises(SessionConflict):
+        store.put("e1", session(answer="mine"))
+
+
+def test_update_reapplies_after_concurrent_write(monkeypatch):
+    store = make_redis_store()
+    store.put("e1", session(answers=[]))
+    calls = []
+
+    def add_answer(current):
+        if not calls:
+            # Another worker records an answer between our read and our write
+            concurrent = store.get("e1")
+            concurrent["answers"].append("theirs")
+            store.put("e1", concurrent)
+        calls.append(1)
+        current["answers"].append("mine")
+        return len(current["answers"])
+
+    assert store.update("e1", add_answer) == 2
+    assert len(calls) == 2
+    assert store["e1"]["answers"] == ["theirs", "mine"]
+    assert store["e1"]["version"] == 3
+
+
+def test_update_missing_session_raises_key_error(store):
+    with pytest.raises(KeyError):
+        store.update("missing", lambda current: None)
+
+
+# -------- Indexes --------
+def test_indexes_by_student_and_status(store):
+    store.put("e1", session("s1", "in_progress"))
+    store.put("e2", session("s1", "completed"))
+    store.put("e3", session("s2", "in_progress"))
+
+    assert sorted(store.ids_for_student("s1")) == ["e1", "e2"]
+    assert store.ids_for_student("s2") == ["e3"]
+    assert sorted(store.ids_with_status("in_progress")) == ["e1", "e3"]
+    assert store.count_with_status("completed") == 1
+    assert sorted(store) == ["e1", "e2", "e3"]
+    assert len(store) == 3
+
+
+def test_status_change_moves_session_between_indexes(store):
+    store.put("e1", session("s1", "in_progress"))
+    store.update("e1", lambda current: current.update(status="completed"))
+
+    assert store.ids_with_status("in_progress") == []
+    assert store.ids_with_status("completed") == ["e1"]
+    assert store.ids_for_student("s1") == ["e1"]
+
+
+def test_reassign_student_moves_index_entries(store):
+    store.put("e1", session("old"))
+    store.put("e2", session("old", "completed"))
+    store.put("e3", session("other"))
+
+    assert store.reassign_student("old", "new") == 2
+    assert store.ids_for_student("old") == []
+    assert sorted(store.ids_for_student("new")) == ["e1", "e2"]
+    assert store["e1"]["student_id"] == "new"
+    assert store.ids_for_student("other") == ["e3"]
+
+
+def test_remove_clears_indexes(store):
+    store.put("e1", session("s1", "in_progress"))
+    removed = store.remove("e1")
+
+    assert removed["student_id"] == "s1"
+    assert "e1" not in store
+    assert store.ids() == []
+    assert store.ids_for_student("s1") == []
+    assert store.ids_with_status("in_progress") == []
+    assert store.remove("e1") is None
+    with pytest.raises(KeyError):
+        del store["e1"]
+
+
+# -------- Leases and counters --------
+def test_redis_lease_is_held_until_it_lapses():
+    client = fake_redis()
+    worker_a = RedisSessionStore(client, prefix="test")
+    worker_b = RedisSessionStore(client, prefix="test")
+
+    assert worker_a.try_acquire("sweep", 30)
+    assert not worker_b.try_acquire("sweep", 30)
+    assert not worker_a.try_acquire("sweep", 30)
+    # Leases are per name
+    assert worker_b.try_acquire("pregen", 30)
+    assert 0 < client.ttl("test:lock:sweep") <= 30
+
+    # Once the lease lapses another worker can take it
+    client.pexpire("test:lock:sweep", 1)
+    time.sleep(0.01)
+    assert worker_b.try_acquire("sweep", 30)
+
+
+def test_memory_lease_is_always_available():
+    store = InMemorySessionStore()
+    assert store.try_acquire("sweep", 30)
+    assert store.try_acquire("sweep", 30)
+
+
+def test_eviction_counters(store):
+    store.record_evictions(evicted=2)
+    store.record_evictions(expired=1)
+    assert store.counters() == {"evicted_total": 2, "expired_total": 1}
+
+
+# -------- Record maps --------
+def test_memory_record_map_is_a_plain_dict():
+    records = InMemorySessionStore().record_map("students")
+    assert records == {}
+    assert isinstance(records, dict)
+
+
+def test_redis_record_map_is_shared_between_workers():
+    client = fake_redis()
+    worker_a = RedisSessionStore(client, prefix="test").record_map("students")
+    worker_b = RedisSessionStore(client, prefix="test").record_map("students")
+
+    worker_a["s1"] = {"name": "Ann", "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+    assert "s1" in worker_b
+    assert worker_b["s1"]["created_at"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert list(worker_b) == ["s1"]
+    assert worker_b.items() == [("s1", worker_a["s1"])]
+    assert len(worker_b) == 1
+    # Maps are separate per name
+    assert "s1" not in RedisSessionStore(client, prefix="test").record_map("pdf_exams")
+
+
+def test_redis_record_map_values_are_copies():
+    records = make_redis_store().record_map("student_pdf_exams")
+    records["s1"] = ["e1"]
+    records["s1"].append("e2")
+    assert records["s1"] == ["e1"]
+
+    exam_ids = records["s1"]
+    exam_ids.append("e2")
+    records["s1"] = exam_ids
+    assert records.get("s1") == ["e1", "e2"]
+
+
+def test_redis_record_map_pop_and_delete():
+    records = make_redis_store().record_map("students")
+    records["s1"] = {"name": "Ann"}
+
+    assert records.pop("s1") == {"name": "Ann"}
+    assert records.pop("s1", None) is None
+    assert records.get("s1") is None
+    with pytest.raises(KeyError):
+        records.pop("s1")
+    with pytest.raises(KeyError):
+        del records["s1"]
@@ -0,0 +1,181 @@
+import asyncio
+import base64
+import json
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from app.api.ws_frames import (
+    FrameReader, parse_frame, build_frame, audio_payload, image_payload, FRAME_HEADER, FRAME_VERSION,
+    FRAME_AUDIO, FRAME_VIDEO, FRAME_PCM, FLAG_FINAL, FLAG_PNG
+)
+
+
+class FakeWebSocket:
+    """Replays ASGI receive messages and records what is sent back"""
+
+    def __init__(self, *messages):
+        self.messages = list(messages)
+        self.sent = []
+
+    async def receive(self):
+        if not self.messages:
+            return {"type": "websocket.disconnect", "code": 1000}
+        return self.messages.pop(0)
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+def binary(frame: bytes):
+    return {"type": "websocket.receive", "bytes": frame}
+
+
+def text(data):
+    return {"type": "websocket.receive", "text": json.dumps(data)}
+
+
+def receive_all(websocket):
+    """Messages FrameReader returns until the socket disconnects"""
+    async def read():
+        reader = FrameReader(websocket)
+        received = []
+        try:
+            while True:
+                received.append(await reader.receive())
+        except WebSocketDisconnect:
+            return received
+    return asyncio.run(read())
+
+
+# -------- Header --------
+def test_audio_frame_round_trip():
+    data = parse_frame(build_frame(FRAME_AUDIO, 7, b"chunk", FLAG_FINAL))
+
+    assert data["type"] == "voice_chunk"
+    assert data["encoding"] == "recorder"
+    assert data["is_final"] is True
+    assert data["seq"] == 7
+    assert bytes(data["audio_bytes"]) == b"chunk"
+    assert bytes(audio_payload(data)) == b"chunk"
+
+
+def test_pcm_frame_round_trip():
+    data = parse_frame(build_frame(FRAME_PCM, 1, b"\x00\x01" * 4))
+
+    assert data["type"] == "voice_chunk"
+    assert data["encoding"] == "pcm"
+    assert data["is_final"] is False
+
+
+@pytest.mark.parametrize("flags, image_format", [(0, "jpg"), (FLAG_PNG, "png")])
+def test_video_frame_round_trip(flags, image_format):
+    data = parse_frame(build_frame(FRAME_VIDEO, 3, b"image", flags))
+
+    assert data["type"] == "video_frame"
+    assert data["format"] == image_format
+    assert bytes(image_payload(data)) == b"image"
+
+
+def test_header_layout_is_big_endian():
+    frame = build_frame(FRAME_VIDEO, 0x01020304, b"", FLAG_PNG)
+
+    assert len(frame) == FRAME_HEADER.size == 8
+    assert frame == bytes([FRAME_VIDEO, FLAG_PNG]) + FRAME_VERSION.to_bytes(2, "big") + b"\x01\x02\x03\x04"
+
+
+def test_payload_is_not_copied():
+    frame = build_frame(FRAME_AUDIO, 1, b"abc")
+    payload = parse_frame(frame)["audio_bytes"]
+
+    assert isinstance(payload, memoryview)
+    assert payload.obj is frame
+
+
+# -------- Malformed frames --------
+@pytest.mark.parametrize("frame, message", [
+    (b"", "shorter"),
+    (build_frame(FRAME_AUDIO, 1, b"")[:7], "shorter"),
+    (FRAME_HEADER.pack(FRAME_AUDIO, 0, FRAME_VERSION + 1, 1), "version"),
+    (FRAME_HEADER.pack(9, 0, FRAME_VERSION, 1), "type"),
+])
+def test_malformed_frames_raise(frame, message):
+    with pytest.raises(ValueError, match=message):
+        parse_frame(frame)
+
+
+def test_json_payloads_are_base64():
+    assert audio_payload({"audio": base64.b64encode(b"abc").decode()}) == b"abc"
+    assert image_payload({"image": base64.b64encode(b"img").decode()}) == b"img"
+    assert audio_payload({"audio": ""}) is None
+    assert image_payload({}) is None
+
+
+# -------- FrameReader --------
+def test_reader_returns_json_and_binary_messages():
+    websocket = FakeWebSocket(
+        text({"type": "end_exam"}),
+        binary(build_frame(FRAME_AUDIO, 1, b"a")),
+    )
+    received = receive_all(websocket)
+
+    assert received[0] == {"type": "end_exam"}
+    assert bytes(received[1]["audio_bytes"]) == b"a"
+    assert websocket.sent == []
+
+
+def test_reader_drops_repeated_sequence_numbers():
+    websocket = FakeWebSocket(
+        binary(build_frame(FRAME_AUDIO, 1, b"a")),
+        binary(build_frame(FRAME_AUDIO, 2, b"b")),
+        binary(build_frame(FRAME_AUDIO, 2, b"b")),  # resent
+        binary(build_frame(FRAME_AUDIO, 1, b"a")),  # late duplicate
+        binary(build_frame(FRAME_AUDIO, 3, b"c")),
+    )
+
+    assert [bytes(data["audio_bytes"]) for data in receive_all(websocket)] == [b"a", b"b", b"c"]
+
+
+def test_reader_tracks_sequence_numbers_per_frame_type():
+    websocket = FakeWebSocket(
+        binary(build_frame(FRAME_AUDIO, 5, b"a")),
+        binary(build_frame(FRAME_VIDEO, 1, b"v")),
+        binary(build_frame(FRAME_PCM, 1, b"p")),
+        binary(build_frame(FRAME_VIDEO, 1, b"v")),
+    )
+
+    assert [data["seq"] for data in receive_all(websocket)] == [5, 1, 1]
+
+
+def test_reader_accepts_gaps_in_sequence_numbers(capsys):
+    websocket = FakeWebSocket(
+        binary(build_frame(FRAME_AUDIO, 1, b"a")),
+        binary(build_frame(FRAME_AUDIO, 4, b"d")),
+    )
+
+    assert [data["seq"] for data in receive_all(websocket)] == [1, 4]
+    assert "2-3" in capsys.readouterr().out
+
+
+def test_reader_reports_malformed_frames_and_continues():
+    websocket = FakeWebSocket(
+        binary(b"\x01\x00"),
+        binary(FRAME_HEADER.pack(FRAME_AUDIO, 0, FRAME_VERSION + 1, 1)),
+        binary(build_frame(FRAME_AUDIO, 1, b"a")),
+    )
+    received = receive_all(websocket)
+
+    assert [bytes(data["audio_bytes"]) for data in received] == [b"a"]
+    assert [sent["type"] for sent in websocket.sent] == ["error", "error"]
+    assert "version" in websocket.sent[1]["message"]
+
+
+def test_reader_raises_on_disconnect():
+    websocket = FakeWebSocket({"type": "websocket.disconnect", "code": 1001})
+
+    async def read():
+        await FrameReader(websocket).receive()
+
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        asyncio.run(read())
+    assert excinfo.value.code == 1001